@@ -0,0 +1,7 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from time import perf_counter
+
+# When the package started loading, for measuring how long imports take.
+IMPORT_STARTED: float = perf_counter()
@@ -0,0 +1,138 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+import json
+import sys
+from argparse import ArgumentParser, Namespace
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Tuple, Type, Union
+from .entities import SessionTab, Tab
+from .session import load_records, SessionRecord
+from .settings import (
+    CommonPrefixTabSetting,
+    IncludePathTabSetting,
+    TabSetting,
+)
+
+# The settings which apply outside of the editor, in the order applied.
+CLI_SETTINGS: Tuple[Type[TabSetting], ...] = (
+    CommonPrefixTabSetting,
+    IncludePathTabSetting,
+)
+
+EXIT_NO_MATCHES: int = 1
+EXIT_ERROR: int = 2
+
+
+def matches_query(query: str, text: str) -> bool:
+    """Gets whether the characters of the query appear in order within the
+        text, ignoring case, as in the quick panel.
+    """
+    position: int = 0
+    text = text.lower()
+    for character in query.lower():
+        position = text.find(character, position) + 1
+        if position == 0:
+            return False
+    return True
+
+
+def format_records(
+    records: Iterable[SessionRecord],
+    include_path: bool = False
+) -> List[Tuple[SessionRecord, Tab]]:
+    """Formats the recorded tabs as Tab Filter would, a window at a time."""
+    settings: Dict[str, bool] = {"include_path": include_path}
+    formatted: List[Tuple[SessionRecord, Tab]] = []
+
+    for (_, window_records) in groupby(records, lambda record: record.window):
+        window: List[SessionRecord] = list(window_records)
+        tabs: List[Tab] = []
+        for record in window:
+            tab: Tab = SessionTab(record.file_name, record.name)
+            if record.dirty is True:
+                tab.add_caption("Unsaved Changes")
+            tabs.append(tab)
+
+        for setting in CLI_SETTINGS:
+            # Settings are read from a dict, and there's no editor window.
+            tabs = setting(settings, None).apply(tabs)  # type: ignore
+
+        formatted.extend(zip(window, tabs))
+
+    return formatted
+
+
+def get_parser() -> ArgumentParser:
+    """Gets the parser for the command line arguments."""
+    parser: ArgumentParser = ArgumentParser(
+        prog="tabfilter",
+        description=(
+            "Lists the tabs recorded in .sublime_session and "
+            ".sublime-workspace files."
+        )
+    )
+    parser.add_argument("files", nargs="+", metavar="FILE")
+    parser.add_argument(
+        "-q",
+        "--query",
+        help="only list tabs whose title or path fuzzy matches the query"
+    )
+    parser.add_argument(
+        "--include-path",
+        action="store_true",
+        help="show the full path as the title, as with include_path"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="output a JSON object per tab, rather than tab separated text"
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Lists the matching tabs of each file, returning the exit status."""
+    args: Namespace = get_parser().parse_args(argv)
+    status: int = EXIT_NO_MATCHES if args.query else 0
+
+    for file_name in args.files:
+        try:
+            records: List[SessionRecord] = load_records(file_name)
+        except (OSError, ValueError) as error:
+            print(f"tabfilter: {file_name}: {error}", file=sys.stderr)
+            status = EXIT_ERROR
+            continue
+
+        for (record, tab) in format_records(records, args.include_path):
+            if args.query and not (
+                matches_query(args.query, tab.get_title())
+                or matches_query(args.query, record.file_name or "")
+            ):
+                continue
+            if status == EXIT_NO_MATCHES:
+                status = 0
+
+            details: List[str] = tab.get_details()
+            if args.json is True:
+                entry: Dict[str, Union[str, int, bool, None]] = {
+                    "source": file_name,
+                    "window": record.window,
+                    "group": record.group,
+                    "file_name": record.file_name,
+                    "title": details[0],
+                    "subtitle": details[1],
+                    "dirty": record.dirty,
+                }
+                print(json.dumps(entry))
+            else:
+                print("\t".join(
+                    [file_name, str(record.window), str(record.group)]
+                    + details
+                ))
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
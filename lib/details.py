@@ -0,0 +1,88 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from threading import Lock
+from typing import Dict, FrozenSet, List, NamedTuple, Optional
+
+# The encoding of buffers which haven't been loaded from or saved to disk.
+UNDEFINED_ENCODING: str = "Undefined"
+
+# Commands which change a view's syntax, encoding or line endings.
+DETAIL_COMMANDS: FrozenSet[str] = frozenset(
+    ("set_file_type", "set_encoding", "set_line_ending", "reopen")
+)
+
+
+class ViewDetails(NamedTuple):
+    """How a view's contents are interpreted and saved."""
+    syntax: str
+    encoding: str
+    line_endings: str
+
+
+def get_details_captions(
+    details: ViewDetails,
+    show_syntax: bool = True,
+    show_encoding: bool = True,
+    show_line_endings: bool = True
+) -> List[str]:
+    """Gets the captions describing a view's details, leaving out any which
+        aren't known.
+    """
+    captions: List[str] = []
+    if show_syntax is True and details.syntax != "":
+        captions.append(f"Syntax: {details.syntax}")
+    if show_encoding is True and details.encoding not in (
+        "",
+        UNDEFINED_ENCODING
+    ):
+        captions.append(f"Encoding: {details.encoding}")
+    if show_line_endings is True and details.line_endings != "":
+        captions.append(f"Line Endings: {details.line_endings}")
+    return captions
+
+
+class ViewDetailsCache(object):
+    """Caches the details of each view, which rarely change, so they're
+        only looked up again once they may have.
+    """
+    _details: Dict[int, ViewDetails]
+    _lock: Lock
+
+    def __init__(self) -> None:
+        """Initialise the cache."""
+        self._details = {}
+        self._lock = Lock()
+
+    def get(self, view_id: int) -> Optional[ViewDetails]:
+        """Gets the cached details of the view, if there are any."""
+        with self._lock:
+            return self._details.get(view_id)
+
+    def put(self, view_id: int, details: ViewDetails) -> None:
+        """Caches the details of the view."""
+        with self._lock:
+            self._details[view_id] = details
+
+    def invalidate(self, view_id: int) -> None:
+        """Forgets the view's details, e.g. once they may have changed or
+            it's been closed.
+        """
+        with self._lock:
+            self._details.pop(view_id, None)
+
+    def clear(self) -> None:
+        """Forgets the details of every view."""
+        with self._lock:
+            self._details.clear()
+
+
+_cache: Optional[ViewDetailsCache] = None
+
+
+def get_details_cache() -> ViewDetailsCache:
+    """Gets the shared view details cache."""
+    global _cache
+    if _cache is None:
+        _cache = ViewDetailsCache()
+    return _cache
@@ -0,0 +1,44 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from difflib import SequenceMatcher
+from typing import Hashable, List, Sequence, Tuple
+
+# An edit turning old[i1:i2] into new[j1:j2], as used by difflib.
+Opcode = Tuple[str, int, int, int, int]
+
+
+def diff_items(
+    old: Sequence[Hashable],
+    new: Sequence[Hashable]
+) -> List[Opcode]:
+    """Gets the minimal edits turning the old items into the new ones,
+        leaving out unchanged runs. No edits means the lists are equal.
+    """
+    if len(old) == len(new) and all(a == b for (a, b) in zip(old, new)):
+        return []
+
+    matcher: SequenceMatcher = SequenceMatcher(None, old, new, autojunk=False)
+    return [
+        opcode for opcode in matcher.get_opcodes() if opcode[0] != "equal"
+    ]
+
+
+def map_index(opcodes: List[Opcode], index: int, length: int) -> int:
+    """Maps an index in the old items to the same item in the new ones,
+        given the edits between them and the new length. Items which were
+        removed or replaced map to the closest position left behind.
+    """
+    if index < 0:
+        return index
+
+    offset: int = 0
+    for (_, i1, i2, j1, j2) in opcodes:
+        if index < i1:
+            break
+        if index < i2:
+            # The item was removed or replaced.
+            return max(0, min(j1, length - 1))
+        offset = j2 - i2
+
+    return max(0, min(index + offset, length - 1))
@@ -2,20 +2,25 @@
 # See the file license.txt for copying permission.
 
 from os import path
-from sublime import View  # type: ignore
-from typing import Optional, List
+from typing import TYPE_CHECKING, Optional, List
+
+if TYPE_CHECKING:
+    from sublime import Sheet, View  # type: ignore
 
 
 class Tab(object):
     """Represent a Sublime tab and the relevant metadata."""
-    view: View
+    view: Optional["View"]
     title: str = "untitled"
     subtitle: str = "untitled"
     is_file: bool = True
     path: Optional[str] = ""
+    file_name: Optional[str] = None
+    pinned: bool = False
+    locations: int = 1
     captions: List[str] = []
 
-    def __init__(self, view: View) -> None:
+    def __init__(self, view: "View") -> None:
         """Initialise the Tab."""
         self.view = view
         self.captions = []
@@ -23,10 +28,18 @@ class Tab(object):
         name: Optional[str] = view.file_name()
 
         if name is None:
+            self._set_names(None, view.name())
+        else:
+            self._set_names(name, name)
+
+    def _set_names(self, file_name: Optional[str], name: str) -> None:
+        """Sets the title, subtitle and path from the tab's names."""
+        self.file_name = file_name
+
+        if file_name is None:
             # If the name is not set, then we're dealing with a buffer
             # rather than a file, so deal with it accordingly.
             self.is_file = False
-            name = view.name()
 
             # set the view name to untitled if we get an empty name
             if len(name) == 0:
@@ -63,10 +76,34 @@ class Tab(object):
         """Gets the path for a view tab, or None otherwise."""
         return self.path
 
-    def get_view(self) -> View:
+    def get_file_name(self) -> Optional[str]:
+        """Gets the full file name for a view tab, or None otherwise."""
+        return self.file_name
+
+    def is_pinned(self) -> bool:
+        """Gets whether the tab is pinned."""
+        return self.pinned
+
+    def set_pinned(self, pinned: bool) -> None:
+        """Sets whether the tab is pinned."""
+        self.pinned = pinned
+
+    def get_locations(self) -> int:
+        """Gets the number of places the tab's file or buffer is open in."""
+        return self.locations
+
+    def set_locations(self, locations: int) -> None:
+        """Sets the number of places the tab's file or buffer is open in."""
+        self.locations = locations
+
+    def get_view(self) -> Optional["View"]:
         """Gets the view associated with the tab."""
         return self.view
 
+    def get_sheet(self) -> "Sheet":
+        """Gets the sheet associated with the tab."""
+        return self.view.sheet()  # type: ignore
+
     def add_caption(self, caption: str) -> None:
         """Adds the caption to the list of captions for this Tab."""
         self.captions.append(str(caption))
@@ -98,4 +135,41 @@ class Tab(object):
         )
 
     def __str__(self) -> str:
-        return self.get_title()
\ No newline at end of file
+        return self.get_title()
+
+
+class SheetTab(Tab):
+    """Represent a Sublime tab for a sheet without a view, such as an image
+        preview or HTML sheet.
+    """
+    sheet: "Sheet"
+
+    def __init__(self, sheet: "Sheet") -> None:
+        """Initialise the SheetTab."""
+        self.sheet = sheet
+        self.view = None
+        self.captions = []
+        self._set_names(sheet.file_name(), "")
+
+    def get_sheet(self) -> "Sheet":
+        """Gets the sheet associated with the tab."""
+        return self.sheet
+
+    def __eq__(self, obj) -> bool:
+        """Ensures two tabs refer to the same underlying sheet and data."""
+        return (
+            super().__eq__(obj)
+            and self.get_sheet() == obj.get_sheet()
+        )
+
+
+class SessionTab(Tab):
+    """Represent a tab recorded in a session or workspace file, rather than
+        one open in the editor.
+    """
+
+    def __init__(self, file_name: Optional[str], name: str = "") -> None:
+        """Initialise the SessionTab."""
+        self.view = None
+        self.captions = []
+        self._set_names(file_name, name if file_name is None else file_name)
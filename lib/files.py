@@ -0,0 +1,287 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+import os
+import re
+from fnmatch import translate
+from functools import partial
+from itertools import chain
+from threading import Lock
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Tuple,
+)
+from .pool import get_executor
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+
+class DirectoryEntry(NamedTuple):
+    """The indexed contents of a single directory."""
+    mtime: int
+    files: Tuple[str, ...]
+    directories: Tuple[str, ...]
+
+
+# Caption for project files in the quick panel, as they aren't open.
+PROJECT_FILE_CAPTION: str = "Project File"
+
+
+class ProjectFile(NamedTuple):
+    """A file within a project folder, with its path for display."""
+    file_name: str
+    # The path relative to the folder's parent, so it includes the folder.
+    display_path: str
+    # The quick panel entry for the file, built along with the index so
+    # showing hundreds of thousands of files is quick.
+    details: List[str]
+
+
+def compile_patterns(patterns: Iterable[str]) -> Optional[Pattern]:
+    """Compiles glob patterns, as used by folder_exclude_patterns, into a
+        single expression for matching base names.
+    """
+    expressions: List[str] = [translate(pattern) for pattern in patterns]
+    if len(expressions) == 0:
+        return None
+    return re.compile("|".join(expressions))
+
+
+class FolderIndex(object):
+    """Indexes the files within a folder, scanning with os.scandir.
+
+        Each directory's contents are cached along with its modification
+        time, so refreshing only rescans the directories which have had
+        entries added, removed or renamed since. Symlinked directories are
+        listed but not followed, to avoid cycles.
+    """
+    root: str
+    folder_exclude_patterns: Tuple[str, ...]
+    file_exclude_patterns: Tuple[str, ...]
+    _folder_patterns: Optional[Pattern]
+    _file_patterns: Optional[Pattern]
+    _directories: Dict[str, DirectoryEntry]
+    _files: Tuple[ProjectFile, ...]
+    _ready: bool
+    _lock: Lock
+
+    def __init__(
+        self,
+        root: str,
+        folder_exclude_patterns: Iterable[str] = (),
+        file_exclude_patterns: Iterable[str] = ()
+    ) -> None:
+        """Initialise the index, which is empty until it's refreshed."""
+        self.root = root
+        self.folder_exclude_patterns = tuple(folder_exclude_patterns)
+        self.file_exclude_patterns = tuple(file_exclude_patterns)
+        self._folder_patterns = compile_patterns(
+            self.folder_exclude_patterns
+        )
+        self._file_patterns = compile_patterns(self.file_exclude_patterns)
+        self._directories = {}
+        self._files = ()
+        self._ready = False
+        self._lock = Lock()
+
+    def is_ready(self) -> bool:
+        """Gets whether the index has been built at least once."""
+        return self._ready
+
+    def get_files(self) -> Tuple[ProjectFile, ...]:
+        """Gets the indexed files, which are empty until the index is
+            first built and otherwise as of the last refresh.
+        """
+        return self._files
+
+    def refresh(self) -> bool:
+        """Brings the index up to date, rescanning only the directories
+            which have changed. Returns whether any files changed.
+        """
+        # Only one refresh runs at a time; the rest would find nothing new.
+        with self._lock:
+            previous: Dict[str, DirectoryEntry] = self._directories
+            directories: Dict[str, DirectoryEntry] = {}
+            changed: bool = not self._ready
+            pending: List[str] = [self.root]
+
+            while len(pending) > 0:
+                directory: str = pending.pop()
+                try:
+                    mtime: int = os.stat(directory).st_mtime_ns
+                except OSError:
+                    changed = True
+                    continue
+
+                entry: Optional[DirectoryEntry] = previous.get(directory)
+                if entry is None or entry.mtime != mtime:
+                    entry = self._scan(directory, mtime)
+                    changed = True
+                directories[directory] = entry
+                # Directories are pushed in reverse so they're visited, and
+                # their files listed, in name order.
+                pending.extend(reversed(entry.directories))
+
+            if len(directories) != len(previous):
+                changed = True
+
+            self._directories = directories
+            if changed is True:
+                self._files = self._flatten(directories)
+            self._ready = True
+            return changed
+
+    def _scan(self, directory: str, mtime: int) -> DirectoryEntry:
+        """Lists the files and subdirectories of a directory, leaving out
+            those which are excluded.
+        """
+        files: List[str] = []
+        directories: List[str] = []
+
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if self._folder_patterns is None or (
+                            self._folder_patterns.match(entry.name) is None
+                        ):
+                            directories.append(entry.path)
+                    elif entry.is_file():
+                        if self._file_patterns is None or (
+                            self._file_patterns.match(entry.name) is None
+                        ):
+                            files.append(entry.path)
+        except OSError:
+            # Unreadable directories are indexed as empty.
+            pass
+
+        files.sort()
+        directories.sort()
+        return DirectoryEntry(mtime, tuple(files), tuple(directories))
+
+    def _flatten(
+        self,
+        directories: Dict[str, DirectoryEntry]
+    ) -> Tuple[ProjectFile, ...]:
+        """Lists the files of every directory, in the order visited."""
+        parent: str = os.path.dirname(self.root.rstrip(os.sep)) or self.root
+        offset: int = len(parent)
+        if parent.endswith(os.sep) is False:
+            offset = offset + len(os.sep)
+        return tuple(
+            ProjectFile(
+                file_name,
+                file_name[offset:],
+                [
+                    os.path.basename(file_name),
+                    file_name[offset:],
+                    PROJECT_FILE_CAPTION,
+                ]
+            )
+            for file_name in chain.from_iterable(
+                entry.files for entry in directories.values()
+            )
+        )
+
+
+class ProjectFileIndex(object):
+    """Indexes the files of project folders in the background, keeping an
+        index per folder so windows sharing folders share the work.
+    """
+    _folders: Dict[str, FolderIndex]
+    _pending: Dict[str, "Future"]
+    _lock: Lock
+
+    def __init__(self) -> None:
+        """Initialise the index."""
+        self._folders = {}
+        self._pending = {}
+        self._lock = Lock()
+
+    def get_files(self, folders: Iterable[str]) -> List[ProjectFile]:
+        """Gets the files indexed so far for the given folders."""
+        files: List[ProjectFile] = []
+        for folder in folders:
+            index: Optional[FolderIndex] = self._folders.get(folder)
+            if index is not None:
+                files.extend(index.get_files())
+        return files
+
+    def is_ready(self, folders: Iterable[str]) -> bool:
+        """Gets whether every one of the given folders has been indexed."""
+        for folder in folders:
+            index: Optional[FolderIndex] = self._folders.get(folder)
+            if index is None or index.is_ready() is False:
+                return False
+        return True
+
+    def request(
+        self,
+        folders: Iterable[str],
+        folder_exclude_patterns: Iterable[str] = (),
+        file_exclude_patterns: Iterable[str] = ()
+    ) -> List["Future"]:
+        """Schedules a background refresh of each folder, rebuilding its
+            index from scratch if the exclude patterns have changed.
+            Returns the futures for each of the folders, which resolve to
+            whether the folder's files changed.
+        """
+        folder_patterns: Tuple[str, ...] = tuple(folder_exclude_patterns)
+        file_patterns: Tuple[str, ...] = tuple(file_exclude_patterns)
+        futures: List["Future"] = []
+        submitted: List[Tuple[str, "Future"]] = []
+
+        with self._lock:
+            for folder in dict.fromkeys(folders):
+                future: Optional["Future"] = self._pending.get(folder)
+                if future is None:
+                    index: Optional[FolderIndex] = self._folders.get(folder)
+                    if (
+                        index is None
+                        or index.folder_exclude_patterns != folder_patterns
+                        or index.file_exclude_patterns != file_patterns
+                    ):
+                        index = FolderIndex(
+                            folder,
+                            folder_patterns,
+                            file_patterns
+                        )
+                        self._folders[folder] = index
+                    future = get_executor().submit(index.refresh)
+                    self._pending[folder] = future
+                    submitted.append((folder, future))
+                futures.append(future)
+
+        for (folder, future) in submitted:
+            future.add_done_callback(partial(self._discard, folder))
+
+        return futures
+
+    def clear(self) -> None:
+        """Drops every index."""
+        with self._lock:
+            self._folders.clear()
+
+    def _discard(self, folder: str, future: "Future") -> None:
+        """Stops tracking a finished refresh."""
+        with self._lock:
+            if self._pending.get(folder) is future:
+                del self._pending[folder]
+
+
+_index: Optional[ProjectFileIndex] = None
+
+
+def get_project_file_index() -> ProjectFileIndex:
+    """Gets the shared project file index."""
+    global _index
+    if _index is None:
+        _index = ProjectFileIndex()
+    return _index
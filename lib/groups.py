@@ -0,0 +1,134 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from collections import OrderedDict
+from typing import (
+    Any,
+    FrozenSet,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+# Named scopes of groups, relative to the active group.
+GROUPS_ALL: str = "all"
+GROUPS_ACTIVE: str = "active"
+GROUPS_OTHERS: str = "others"
+GROUPS_LEFT: str = "left"
+GROUPS_RIGHT: str = "right"
+
+GROUP_SCOPES: FrozenSet[str] = frozenset(
+    (GROUPS_ALL, GROUPS_ACTIVE, GROUPS_OTHERS, GROUPS_LEFT, GROUPS_RIGHT)
+)
+
+# The number of scopes whose lists are kept, per cache.
+MAX_SCOPES: int = 16
+
+GroupSpec = Union[None, str, int, Sequence[int]]
+
+
+def resolve_groups(
+    spec: GroupSpec,
+    active_group: int,
+    cells: Sequence[Sequence[float]]
+) -> List[int]:
+    """Gets the indexes of the groups described by spec, given the active
+        group and the cells of the window's layout, one per group.
+
+        Groups can be given by index, as a list of indexes or by one of the
+        named scopes. Groups to the left or right of the active group are
+        those whose cells lie entirely to that side of it.
+    """
+    num_groups: int = len(cells)
+
+    if spec is None or spec == GROUPS_ALL:
+        return list(range(num_groups))
+    if spec == GROUPS_ACTIVE:
+        return [active_group]
+    if spec == GROUPS_OTHERS:
+        return [group for group in range(num_groups) if group != active_group]
+    if spec == GROUPS_LEFT:
+        return [
+            group for group in range(num_groups)
+            if cells[group][2] <= cells[active_group][0]
+        ]
+    if spec == GROUPS_RIGHT:
+        return [
+            group for group in range(num_groups)
+            if cells[group][0] >= cells[active_group][2]
+        ]
+
+    indexes: Sequence[Any] = [spec] if isinstance(spec, int) else spec
+    if not isinstance(indexes, (list, tuple)):
+        raise ValueError(f"Unknown groups: {spec}")
+
+    groups: List[int] = []
+    for group in indexes:
+        if (
+            isinstance(group, bool)
+            or not isinstance(group, int)
+            or group < 0
+            or group >= num_groups
+        ):
+            raise ValueError(f"Unknown group: {group}")
+        if group not in groups:
+            groups.append(group)
+    return groups
+
+
+class CachedList(NamedTuple):
+    """A formatted list of tabs, along with what's needed to act on it."""
+    items: Tuple[Any, ...]
+    formatted: List[List[str]]
+    current_tab_idx: int
+    pinned_count: int
+
+
+class GroupListCache(object):
+    """Caches the formatted list of tabs for each scope of groups, so
+        switching between scopes reuses lists which haven't changed.
+
+        Each list is stored with a signature of everything it was formatted
+        from, and is only reused while the signature is unchanged.
+    """
+    _lists: "OrderedDict[Hashable, Tuple[Hashable, CachedList]]"
+    max_scopes: int
+
+    def __init__(self, max_scopes: int = MAX_SCOPES) -> None:
+        """Initialise the cache, keeping at most max_scopes lists."""
+        self._lists = OrderedDict()
+        self.max_scopes = max_scopes
+
+    def get(
+        self,
+        scope: Hashable,
+        signature: Hashable
+    ) -> Optional[CachedList]:
+        """Gets the list for the scope, if it's still current."""
+        entry: Optional[Tuple[Hashable, CachedList]] = self._lists.get(scope)
+        if entry is None or entry[0] != signature:
+            return None
+        self._lists.move_to_end(scope)
+        return entry[1]
+
+    def put(
+        self,
+        scope: Hashable,
+        signature: Hashable,
+        cached: CachedList
+    ) -> None:
+        """Caches the list for the scope, dropping the least recently used
+            scope if there are too many.
+        """
+        self._lists[scope] = (signature, cached)
+        self._lists.move_to_end(scope)
+        while len(self._lists) > self.max_scopes:
+            self._lists.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forgets every list."""
+        self._lists.clear()
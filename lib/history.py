@@ -0,0 +1,212 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from collections import OrderedDict, deque
+from threading import Lock
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+EVICTION_LOG_SIZE: int = 100
+# The number of tab jumps kept per window, to go back and forward through.
+NAVIGATION_SIZE: int = 100
+
+
+class ActivationHistory(object):
+    """Tracks the order views were activated in, per window."""
+    _windows: Dict[int, "OrderedDict[int, None]"]
+    _view_windows: Dict[int, int]
+    _lock: Lock
+
+    def __init__(self) -> None:
+        """Initialise the history."""
+        self._windows = {}
+        self._view_windows = {}
+        self._lock = Lock()
+
+    def touch(self, window_id: int, view_id: int) -> None:
+        """Records the view as the most recently activated in its window."""
+        with self._lock:
+            previous: int = self._view_windows.get(view_id, window_id)
+            if previous != window_id:
+                # The view has been moved between windows.
+                self._windows[previous].pop(view_id, None)
+
+            history: "OrderedDict[int, None]"
+            history = self._windows.setdefault(window_id, OrderedDict())
+            history[view_id] = None
+            history.move_to_end(view_id)
+            self._view_windows[view_id] = window_id
+
+    def discard(self, view_id: int) -> None:
+        """Forgets a view, e.g. once it's been closed."""
+        with self._lock:
+            window_id = self._view_windows.pop(view_id, None)
+            if window_id is not None:
+                self._windows[window_id].pop(view_id, None)
+
+    def most_recent(self, window_id: int) -> List[int]:
+        """Gets the ids of views in the window, most recently used first."""
+        with self._lock:
+            return list(reversed(self._windows.get(window_id, {})))
+
+    def least_recent(
+        self,
+        window_id: int,
+        view_ids: Iterable[int]
+    ) -> List[int]:
+        """Orders the given view ids from least to most recently used, with
+            views that were never activated first.
+        """
+        with self._lock:
+            history = self._windows.get(window_id, OrderedDict())
+            ranks: Dict[int, int] = {
+                view_id: rank for (rank, view_id) in enumerate(history)
+            }
+
+        return sorted(view_ids, key=lambda view_id: ranks.get(view_id, -1))
+
+
+class NavigationStack(object):
+    """Tracks the tabs jumped between in each window, to go back and
+        forward through them as a browser would.
+
+        Going back and then jumping to another tab drops the tabs that were
+        ahead, and only the most recent jumps are kept. Closed tabs aren't
+        removed, but skipped over as they're reached.
+    """
+    _entries: Dict[int, List[int]]
+    _positions: Dict[int, int]
+    size: int
+    _lock: Lock
+
+    def __init__(self, size: int = NAVIGATION_SIZE) -> None:
+        """Initialise the stack, keeping at most size jumps per window."""
+        self._entries = {}
+        self._positions = {}
+        self.size = size
+        self._lock = Lock()
+
+    def record(self, window_id: int, view_id: int) -> None:
+        """Records a jump to the view, unless it's already the current
+            position, e.g. having just gone back or forward to it.
+        """
+        with self._lock:
+            entries: List[int] = self._entries.setdefault(window_id, [])
+            position: int = self._positions.get(window_id, -1)
+            if position > -1 and entries[position] == view_id:
+                return
+
+            del entries[position + 1:]
+            entries.append(view_id)
+            if len(entries) > self.size:
+                del entries[:len(entries) - self.size]
+            self._positions[window_id] = len(entries) - 1
+
+    def back(
+        self,
+        window_id: int,
+        is_open: Callable[[int], bool]
+    ) -> Optional[int]:
+        """Moves back to the previous open view, other than the current
+            one, getting its id, or None if there isn't one.
+        """
+        return self._move(window_id, -1, is_open)
+
+    def forward(
+        self,
+        window_id: int,
+        is_open: Callable[[int], bool]
+    ) -> Optional[int]:
+        """Moves forward to the next open view, other than the current
+            one, getting its id, or None if there isn't one.
+        """
+        return self._move(window_id, 1, is_open)
+
+    def go_to(self, window_id: int, position: int) -> None:
+        """Moves to the given position, e.g. as chosen from the entries."""
+        with self._lock:
+            if 0 <= position < len(self._entries.get(window_id, ())):
+                self._positions[window_id] = position
+
+    def entries(self, window_id: int) -> Tuple[List[int], int]:
+        """Gets the ids of the views jumped between in the window, oldest
+            first, along with the current position among them.
+        """
+        with self._lock:
+            return (
+                list(self._entries.get(window_id, ())),
+                self._positions.get(window_id, -1)
+            )
+
+    def discard_window(self, window_id: int) -> None:
+        """Forgets a window, e.g. once it's been closed."""
+        with self._lock:
+            self._entries.pop(window_id, None)
+            self._positions.pop(window_id, None)
+
+    def _move(
+        self,
+        window_id: int,
+        step: int,
+        is_open: Callable[[int], bool]
+    ) -> Optional[int]:
+        """Moves by step until reaching an open view other than the
+            current one.
+        """
+        with self._lock:
+            entries: List[int] = self._entries.get(window_id, [])
+            position: int = self._positions.get(window_id, -1)
+            if position < 0:
+                return None
+
+            current: int = entries[position]
+            position = position + step
+            while 0 <= position < len(entries):
+                view_id: int = entries[position]
+                if view_id != current and is_open(view_id):
+                    self._positions[window_id] = position
+                    return view_id
+                position = position + step
+            return None
+
+
+def select_evictions(
+    view_ids: List[int],
+    excess: int,
+    is_evictable: Callable[[int], bool]
+) -> List[int]:
+    """Selects up to `excess` evictable views, taken in the given order."""
+    evictions: List[int] = []
+
+    for view_id in view_ids:
+        if len(evictions) >= excess:
+            break
+        if is_evictable(view_id):
+            evictions.append(view_id)
+
+    return evictions
+
+
+class EvictionLog(object):
+    """Bounded log of the files most recently closed by eviction."""
+    _entries: Deque[str]
+
+    def __init__(self, size: int = EVICTION_LOG_SIZE) -> None:
+        """Initialise the log."""
+        self._entries = deque(maxlen=size)
+
+    def record(self, file_names: Iterable[str]) -> None:
+        """Records evicted files."""
+        for file_name in file_names:
+            # Keep only the most recent entry for each file.
+            if file_name in self._entries:
+                self._entries.remove(file_name)
+            self._entries.append(file_name)
+
+    def discard(self, file_name: str) -> None:
+        """Removes a file from the log, e.g. once it's been reopened."""
+        if file_name in self._entries:
+            self._entries.remove(file_name)
+
+    def entries(self) -> List[str]:
+        """Gets the evicted files, most recently evicted first."""
+        return list(reversed(self._entries))
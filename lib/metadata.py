@@ -0,0 +1,218 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+import mmap
+import os
+from functools import partial
+from threading import RLock
+from time import localtime, monotonic, strftime
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+from .pool import get_executor
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# Files at least this large are counted via a memory map rather than read.
+MMAP_THRESHOLD: int = 1024 * 1024
+CHUNK_SIZE: int = 1024 * 1024
+
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+# How often, in seconds, cached files are checked for changes on request.
+REVALIDATE_INTERVAL: float = 30.0
+
+
+class FileMetadata(NamedTuple):
+    """On-disk metadata for a single file."""
+    size: int
+    mtime: float
+    lines: int
+
+
+def count_lines(file_name: str, size: int) -> int:
+    """Counts the lines in the given file."""
+    if size == 0:
+        return 0
+
+    with open(file_name, "rb") as handle:
+        if size < MMAP_THRESHOLD:
+            data: bytes = handle.read()
+            return data.count(b"\n") + (0 if data.endswith(b"\n") else 1)
+
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            lines: int = 0
+            length: int = len(mapped)
+            for offset in range(0, length, CHUNK_SIZE):
+                lines = lines + mapped[offset:offset + CHUNK_SIZE].count(b"\n")
+            if mapped[length - 1:length] != b"\n":
+                lines = lines + 1
+            return lines
+
+
+def format_size(size: int) -> str:
+    """Formats a size in bytes for humans, e.g. "1.5 MB"."""
+    value: float = float(size)
+    for unit in SIZE_UNITS:
+        if value < 1024 or unit == SIZE_UNITS[-1]:
+            break
+        value = value / 1024
+
+    if unit == SIZE_UNITS[0]:
+        return f"{size} {unit}"
+    return f"{value:.1f} {unit}"
+
+
+def format_mtime(mtime: float) -> str:
+    """Formats a modification time for display."""
+    return strftime("%Y-%m-%d %H:%M", localtime(mtime))
+
+
+def get_metadata_captions(
+    metadata: FileMetadata,
+    show_size: bool = True,
+    show_lines: bool = True,
+    show_mtime: bool = True
+) -> List[str]:
+    """Gets the captions describing a file's metadata."""
+    captions: List[str] = []
+    if show_size is True:
+        captions.append(f"Size: {format_size(metadata.size)}")
+    if show_lines is True:
+        captions.append(f"Lines: {metadata.lines:,}")
+    if show_mtime is True:
+        captions.append(f"Modified: {format_mtime(metadata.mtime)}")
+    return captions
+
+
+class MetadataCache(object):
+    """Caches file metadata, computing it in the background.
+
+        Requested files are only checked again once REVALIDATE_INTERVAL has
+        passed since their last check, so requesting cached files is only a
+        dictionary lookup. Files known to have changed, e.g. once saved, can
+        be revalidated straight away.
+    """
+    _entries: Dict[str, FileMetadata]
+    _pending: Dict[str, "Future"]
+    _checked: Dict[str, float]
+    _lock: RLock
+
+    def __init__(self) -> None:
+        """Initialise the cache."""
+        self._entries = {}
+        self._pending = {}
+        # When each file was last checked, as a monotonic time.
+        self._checked = {}
+        self._lock = RLock()
+
+    def get(self, file_name: str) -> Optional[FileMetadata]:
+        """Gets the cached metadata for a file, if it's been computed."""
+        return self._entries.get(file_name)
+
+    def request(self, file_names: Iterable[str]) -> List["Future"]:
+        """Schedules a background check of each file which hasn't been
+            checked recently, recomputing metadata only where the file's
+            size or modification time has changed. Returns the futures for
+            the files still being checked.
+        """
+        return self._schedule(file_names, REVALIDATE_INTERVAL)
+
+    def revalidate(self, file_names: Iterable[str]) -> List["Future"]:
+        """Schedules a background check of each file, however recently it
+            was checked, e.g. once it's been saved.
+        """
+        return self._schedule(file_names, 0.0)
+
+    def _schedule(
+        self,
+        file_names: Iterable[str],
+        interval: float
+    ) -> List["Future"]:
+        """Schedules a background check of each file not checked within the
+            interval, getting the futures for the files being checked.
+        """
+        futures: List["Future"] = []
+        submitted: List[Tuple[str, "Future"]] = []
+        now: float = monotonic()
+
+        with self._lock:
+            for file_name in set(file_names):
+                future: Optional["Future"] = self._pending.get(file_name)
+                if future is None:
+                    checked: Optional[float] = self._checked.get(file_name)
+                    if checked is not None and now - checked < interval:
+                        continue
+                    self._checked[file_name] = now
+                    future = get_executor().submit(self._refresh, file_name)
+                    self._pending[file_name] = future
+                    submitted.append((file_name, future))
+                futures.append(future)
+
+        for (file_name, future) in submitted:
+            future.add_done_callback(partial(self._discard, file_name))
+
+        return futures
+
+    def invalidate(self, file_name: str) -> None:
+        """Drops the cached metadata for a file."""
+        with self._lock:
+            self._entries.pop(file_name, None)
+            self._checked.pop(file_name, None)
+
+    def clear(self) -> None:
+        """Clears all cached metadata."""
+        with self._lock:
+            self._entries.clear()
+            self._checked.clear()
+
+    def _refresh(self, file_name: str) -> None:
+        """Computes the metadata for a file if it's missing or outdated."""
+        try:
+            stat: os.stat_result = os.stat(file_name)
+            cached: Optional[FileMetadata] = self._entries.get(file_name)
+
+            if (
+                cached is not None
+                and cached.size == stat.st_size
+                and cached.mtime == stat.st_mtime
+            ):
+                return
+
+            metadata: FileMetadata = FileMetadata(
+                stat.st_size,
+                stat.st_mtime,
+                count_lines(file_name, stat.st_size)
+            )
+
+            with self._lock:
+                self._entries[file_name] = metadata
+        except (OSError, ValueError):
+            # The file may have been removed or be unreadable, in which
+            # case there's nothing to show for it.
+            with self._lock:
+                self._entries.pop(file_name, None)
+
+    def _discard(self, file_name: str, future: "Future") -> None:
+        """Stops tracking a finished computation."""
+        with self._lock:
+            if self._pending.get(file_name) is future:
+                del self._pending[file_name]
+
+
+_cache: Optional[MetadataCache] = None
+
+
+def get_metadata_cache() -> MetadataCache:
+    """Gets the shared metadata cache."""
+    global _cache
+    if _cache is None:
+        _cache = MetadataCache()
+    return _cache
@@ -0,0 +1,95 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from os import path
+from typing import Dict, List, Optional, Tuple
+
+# Stands in for the directories left out of an elided path.
+ELLIPSIS: str = "…"
+# Stands in for the prefix shared by every path, once it's been truncated.
+PREFIX_MARKER: str = "..."
+
+# The number of directories kept before the cache is cleared, so it can't
+# grow without bound as tabs come and go.
+MAX_DIRECTORIES: int = 4096
+
+
+def get_elisions(directory: str, sep: str = path.sep) -> Tuple[str, ...]:
+    """Gets the ways of shortening a directory by eliding its middle
+        components, from the longest, i.e. the directory itself, to the
+        shortest, always keeping its first and last components.
+
+        Components nearest the end are kept in preference, being the most
+        specific to the files within the directory.
+    """
+    components: List[str] = directory.split(sep)
+    if len(components) > 1 and components[0] in ("", PREFIX_MARKER):
+        # Keep the root of absolute paths, or the marker of a truncated
+        # prefix, along with the first directory.
+        components = [
+            components[0] + sep + components[1]
+        ] + components[2:]
+
+    if len(components) < 3:
+        return (directory,)
+
+    first: str = components[0]
+    elisions: List[str] = [directory]
+    for start in range(2, len(components)):
+        elisions.append(sep.join([first, ELLIPSIS] + components[start:]))
+    return tuple(elisions)
+
+
+class ElisionCache(object):
+    """Caches the ways of shortening each directory, so each is only split
+        up once however many tabs there are within it.
+    """
+    _elisions: Dict[str, Tuple[str, ...]]
+
+    def __init__(self) -> None:
+        """Initialise the cache."""
+        self._elisions = {}
+
+    def get_elisions(self, directory: str) -> Tuple[str, ...]:
+        """Gets the ways of shortening the directory, from the cache if
+            it's been seen before.
+        """
+        elisions: Optional[Tuple[str, ...]] = self._elisions.get(directory)
+        if elisions is None:
+            if len(self._elisions) >= MAX_DIRECTORIES:
+                self._elisions.clear()
+            elisions = get_elisions(directory)
+            self._elisions[directory] = elisions
+        return elisions
+
+    def elide(self, file_path: str, width: int) -> str:
+        """Shortens the path to fit within the width, if it can, by eliding
+            the middle components of its directory. The file name and the
+            first and last directories are always kept.
+        """
+        if len(file_path) <= width:
+            return file_path
+
+        split: int = file_path.rfind(path.sep)
+        if split < 1:
+            return file_path
+
+        directory: str = file_path[:split]
+        budget: int = width - (len(file_path) - split)
+        elisions: Tuple[str, ...] = self.get_elisions(directory)
+        for elision in elisions:
+            if len(elision) <= budget:
+                return elision + file_path[split:]
+        return elisions[-1] + file_path[split:]
+
+    def clear(self) -> None:
+        """Forgets every directory."""
+        self._elisions.clear()
+
+
+_elision_cache: ElisionCache = ElisionCache()
+
+
+def get_elision_cache() -> ElisionCache:
+    """Gets the shared cache of directory elisions."""
+    return _elision_cache
@@ -0,0 +1,86 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+import json
+import os
+from os import path
+from typing import Optional, Set
+
+
+class PinnedTabs(object):
+    """Set of pinned tabs, keyed by file name or, for buffers, view id.
+
+        Pinned files are persisted so they remain pinned across sessions,
+        whereas buffers are only pinned for as long as their view is open.
+    """
+    store_path: Optional[str]
+    _files: Set[str]
+    _views: Set[int]
+
+    def __init__(self, store_path: Optional[str] = None) -> None:
+        """Initialise the pinned tabs, loading any persisted pins."""
+        self.store_path = store_path
+        self._files = set()
+        self._views = set()
+        self.load()
+
+    def is_pinned(self, file_name: Optional[str], view_id: int) -> bool:
+        """Gets whether the file, or buffer if there's no file, is pinned."""
+        if file_name is not None:
+            return file_name in self._files
+        return view_id in self._views
+
+    def pin(self, file_name: Optional[str], view_id: int) -> None:
+        """Pins the file, or buffer if there's no file."""
+        if file_name is not None:
+            self._files.add(file_name)
+            self.save()
+        else:
+            self._views.add(view_id)
+
+    def unpin(self, file_name: Optional[str], view_id: int) -> None:
+        """Unpins the file, or buffer if there's no file."""
+        if file_name is not None:
+            self._files.discard(file_name)
+            self.save()
+        else:
+            self._views.discard(view_id)
+
+    def toggle(self, file_name: Optional[str], view_id: int) -> bool:
+        """Toggles whether the file or buffer is pinned, returning the new
+            state.
+        """
+        if self.is_pinned(file_name, view_id):
+            self.unpin(file_name, view_id)
+            return False
+        self.pin(file_name, view_id)
+        return True
+
+    def discard_view(self, view_id: int) -> None:
+        """Forgets a closed buffer."""
+        self._views.discard(view_id)
+
+    def load(self) -> None:
+        """Loads the persisted pins, if there are any."""
+        if self.store_path is None:
+            return
+
+        try:
+            with open(self.store_path, "r", encoding="utf-8") as handle:
+                self._files = set(json.load(handle))
+        except (OSError, ValueError, TypeError):
+            self._files = set()
+
+    def save(self) -> None:
+        """Persists the pinned files."""
+        if self.store_path is None:
+            return
+
+        os.makedirs(path.dirname(self.store_path), exist_ok=True)
+        temp_name: str = f"{self.store_path}.tmp"
+
+        with open(temp_name, "w", encoding="utf-8") as handle:
+            json.dump(sorted(self._files), handle, separators=(",", ":"))
+
+        # Replace atomically so a failed write never loses existing pins.
+        os.replace(temp_name, self.store_path)
@@ -0,0 +1,33 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS: int = 4
+
+_executor: Optional["ThreadPoolExecutor"] = None
+
+
+def get_executor() -> "ThreadPoolExecutor":
+    """Gets the shared worker pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        # Imported on first use to keep loading the plugin quick.
+        from concurrent.futures import ThreadPoolExecutor
+
+        _executor = ThreadPoolExecutor(
+            max_workers=MAX_WORKERS,
+            thread_name_prefix="tabfilter"
+        )
+    return _executor
+
+
+def shutdown() -> None:
+    """Shuts down the shared worker pool without waiting on pending work."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
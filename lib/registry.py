@@ -0,0 +1,453 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from os import path
+from threading import Lock
+from types import MappingProxyType
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+# States which views are indexed by.
+STATE_DIRTY: str = "dirty"
+STATE_READ_ONLY: str = "read_only"
+STATE_BUFFERS: str = "buffers"
+
+STATES: FrozenSet[str] = frozenset(
+    (STATE_DIRTY, STATE_READ_ONLY, STATE_BUFFERS)
+)
+
+# Orders views can be sorted in, besides tab order.
+SORT_DIRECTORY: str = "directory"
+SORT_EXTENSION: str = "extension"
+
+SORT_ORDERS: Tuple[str, ...] = (SORT_DIRECTORY, SORT_EXTENSION)
+
+# Identifies what a view shows: its file name, or buffer id for buffers.
+Location = Union[str, int]
+
+# Sorts files before buffers, then by the order's value and name.
+SortKey = Tuple[int, str, str]
+
+# Called with the id of a window whose views have changed.
+Subscriber = Callable[[int], None]
+
+# The keys views are indexed by, i.e. window ids and locations.
+Key = TypeVar("Key", bound=Hashable)
+
+
+class TabRecord(NamedTuple):
+    """The indexed state of a single view."""
+    view_id: int
+    window_id: int
+    buffer_id: int
+    file_name: Optional[str]
+    dirty: bool
+    read_only: bool
+    # The view's name, if it's been given one, e.g. for buffers.
+    name: str = ""
+
+    def states(self) -> FrozenSet[str]:
+        """Gets the states the view is in."""
+        states: Set[str] = set()
+        if self.dirty is True:
+            states.add(STATE_DIRTY)
+        if self.read_only is True:
+            states.add(STATE_READ_ONLY)
+        if self.file_name is None:
+            states.add(STATE_BUFFERS)
+        return frozenset(states)
+
+    def location(self) -> Location:
+        """Gets what the view shows, which is shared by its duplicates."""
+        if self.file_name is None:
+            return self.buffer_id
+        return self.file_name
+
+    def sort_keys(self) -> Tuple[SortKey, ...]:
+        """Gets the keys the view is sorted by, one per order in
+            SORT_ORDERS.
+        """
+        if self.file_name is None:
+            key: SortKey = (1, "", self.name.lower())
+            return (key, key)
+
+        (directory, name) = path.split(self.file_name.lower())
+        return (
+            (0, directory, name),
+            (0, path.splitext(name)[1], name),
+        )
+
+
+class RegistrySnapshot(NamedTuple):
+    """An immutable view of every indexed view, as of a given version.
+
+        Snapshots are never changed once published, so they can be read from
+        any thread without locking, and always reflect a whole number of
+        batches of changes.
+    """
+    version: int
+    records: Mapping[int, TabRecord]
+    # The views in each window, and in each state by window.
+    windows: Mapping[int, FrozenSet[int]]
+    indexes: Mapping[str, Mapping[int, FrozenSet[int]]]
+    locations: Mapping[Location, FrozenSet[int]]
+    # The keys of each view, and the views in each window in each order.
+    sort_keys: Mapping[int, Tuple[SortKey, ...]]
+    orders: Mapping[str, Mapping[int, Tuple[Tuple[SortKey, int], ...]]]
+
+    def get(self, view_id: int) -> Optional[TabRecord]:
+        """Gets the record for a view, if it's been indexed."""
+        return self.records.get(view_id)
+
+    def get_views(self, window_id: int, state: str) -> List[int]:
+        """Gets the ids of the views in the window which are in the given
+            state.
+        """
+        if state not in STATES:
+            raise ValueError(f"Unknown tab state: {state}")
+        return list(self.indexes[state].get(window_id, ()))
+
+    def get_records(self, window_id: int) -> List[TabRecord]:
+        """Gets the records of every view in the window."""
+        return [
+            self.records[view_id]
+            for view_id in self.windows.get(window_id, ())
+        ]
+
+    def count_locations(self, location: Location) -> int:
+        """Gets the number of views showing the location, in any window."""
+        return len(self.locations.get(location, ()))
+
+    def get_sorted(self, window_id: int, order: str) -> List[int]:
+        """Gets the ids of the views in the window, in the given order."""
+        if order not in SORT_ORDERS:
+            raise ValueError(f"Unknown sort order: {order}")
+        return [
+            view_id for (_, view_id) in self.orders[order].get(window_id, ())
+        ]
+
+    def get_duplicates(self, window_id: int) -> List[List[int]]:
+        """Gets the ids of views in the window which show the same location
+            as one another, grouped by location.
+        """
+        duplicates: List[List[int]] = []
+        for views in self.locations.values():
+            if len(views) < 2:
+                continue
+            in_window: List[int] = [
+                view_id for view_id in views
+                if self.records[view_id].window_id == window_id
+            ]
+            if len(in_window) > 1:
+                duplicates.append(in_window)
+        return duplicates
+
+
+def empty_snapshot(version: int = 0) -> RegistrySnapshot:
+    """Gets a snapshot without any views."""
+    return RegistrySnapshot(
+        version,
+        MappingProxyType({}),
+        MappingProxyType({}),
+        MappingProxyType(
+            {state: MappingProxyType({}) for state in STATES}
+        ),
+        MappingProxyType({}),
+        MappingProxyType({}),
+        MappingProxyType(
+            {order: MappingProxyType({}) for order in SORT_ORDERS}
+        )
+    )
+
+
+class RegistryBatch(object):
+    """A batch of changes to the registry, made to copies of the current
+        snapshot's indexes and published together.
+    """
+    changed: Set[int]
+    _records: Dict[int, TabRecord]
+    _windows: Dict[int, FrozenSet[int]]
+    _indexes: Dict[str, Dict[int, FrozenSet[int]]]
+    _locations: Dict[Location, FrozenSet[int]]
+    _sort_keys: Dict[int, Tuple[SortKey, ...]]
+    _orders: Dict[str, Dict[int, Tuple[Tuple[SortKey, int], ...]]]
+    _sorting: Dict[Tuple[str, int], List[Tuple[SortKey, int]]]
+
+    def __init__(self, snapshot: RegistrySnapshot) -> None:
+        """Initialise the batch from the snapshot it changes."""
+        # The ids of the windows whose views have changed.
+        self.changed = set()
+        self._records = dict(snapshot.records)
+        self._windows = dict(snapshot.windows)
+        self._indexes = {
+            state: dict(index) for (state, index) in snapshot.indexes.items()
+        }
+        self._locations = dict(snapshot.locations)
+        self._sort_keys = dict(snapshot.sort_keys)
+        self._orders = {
+            order: dict(views) for (order, views) in snapshot.orders.items()
+        }
+        # Orders being changed by the batch, by order and window, which are
+        # kept sorted as views are added and removed.
+        self._sorting = {}
+
+    def get(self, view_id: int) -> Optional[TabRecord]:
+        """Gets the record for a view, including changes in the batch."""
+        return self._records.get(view_id)
+
+    def update(self, record: TabRecord) -> None:
+        """Adds or updates the record for a view."""
+        previous: Optional[TabRecord] = self._records.get(record.view_id)
+        if previous == record:
+            return
+        if previous is not None:
+            self._unindex(previous)
+            self.changed.add(previous.window_id)
+        self._records[record.view_id] = record
+        self._index(record)
+        self.changed.add(record.window_id)
+
+    def discard(self, view_id: int) -> None:
+        """Forgets a view, e.g. once it's been closed."""
+        record: Optional[TabRecord] = self._records.pop(view_id, None)
+        if record is not None:
+            self._unindex(record)
+            self.changed.add(record.window_id)
+
+    def freeze(self, version: int) -> RegistrySnapshot:
+        """Gets the snapshot of the batch's changes, as the given version."""
+        for ((order, window_id), views) in self._sorting.items():
+            if len(views) > 0:
+                self._orders[order][window_id] = tuple(views)
+            else:
+                self._orders[order].pop(window_id, None)
+        self._sorting = {}
+
+        return RegistrySnapshot(
+            version,
+            MappingProxyType(self._records),
+            MappingProxyType(self._windows),
+            MappingProxyType({
+                state: MappingProxyType(index)
+                for (state, index) in self._indexes.items()
+            }),
+            MappingProxyType(self._locations),
+            MappingProxyType(self._sort_keys),
+            MappingProxyType({
+                order: MappingProxyType(views)
+                for (order, views) in self._orders.items()
+            })
+        )
+
+    def _index(self, record: TabRecord) -> None:
+        """Adds the record to the indexes of its location, states and
+            orders.
+        """
+        add_view(self._locations, record.location(), record.view_id)
+        add_view(self._windows, record.window_id, record.view_id)
+        for state in record.states():
+            add_view(self._indexes[state], record.window_id, record.view_id)
+
+        # Keys are computed once per change, rather than per sort.
+        keys: Tuple[SortKey, ...] = record.sort_keys()
+        self._sort_keys[record.view_id] = keys
+        for (order, key) in zip(SORT_ORDERS, keys):
+            insort(
+                self._get_sorting(order, record.window_id),
+                (key, record.view_id)
+            )
+
+    def _unindex(self, record: TabRecord) -> None:
+        """Removes the record from the indexes of its location, states and
+            orders.
+        """
+        remove_view(self._locations, record.location(), record.view_id)
+        remove_view(self._windows, record.window_id, record.view_id)
+        for state in record.states():
+            remove_view(
+                self._indexes[state],
+                record.window_id,
+                record.view_id
+            )
+
+        keys: Tuple[SortKey, ...] = self._sort_keys.pop(record.view_id)
+        for (order, key) in zip(SORT_ORDERS, keys):
+            views: List[Tuple[SortKey, int]]
+            views = self._get_sorting(order, record.window_id)
+            idx: int = bisect_left(views, (key, record.view_id))
+            del views[idx]
+
+    def _get_sorting(
+        self,
+        order: str,
+        window_id: int
+    ) -> List[Tuple[SortKey, int]]:
+        """Gets the window's views in the given order, to be changed by the
+            batch, copying them from the snapshot the first time.
+        """
+        views: Optional[List[Tuple[SortKey, int]]]
+        views = self._sorting.get((order, window_id))
+        if views is None:
+            views = list(self._orders[order].get(window_id, ()))
+            self._sorting[(order, window_id)] = views
+        return views
+
+
+def add_view(
+    index: Dict[Key, FrozenSet[int]],
+    key: Key,
+    view_id: int
+) -> None:
+    """Adds a view to an index, replacing rather than changing its set, which
+        may be shared with published snapshots.
+    """
+    index[key] = index.get(key, frozenset()) | {view_id}
+
+
+def remove_view(
+    index: Dict[Key, FrozenSet[int]],
+    key: Key,
+    view_id: int
+) -> None:
+    """Removes a view from an index, dropping its key once it's empty."""
+    views: FrozenSet[int] = index.get(key, frozenset()) - {view_id}
+    if len(views) > 0:
+        index[key] = views
+    else:
+        index.pop(key, None)
+
+
+class TabRegistry(object):
+    """Indexes open views by state, per window.
+
+        The registry is kept up to date by event listeners, so the views in a
+        given state can be listed in time proportional to the number of
+        matches, rather than checking every open view. Views are also
+        indexed by location, so duplicates, i.e. the same file or buffer open
+        in several places, are found without comparing views pairwise.
+
+        The indexes are published as immutable, versioned snapshots. Writers
+        make their changes in batches, each of which is swapped in as a new
+        snapshot at once, so readers never lock and never see part of a
+        batch. A snapshot should be taken once and read throughout when
+        several reads need to agree with one another.
+
+        Subscribers are notified whenever a view is added, changed or
+        removed, along with the id of its window.
+    """
+    _snapshot: RegistrySnapshot
+    _subscribers: Dict[int, Subscriber]
+    _next_token: int
+    _lock: Lock
+
+    def __init__(self) -> None:
+        """Initialise the registry."""
+        self._snapshot = empty_snapshot()
+        self._subscribers = {}
+        self._next_token = 0
+        # Serialises writers; readers only ever read the current snapshot.
+        self._lock = Lock()
+
+    def snapshot(self) -> RegistrySnapshot:
+        """Gets the current snapshot of every indexed view."""
+        return self._snapshot
+
+    @contextmanager
+    def batch(self) -> Iterator[RegistryBatch]:
+        """Makes a batch of changes, which are published together once the
+            block exits, or not at all if it raises. Batches can't be nested.
+        """
+        with self._lock:
+            batch: RegistryBatch = RegistryBatch(self._snapshot)
+            yield batch
+            if len(batch.changed) == 0:
+                return
+            self._snapshot = batch.freeze(self._snapshot.version + 1)
+
+        self._notify(batch.changed)
+
+    def update(self, record: TabRecord) -> None:
+        """Adds or updates the record for a view."""
+        if self._snapshot.get(record.view_id) == record:
+            # Most events leave the view unchanged, so skip copying.
+            return
+        with self.batch() as batch:
+            batch.update(record)
+
+    def discard(self, view_id: int) -> None:
+        """Forgets a view, e.g. once it's been closed."""
+        if self._snapshot.get(view_id) is None:
+            return
+        with self.batch() as batch:
+            batch.discard(view_id)
+
+    def get(self, view_id: int) -> Optional[TabRecord]:
+        """Gets the record for a view, if it's been indexed."""
+        return self._snapshot.get(view_id)
+
+    def get_views(self, window_id: int, state: str) -> List[int]:
+        """Gets the ids of the views in the window which are in the given
+            state.
+        """
+        return self._snapshot.get_views(window_id, state)
+
+    def get_records(self, window_id: int) -> List[TabRecord]:
+        """Gets the records of every view in the window."""
+        return self._snapshot.get_records(window_id)
+
+    def count_locations(self, location: Location) -> int:
+        """Gets the number of views showing the location, in any window."""
+        return self._snapshot.count_locations(location)
+
+    def get_sorted(self, window_id: int, order: str) -> List[int]:
+        """Gets the ids of the views in the window, in the given order."""
+        return self._snapshot.get_sorted(window_id, order)
+
+    def get_duplicates(self, window_id: int) -> List[List[int]]:
+        """Gets the ids of views in the window which show the same location
+            as one another, grouped by location.
+        """
+        return self._snapshot.get_duplicates(window_id)
+
+    def subscribe(self, subscriber: Subscriber) -> int:
+        """Subscribes to changes, returning a token to unsubscribe with."""
+        with self._lock:
+            self._next_token = self._next_token + 1
+            self._subscribers[self._next_token] = subscriber
+            return self._next_token
+
+    def unsubscribe(self, token: int) -> None:
+        """Stops notifying the subscriber with the given token."""
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    def clear(self) -> None:
+        """Forgets all views."""
+        with self._lock:
+            self._snapshot = empty_snapshot(self._snapshot.version + 1)
+
+    def _notify(self, window_ids: Set[int]) -> None:
+        """Notifies subscribers of changes to the given windows, outside of
+            the lock so they're free to query or change the registry.
+        """
+        with self._lock:
+            subscribers: List[Subscriber] = list(self._subscribers.values())
+
+        for window_id in window_ids:
+            for subscriber in subscribers:
+                subscriber(window_id)
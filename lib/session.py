@@ -0,0 +1,368 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+import json
+import re
+from typing import (
+    IO,
+    Any,
+    Dict,
+    FrozenSet,
+    Generator,
+    Iterator,
+    List,
+    Match,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+# The amount read at a time, which is doubled while a single token, such as
+# the contents of a large unsaved buffer, is still incomplete.
+CHUNK_SIZE: int = 64 * 1024
+
+# Kinds of token in a JSON document.
+TOKEN_PUNCTUATION: str = "punctuation"
+TOKEN_STRING: str = "string"
+TOKEN_LITERAL: str = "literal"
+
+# Kinds of entry recorded for each window.
+ENTRY_BUFFER: str = "buffer"
+ENTRY_SHEET: str = "sheet"
+
+# The key sessions keep the contents of unsaved buffers under.
+CONTENTS_KEY: str = "contents"
+
+TOKEN_PATTERN = re.compile(
+    r"""[ \t\r\n]*(?:
+        (?P<punctuation>[{}\[\]:,])
+        | (?P<literal>
+            true|false|null
+            | -?[0-9]+(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?
+        )
+    )""",
+    re.VERBOSE
+)
+WHITESPACE_PATTERN = re.compile(r"[ \t\r\n]*")
+LITERAL_DELIMITERS: FrozenSet[str] = frozenset(" \t\r\n,]}")
+
+Token = Tuple[str, str]
+Path = Tuple[Union[str, int], ...]
+
+
+class SessionEntry(NamedTuple):
+    """A buffer or sheet recorded for a window in a session file."""
+    kind: str
+    window: int
+    group: int
+    position: int
+    # The entry's top level values, and those of its settings, without any
+    # of its nested values such as the contents of unsaved buffers.
+    values: Dict[str, Any]
+
+
+class SessionRecord(NamedTuple):
+    """A tab recorded in a session or workspace file."""
+    window: int
+    group: int
+    file_name: Optional[str]
+    name: str
+    # Whether the tab has unsaved changes, which sessions keep the contents
+    # of.
+    dirty: bool
+
+
+def skip_whitespace(buffer: str, position: int) -> int:
+    """Gets the position of the first character which isn't whitespace, at
+        or after the given position.
+    """
+    match: Optional[Match[str]] = WHITESPACE_PATTERN.match(buffer, position)
+    if match is None:
+        # The pattern matches empty strings, so this is never reached.
+        return position
+    return match.end()
+
+
+def match_token(
+    buffer: str,
+    position: int,
+    finished: bool
+) -> Optional[Tuple[str, int, int]]:
+    """Matches the token at the position in the buffer, getting its kind,
+        start and end, or None if it's incomplete or there isn't one.
+    """
+    start: int = skip_whitespace(buffer, position)
+    if start == len(buffer):
+        return None
+
+    if buffer[start] == '"':
+        # Strings are found without a regular expression, which would use
+        # memory in proportion to the escapes within them.
+        end: int = buffer.find('"', start + 1)
+        while end > -1:
+            # Quotes after an odd number of backslashes are escaped.
+            escapes: int = 0
+            while buffer[end - escapes - 1] == "\\":
+                escapes = escapes + 1
+            if escapes % 2 == 0:
+                return (TOKEN_STRING, start, end + 1)
+            end = buffer.find('"', end + 1)
+        return None
+
+    match = TOKEN_PATTERN.match(buffer, start)
+    if match is None:
+        return None
+    kind: str = str(match.lastgroup)
+    # Literals, e.g. numbers, are only complete once they're followed by a
+    # delimiter, as they may continue in the next chunk.
+    if (
+        kind == TOKEN_LITERAL
+        and finished is False
+        and buffer[match.end():match.end() + 1] not in LITERAL_DELIMITERS
+    ):
+        return None
+    return (kind, match.start(kind), match.end())
+
+
+def iter_tokens(
+    handle: IO[str],
+    chunk_size: int = CHUNK_SIZE
+) -> Iterator[Token]:
+    """Yields the tokens of a JSON document, reading it a chunk at a time
+        rather than all at once. Strings are left encoded, so those which
+        aren't needed are never decoded.
+    """
+    buffer: str = ""
+    position: int = 0
+    size: int = chunk_size
+    finished: bool = False
+
+    while True:
+        token: Optional[Tuple[str, int, int]]
+        token = match_token(buffer, position, finished)
+
+        if token is None:
+            if finished is True:
+                rest: int = skip_whitespace(buffer, position)
+                if rest < len(buffer):
+                    raise ValueError(
+                        f"Invalid JSON at: {buffer[rest:rest + 20]}"
+                    )
+                return
+            chunk: str = handle.read(size)
+            finished = len(chunk) == 0
+            if position == 0 and len(buffer) > 0:
+                # Nothing was consumed, so the token is larger than a chunk.
+                size = size * 2
+            else:
+                size = chunk_size
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+
+        (kind, start, position) = token
+        yield (kind, buffer[start:position])
+
+
+class SessionParser(object):
+    """Extracts the buffers and sheets recorded for each window from a
+        session or workspace file, as the file is read.
+
+        Session files record each window under "windows", whereas workspace
+        files record a single window at their top level. Only the entries
+        themselves are kept, so unsaved contents and the rest of the file
+        are read past without being loaded.
+    """
+    _tokens: Iterator[Token]
+
+    def __init__(self, tokens: Iterator[Token]) -> None:
+        """Initialise the parser with the tokens to parse."""
+        self._tokens = tokens
+
+    def parse(self) -> Iterator[SessionEntry]:
+        """Yields the buffers and sheets in the order they're recorded."""
+        yield from self._value(self._next(), ())
+
+    def _next(self) -> Token:
+        """Gets the next token, failing if there are none left."""
+        token: Optional[Token] = next(self._tokens, None)
+        if token is None:
+            raise ValueError("Unexpected end of JSON")
+        return token
+
+    def _expect(self, punctuation: str) -> None:
+        """Consumes the given punctuation, failing if it's not next."""
+        if self._next() != (TOKEN_PUNCTUATION, punctuation):
+            raise ValueError(f"Expected '{punctuation}' in JSON")
+
+    def _value(
+        self,
+        token: Token,
+        path: Path
+    ) -> Generator[SessionEntry, None, None]:
+        """Walks a value, yielding any entries within it."""
+        entry: Optional[Tuple[str, int, int, int]] = get_entry(path)
+        if entry is not None:
+            values: Any = self._collect(token, 2)
+            if isinstance(values, dict):
+                yield SessionEntry(*entry, values)
+            return
+
+        if token == (TOKEN_PUNCTUATION, "{"):
+            for (key, child) in self._items():
+                yield from self._value(child, path + (key,))
+        elif token == (TOKEN_PUNCTUATION, "["):
+            for (idx, child) in enumerate(self._elements()):
+                yield from self._value(child, path + (idx,))
+        elif token[0] == TOKEN_PUNCTUATION:
+            raise ValueError(f"Unexpected '{token[1]}' in JSON")
+
+    def _items(self) -> Iterator[Tuple[str, Token]]:
+        """Yields the keys of an object, each along with the first token of
+            its value, which must be consumed before the next is yielded.
+        """
+        token: Token = self._next()
+        if token == (TOKEN_PUNCTUATION, "}"):
+            return
+        while True:
+            if token[0] != TOKEN_STRING:
+                raise ValueError("Expected a key in JSON")
+            key: str = json.loads(token[1])
+            self._expect(":")
+            yield (key, self._next())
+            token = self._next()
+            if token == (TOKEN_PUNCTUATION, "}"):
+                return
+            if token != (TOKEN_PUNCTUATION, ","):
+                raise ValueError("Expected ',' or '}' in JSON")
+            token = self._next()
+
+    def _elements(self) -> Iterator[Token]:
+        """Yields the first token of each element of an array, which must be
+            consumed before the next is yielded.
+        """
+        token: Token = self._next()
+        if token == (TOKEN_PUNCTUATION, "]"):
+            return
+        while True:
+            yield token
+            token = self._next()
+            if token == (TOKEN_PUNCTUATION, "]"):
+                return
+            if token != (TOKEN_PUNCTUATION, ","):
+                raise ValueError("Expected ',' or ']' in JSON")
+            token = self._next()
+
+    def _collect(self, token: Token, depth: int) -> Any:
+        """Builds a value, keeping objects only up to the given depth and
+            their values one level further. Anything deeper, arrays and the
+            contents of unsaved buffers are skipped over without being
+            decoded.
+        """
+        if token[0] == TOKEN_STRING or token[0] == TOKEN_LITERAL:
+            return json.loads(token[1]) if depth >= 0 else None
+
+        if token == (TOKEN_PUNCTUATION, "{"):
+            values: Dict[str, Any] = {}
+            for (key, child) in self._items():
+                if key == CONTENTS_KEY:
+                    # Only whether there are unsaved contents is kept.
+                    self._collect(child, -1)
+                    values[key] = True
+                    continue
+                value: Any = self._collect(child, depth - 1)
+                if value is not None:
+                    values[key] = value
+            return values if depth > 0 else None
+
+        if token == (TOKEN_PUNCTUATION, "["):
+            for child in self._elements():
+                self._collect(child, -1)
+            return None
+
+        raise ValueError(f"Unexpected '{token[1]}' in JSON")
+
+
+def get_entry(path: Path) -> Optional[Tuple[str, int, int, int]]:
+    """Gets the kind, window, group and index of the buffer or sheet at the
+        given path, if there is one there.
+    """
+    window: int = 0
+    if len(path) > 2 and path[0] == "windows" and isinstance(path[1], int):
+        window = path[1]
+        path = path[2:]
+
+    if len(path) == 2 and path[0] == "buffers" and isinstance(path[1], int):
+        return (ENTRY_BUFFER, window, -1, path[1])
+
+    if (
+        len(path) == 4
+        and path[0] == "groups"
+        and isinstance(path[1], int)
+        and path[2] == "sheets"
+        and isinstance(path[3], int)
+    ):
+        return (ENTRY_SHEET, window, path[1], path[3])
+
+    return None
+
+
+def read_records(handle: IO[str]) -> List[SessionRecord]:
+    """Reads the tabs recorded in a session or workspace file, by window,
+        group and position.
+    """
+    buffers: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    sheets: List[SessionEntry] = []
+
+    for entry in SessionParser(iter_tokens(handle)).parse():
+        if entry.kind == ENTRY_BUFFER:
+            buffers[(entry.window, entry.position)] = entry.values
+        else:
+            sheets.append(entry)
+
+    records: List[SessionRecord] = []
+    windows_with_sheets: Set[int] = {sheet.window for sheet in sheets}
+
+    for sheet in sheets:
+        values: Dict[str, Any] = sheet.values
+        if isinstance(values.get("buffer"), int):
+            # Sheets for text refer to their window's buffers.
+            values = buffers.get((sheet.window, values["buffer"]), values)
+        records.append(get_record(sheet.window, sheet.group, values))
+
+    # Older files may record buffers without which groups they're in.
+    for ((window, _), values) in buffers.items():
+        if window not in windows_with_sheets:
+            records.append(get_record(window, 0, values))
+
+    records.sort(key=lambda record: record.window)
+    return records
+
+
+def get_record(
+    window: int,
+    group: int,
+    values: Dict[str, Any]
+) -> SessionRecord:
+    """Gets the record for a tab from the values of its buffer or sheet."""
+    file_name: Optional[str] = values.get("file")
+    settings: Any = values.get("settings")
+    name: str = ""
+    if isinstance(settings, dict) and isinstance(settings.get("name"), str):
+        name = settings["name"]
+
+    return SessionRecord(
+        window,
+        group,
+        file_name if isinstance(file_name, str) else None,
+        name,
+        CONTENTS_KEY in values
+    )
+
+
+def load_records(file_name: str) -> List[SessionRecord]:
+    """Reads the tabs recorded in the given session or workspace file."""
+    with open(file_name, "r", encoding="utf-8") as handle:
+        return read_records(handle)
@@ -1,19 +1,78 @@
 # Copyright (c) 2013 - 2021 Robin Malburn
 # See the file license.txt for copying permission.
 
+import heapq
 from abc import ABC, abstractmethod
-from typing import List, Dict, Union
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+from .details import (
+    get_details_cache,
+    get_details_captions,
+    ViewDetails,
+    ViewDetailsCache,
+)
 from .entities import Tab
-from sublime import Settings, View, Window  # type: ignore
+from .paths import get_elision_cache, ElisionCache, PREFIX_MARKER
+from .metadata import (
+    get_metadata_cache,
+    get_metadata_captions,
+    FileMetadata,
+    MetadataCache,
+)
+from .vcs import get_status_cache, get_status_caption, VcsStatusCache
 from os import path
 
-DEFAULT_SETINGS: Dict[str, Union[bool, str]] = {
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from sublime import Settings, Sheet, Syntax, View, Window  # type: ignore
+
+DEFAULT_SETINGS: Dict[str, Union[bool, str, int]] = {
     "show_captions": True,
+    "show_syntax_caption": False,
+    "show_encoding_caption": False,
+    "show_line_endings_caption": False,
+    "filter_by_syntax": False,
     "include_path": False,
+    "elide_paths": False,
+    "max_path_width": 60,
     "preview_tab": False,
     "show_group_caption": False,
+    "show_vcs_captions": False,
+    "vcs_status_ttl": 30,
+    "show_file_size": False,
+    "show_line_count": False,
+    "show_modified_time": False,
+    "enrichment_timeout_ms": 50,
+    "max_tabs": 0,
+    "collapse_duplicates": False,
+    "sort_by": "",
+    "max_items": 0,
+    "log_timings": False,
+    "live_update": False,
+    "telemetry": False,
 }
 
+# The parts of a tab list a TabSetting can read or write.
+FIELD_TITLE: str = "title"
+FIELD_SUBTITLE: str = "subtitle"
+FIELD_CAPTIONS: str = "captions"
+FIELD_ORDER: str = "order"
+
+# Whether a TabSetting works on each tab in isolation or the list as a whole.
+# What a setting makes of the whole list depends on which tabs it holds and
+# their order, so list settings run after any setting which writes the order.
+SCOPE_TAB: str = "tab"
+SCOPE_LIST: str = "list"
+
 
 class Setting(ABC):
     """A single setting relating to the package."""
@@ -26,36 +85,127 @@ class Setting(ABC):
 class TabSetting(Setting):
     """A setting relating to one or more tabs."""
 
-    settings: Settings
-    window: Window
+    # Declares what the setting reads and writes, which determines the order
+    # it's applied in relative to other settings.
+    reads: FrozenSet[str] = frozenset()
+    writes: FrozenSet[str] = frozenset()
+    scope: str = SCOPE_TAB
+    # The package settings which switch the setting on, if any of them are
+    # true. Settings without any are always applied.
+    setting_keys: Tuple[str, ...] = ()
+
+    settings: "Settings"
+    window: "Window"
 
-    def __init__(self, settings: Settings, window: Window) -> None:
+    def __init__(self, settings: "Settings", window: "Window") -> None:
         """Initialise the setting instance with a copy
          of the sublime package settings.
          """
         self.settings = settings
         self.window = window
 
+    @classmethod
+    def get_reads(cls) -> FrozenSet[str]:
+        """Gets everything the setting depends on, which for list settings
+            includes the order of the tabs.
+        """
+        if cls.scope == SCOPE_LIST:
+            return cls.reads | {FIELD_ORDER}
+        return cls.reads
+
+    @classmethod
+    def is_configured(cls, settings: "Settings") -> bool:
+        """Returns if the package settings switch the setting on, without
+            needing an instance.
+        """
+        if len(cls.setting_keys) == 0:
+            return True
+        return any(settings.get(key) is True for key in cls.setting_keys)
+
     @abstractmethod
     def apply(self, tabs: List[Tab]) -> List[Tab]:
         """Applies the setting to the given list of tabs."""
 
 
+def get_view_details(view: "View") -> ViewDetails:
+    """Gets the syntax, encoding and line endings of the view, from the
+        cache if they've been looked up since they last changed.
+    """
+    cache: ViewDetailsCache = get_details_cache()
+    details: Optional[ViewDetails] = cache.get(view.id())
+    if details is None:
+        syntax: Optional["Syntax"] = view.syntax()
+        details = ViewDetails(
+            "" if syntax is None else syntax.name,
+            view.encoding(),
+            view.line_endings()
+        )
+        cache.put(view.id(), details)
+    return details
+
+
 class ShowCaptionsTabSetting(TabSetting):
     """Setting for showing captions on tabs."""
+    writes = frozenset({FIELD_CAPTIONS})
+    setting_keys = (
+        "show_captions",
+        "show_syntax_caption",
+        "show_encoding_caption",
+        "show_line_endings_caption",
+    )
+
     def is_enabled(self) -> bool:
-        return self.settings.get("show_captions") is True
+        return any(
+            self.settings.get(key) is True for key in self.setting_keys
+        )
 
     def apply(self, tabs: List[Tab]) -> List[Tab]:
         if self.is_enabled() is False:
             return tabs
 
+        show_captions: bool = self.settings.get("show_captions") is True
+        show_syntax: bool = self.settings.get("show_syntax_caption") is True
+        show_encoding: bool = (
+            self.settings.get("show_encoding_caption") is True
+        )
+        show_line_endings: bool = (
+            self.settings.get("show_line_endings_caption") is True
+        )
+        show_details: bool = show_syntax or show_encoding or show_line_endings
+
         for tab in tabs:
-            self._populate_captions(tab)
+            if show_captions is True:
+                self._populate_captions(tab)
+
+            view: Optional["View"] = tab.get_view()
+            if show_details is True and view is not None:
+                # Details are looked up in the same pass as the rest of the
+                # view's state, and cached until they may have changed.
+                for caption in get_details_captions(
+                    get_view_details(view),
+                    show_syntax,
+                    show_encoding,
+                    show_line_endings
+                ):
+                    tab.add_caption(caption)
         return tabs
 
     def _populate_captions(self, tab: Tab) -> None:
-        view: View = tab.get_view()
+        if tab.is_pinned() is True:
+            tab.add_caption("Pinned")
+
+        if tab.get_locations() > 1:
+            tab.add_caption(f"Open in {tab.get_locations()} places")
+
+        view: Optional["View"] = tab.get_view()
+
+        if view is None:
+            # Sheets without a view, e.g. images, have no edit state.
+            sheet: "Sheet" = tab.get_sheet()
+            if sheet.window().active_sheet().id() == sheet.id():
+                tab.add_caption("Current File")
+            return
+
         if view.window().active_view().id() == view.id():
             tab.add_caption("Current File")
 
@@ -68,8 +218,138 @@ class ShowCaptionsTabSetting(TabSetting):
             tab.add_caption("Read Only")
 
 
+class EnrichmentTabSetting(TabSetting):
+    """A setting which gathers captions for tabs from a slow source.
+
+        Enrichment settings only read data fixed when a Tab is created, e.g.
+        its file name, so they're independent of other settings and can be
+        collected concurrently, each within a time budget.
+
+        Collecting shouldn't wait on prefetched work, which would use up the
+        budget the caller enforces, but serve what's cached so far.
+    """
+    writes = frozenset({FIELD_CAPTIONS})
+    scope = SCOPE_LIST
+
+    def get_timeout(self) -> float:
+        """Gets the time budget, in seconds, for collecting captions."""
+        return float(self.settings.get("enrichment_timeout_ms", 50)) / 1000
+
+    def prefetch(self, file_names: List[str]) -> List["Future"]:
+        """Schedules background work for the given files, so their captions
+            are ready to collect later. Returns the futures for the work.
+        """
+        return []
+
+    @abstractmethod
+    def collect(self, tabs: List[Tab]) -> List[List[str]]:
+        """Collects the captions for each of the given tabs, in order. Must
+            be safe to call from a worker thread.
+        """
+
+    def merge(self, tabs: List[Tab], captions: List[List[str]]) -> List[Tab]:
+        """Adds previously collected captions to the given tabs."""
+        for (tab, tab_captions) in zip(tabs, captions):
+            for caption in tab_captions:
+                tab.add_caption(caption)
+        return tabs
+
+    def apply(self, tabs: List[Tab]) -> List[Tab]:
+        if self.is_enabled() is False:
+            return tabs
+
+        return self.merge(tabs, self.collect(tabs))
+
+
+class ShowVcsCaptionsTabSetting(EnrichmentTabSetting):
+    """Setting for showing version control status captions on tabs."""
+    setting_keys = ("show_vcs_captions",)
+
+    def is_enabled(self) -> bool:
+        return self.settings.get("show_vcs_captions") is True
+
+    def prefetch(self, file_names: List[str]) -> List["Future"]:
+        cache: VcsStatusCache = get_status_cache()
+        cache.ttl = float(self.settings.get("vcs_status_ttl", 30))
+        return cache.request(file_names)
+
+    def collect(self, tabs: List[Tab]) -> List[List[str]]:
+        cache: VcsStatusCache = get_status_cache()
+        names: List[Optional[str]] = [tab.get_file_name() for tab in tabs]
+
+        # Statuses are refreshed in the background, so only cached statuses
+        # are shown, and anything not ready is picked up next time.
+        self.prefetch([name for name in names if name is not None])
+
+        captions: List[List[str]] = []
+        for name in names:
+            status: Optional[Tuple[str, bool]] = None
+            if name is not None:
+                status = cache.get_status(name)
+
+            if status is None:
+                captions.append([])
+            else:
+                captions.append([get_status_caption(status)])
+        return captions
+
+
+class ShowFileMetadataTabSetting(EnrichmentTabSetting):
+    """Setting for showing on-disk file metadata captions on tabs."""
+    setting_keys = (
+        "show_file_size",
+        "show_line_count",
+        "show_modified_time",
+    )
+
+    def is_enabled(self) -> bool:
+        return (
+            self.settings.get("show_file_size") is True
+            or self.settings.get("show_line_count") is True
+            or self.settings.get("show_modified_time") is True
+        )
+
+    def prefetch(self, file_names: List[str]) -> List["Future"]:
+        return get_metadata_cache().request(file_names)
+
+    def collect(self, tabs: List[Tab]) -> List[List[str]]:
+        show_size: bool = self.settings.get("show_file_size") is True
+        show_lines: bool = self.settings.get("show_line_count") is True
+        show_mtime: bool = self.settings.get("show_modified_time") is True
+
+        cache: MetadataCache = get_metadata_cache()
+        names: List[Optional[str]] = [tab.get_file_name() for tab in tabs]
+
+        # Metadata is computed in the background, so files which aren't
+        # cached yet are shown without the captions until next time.
+        self.prefetch([name for name in names if name is not None])
+
+        captions: List[List[str]] = []
+        for name in names:
+            metadata: Optional[FileMetadata] = None
+            if name is not None:
+                metadata = cache.get(name)
+
+            if metadata is None:
+                captions.append([])
+            else:
+                captions.append(
+                    get_metadata_captions(
+                        metadata,
+                        show_size,
+                        show_lines,
+                        show_mtime
+                    )
+                )
+        return captions
+
+
 class IncludePathTabSetting(TabSetting):
     """Setting for including the path on tabs."""
+    reads = frozenset({FIELD_SUBTITLE})
+    writes = frozenset({FIELD_TITLE})
+    setting_keys = ("include_path",)
+
     def is_enabled(self) -> bool:
         return self.settings.get("include_path") is True
 
@@ -83,8 +363,58 @@ class IncludePathTabSetting(TabSetting):
         return tabs
 
 
+class ElidePathTabSetting(TabSetting):
+    """Setting for shortening long paths by eliding their middle directories.
+    """
+    reads = frozenset({FIELD_SUBTITLE})
+    writes = frozenset({FIELD_SUBTITLE})
+    setting_keys = ("elide_paths",)
+
+    def is_enabled(self) -> bool:
+        return self.settings.get("elide_paths") is True
+
+    def apply(self, tabs: List[Tab]) -> List[Tab]:
+        if self.is_enabled() is False:
+            return tabs
+
+        width: int = int(self.settings.get("max_path_width", 60))
+        cache: ElisionCache = get_elision_cache()
+        for tab in tabs:
+            if tab.is_file_view() is True:
+                tab.set_subtitle(cache.elide(tab.get_subtitle(), width))
+        return tabs
+
+
+class FilterBySyntaxTabSetting(TabSetting):
+    """Setting for adding each view's syntax to its title, so tabs can be
+        filtered by syntax as well as by name.
+    """
+    reads = frozenset({FIELD_TITLE})
+    writes = frozenset({FIELD_TITLE})
+    setting_keys = ("filter_by_syntax",)
+
+    def is_enabled(self) -> bool:
+        return self.settings.get("filter_by_syntax") is True
+
+    def apply(self, tabs: List[Tab]) -> List[Tab]:
+        if self.is_enabled() is False:
+            return tabs
+
+        for tab in tabs:
+            view: Optional["View"] = tab.get_view()
+            if view is None:
+                continue
+            syntax: str = get_view_details(view).syntax
+            if syntax != "":
+                tab.set_title(f"{tab.get_title()} ({syntax})")
+        return tabs
+
+
 class ShowGroupCaptionTabSetting(TabSetting):
     """Setting for showing captions on tabs."""
+    writes = frozenset({FIELD_CAPTIONS})
+    setting_keys = ("show_group_caption",)
+
     def is_enabled(self) -> bool:
         return (
             self.settings.get("show_group_caption") is True
@@ -96,16 +426,19 @@ class ShowGroupCaptionTabSetting(TabSetting):
             return tabs
 
         for tab in tabs:
-            view: View = tab.get_view()
             # Group's are zero based, so lets add 1 one to the offset
             # to make them a bit more human friendly.
-            group: int = view.sheet().group() + 1
+            group: int = tab.get_sheet().group() + 1
             tab.add_caption(f"Group: {group}")
         return tabs
 
 
 class CommonPrefixTabSetting(TabSetting):
     """Setting for truncating the common prefix on files."""
+    reads = frozenset({FIELD_SUBTITLE})
+    writes = frozenset({FIELD_SUBTITLE})
+    scope = SCOPE_LIST
+
     def is_enabled(self) -> bool:
         # There's currently no support for opting out of this "setting".
         return True
@@ -130,5 +463,143 @@ class CommonPrefixTabSetting(TabSetting):
         if prefix > 0:
             for tab in tabs:
                 if tab.is_file_view():
-                    tab.set_subtitle(f"...{tab.get_subtitle()[prefix:]}")
+                    tab.set_subtitle(
+                        f"{PREFIX_MARKER}{tab.get_subtitle()[prefix:]}"
+                    )
         return tabs
+
+
+class TabSettingRegistry(object):
+    """Registry of the TabSettings applied when formatting tabs."""
+    _settings: List[Type[TabSetting]]
+    _order: Optional[Tuple[Type[TabSetting], ...]]
+    _plans: Dict[Tuple[bool, ...], Tuple[Type[TabSetting], ...]]
+
+    def __init__(self) -> None:
+        """Initialise the registry."""
+        self._settings = []
+        self._order = None
+        self._plans = {}
+
+    def register(self, setting: Type[TabSetting]) -> Type[TabSetting]:
+        """Registers a TabSetting, returning it so this can be used as a
+            class decorator.
+        """
+        if setting not in self._settings:
+            self._settings.append(setting)
+            self._reset()
+        return setting
+
+    def unregister(self, setting: Type[TabSetting]) -> None:
+        """Unregisters a previously registered TabSetting."""
+        if setting in self._settings:
+            self._settings.remove(setting)
+            self._reset()
+
+    def get_order(self) -> Tuple[Type[TabSetting], ...]:
+        """Gets every registered TabSetting in the order they must be applied.
+
+            A setting runs after any setting which writes what it reads, or
+            writes the order of the tabs for list settings, and settings
+            writing the same thing keep their registration order.
+            Should two settings each write what the other reads, the one
+            registered first runs first.
+        """
+        if self._order is not None:
+            return self._order
+
+        settings: List[Type[TabSetting]] = self._settings
+        dependents: List[Set[int]] = [set() for _ in settings]
+        dependencies: List[int] = [0] * len(settings)
+
+        reads: List[FrozenSet[str]] = [
+            setting.get_reads() for setting in settings
+        ]
+        for (idx, setting) in enumerate(settings):
+            for (other_idx, other) in enumerate(settings):
+                if idx == other_idx:
+                    continue
+                reads_other: bool = len(reads[idx] & other.writes) > 0
+                shares_writes: bool = len(setting.writes & other.writes) > 0
+                conflicts: bool = len(reads[other_idx] & setting.writes) > 0
+                if (
+                    (reads_other and (conflicts is False or other_idx < idx))
+                    or (shares_writes and other_idx < idx)
+                ):
+                    if idx not in dependents[other_idx]:
+                        dependents[other_idx].add(idx)
+                        dependencies[idx] = dependencies[idx] + 1
+
+        ready: List[int] = [
+            idx for idx in range(len(settings)) if dependencies[idx] == 0
+        ]
+        heapq.heapify(ready)
+        remaining: Set[int] = set(range(len(settings)))
+        order: List[Type[TabSetting]] = []
+
+        while len(remaining) > 0:
+            if len(ready) == 0:
+                # Break any cycle in favour of registration order.
+                ready.append(min(remaining))
+            current: int = heapq.heappop(ready)
+            if current not in remaining:
+                continue
+            remaining.discard(current)
+            order.append(settings[current])
+            for dependent in dependents[current]:
+                dependencies[dependent] = dependencies[dependent] - 1
+                if dependencies[dependent] == 0 and dependent in remaining:
+                    heapq.heappush(ready, dependent)
+
+        self._order = tuple(order)
+        return self._order
+
+    def get_plan(self, settings: "Settings") -> Tuple[Type[TabSetting], ...]:
+        """Gets the ordered TabSettings switched on by the given package
+            settings, skipping any which are switched off entirely.
+
+            Plans are cached against the values of the settings switching
+            each TabSetting on, so they're only rebuilt when those change.
+        """
+        order: Tuple[Type[TabSetting], ...] = self.get_order()
+        version: Tuple[bool, ...] = tuple(
+            settings.get(key) is True
+            for setting in order
+            for key in setting.setting_keys
+        )
+        plan: Optional[Tuple[Type[TabSetting], ...]] = self._plans.get(version)
+
+        if plan is None:
+            plan = tuple(
+                setting for setting in order
+                if setting.is_configured(settings)
+            )
+            self._plans[version] = plan
+
+        return plan
+
+    def _reset(self) -> None:
+        """Resets the cached order and plans."""
+        self._order = None
+        self._plans = {}
+
+
+TAB_SETTINGS: TabSettingRegistry = TabSettingRegistry()
+TAB_SETTINGS.register(CommonPrefixTabSetting)
+TAB_SETTINGS.register(ShowGroupCaptionTabSetting)
+TAB_SETTINGS.register(ShowCaptionsTabSetting)
+TAB_SETTINGS.register(ShowVcsCaptionsTabSetting)
+TAB_SETTINGS.register(ShowFileMetadataTabSetting)
+TAB_SETTINGS.register(IncludePathTabSetting)
+TAB_SETTINGS.register(ElidePathTabSetting)
+TAB_SETTINGS.register(FilterBySyntaxTabSetting)
+
+
+def register_tab_setting(setting: Type[TabSetting]) -> Type[TabSetting]:
+    """Registers a TabSetting to be applied when formatting tabs."""
+    return TAB_SETTINGS.register(setting)
+
+
+def unregister_tab_setting(setting: Type[TabSetting]) -> None:
+    """Unregisters a TabSetting."""
+    TAB_SETTINGS.unregister(setting)
@@ -0,0 +1,110 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+import heapq
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class BufferSizes(object):
+    """Tallies the size of each open buffer, and their total.
+
+        Sizes are updated from editor events as buffers are loaded, changed
+        and closed, so open buffers can be ranked by size without asking
+        every view for its size. Views into the same buffer, i.e. clones,
+        share its size, which is only counted once towards the total.
+    """
+    _sizes: Dict[int, int]
+    _buffers: Dict[int, int]
+    _views: Dict[int, Set[int]]
+    _total: int
+    _lock: Lock
+
+    def __init__(self) -> None:
+        """Initialise the tally."""
+        # Sizes by buffer id, and the buffer of each view and vice versa.
+        self._sizes = {}
+        self._buffers = {}
+        self._views = {}
+        self._total = 0
+        self._lock = Lock()
+
+    def update(self, view_id: int, buffer_id: int, size: int) -> int:
+        """Records the size of the view's buffer, getting the change in the
+            total.
+        """
+        with self._lock:
+            previous: Optional[int] = self._buffers.get(view_id)
+            if previous is not None and previous != buffer_id:
+                self._remove_view(view_id)
+            self._buffers[view_id] = buffer_id
+            self._views.setdefault(buffer_id, set()).add(view_id)
+
+            delta: int = size - self._sizes.get(buffer_id, 0)
+            self._sizes[buffer_id] = size
+            self._total = self._total + delta
+            return delta
+
+    def discard(self, view_id: int) -> int:
+        """Forgets a view, along with its buffer's size once it's the last
+            view into it, getting the change in the total.
+        """
+        with self._lock:
+            return self._remove_view(view_id)
+
+    def get(self, view_id: int) -> Optional[int]:
+        """Gets the size of the view's buffer, if it's been recorded."""
+        with self._lock:
+            buffer_id: Optional[int] = self._buffers.get(view_id)
+            if buffer_id is None:
+                return None
+            return self._sizes[buffer_id]
+
+    def total(self) -> int:
+        """Gets the total size of every open buffer."""
+        with self._lock:
+            return self._total
+
+    def heaviest(
+        self,
+        view_ids: Iterable[int],
+        limit: int = 0
+    ) -> List[Tuple[int, int]]:
+        """Ranks the given views by the size of their buffers, largest first,
+            along with their sizes, optionally keeping only the top few.
+            Views whose size hasn't been recorded are left out.
+        """
+        with self._lock:
+            sizes: List[Tuple[int, int]] = [
+                (view_id, self._sizes[self._buffers[view_id]])
+                for view_id in view_ids
+                if view_id in self._buffers
+            ]
+
+        if limit > 0:
+            return heapq.nlargest(limit, sizes, key=lambda item: item[1])
+        return sorted(sizes, key=lambda item: item[1], reverse=True)
+
+    def clear(self) -> None:
+        """Forgets every buffer."""
+        with self._lock:
+            self._sizes.clear()
+            self._buffers.clear()
+            self._views.clear()
+            self._total = 0
+
+    def _remove_view(self, view_id: int) -> int:
+        """Forgets a view while locked, getting the change in the total."""
+        buffer_id: Optional[int] = self._buffers.pop(view_id, None)
+        if buffer_id is None:
+            return 0
+
+        views: Set[int] = self._views[buffer_id]
+        views.discard(view_id)
+        if len(views) > 0:
+            return 0
+
+        del self._views[buffer_id]
+        size: int = self._sizes.pop(buffer_id)
+        self._total = self._total - size
+        return -size
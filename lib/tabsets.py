@@ -0,0 +1,150 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+import json
+import os
+from os import path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+
+FORMAT_VERSION: int = 1
+EXTENSION: str = ".json"
+
+
+class TabSetFile(NamedTuple):
+    """A single file within a saved tab set."""
+    file_name: str
+    selections: List[Tuple[int, int]]
+
+
+class TabSetGroup(NamedTuple):
+    """The files open within a single group of a saved tab set."""
+    files: List[TabSetFile]
+    # The index of the visible file within the group, or -1 if there's none.
+    active: int
+
+
+class TabSet(NamedTuple):
+    """A named collection of tabs along with the layout they were open in."""
+    name: str
+    layout: Dict[str, Any]
+    active_group: int
+    groups: List[TabSetGroup]
+
+    def file_count(self) -> int:
+        """Gets the number of files in the tab set."""
+        return sum(len(group.files) for group in self.groups)
+
+
+def dumps(tab_set: TabSet) -> str:
+    """Serialises a tab set as compact JSON."""
+    return json.dumps(
+        {
+            "version": FORMAT_VERSION,
+            "name": tab_set.name,
+            "layout": tab_set.layout,
+            "active_group": tab_set.active_group,
+            "groups": [
+                {
+                    "active": group.active,
+                    "files": [
+                        [entry.file_name, entry.selections]
+                        for entry in group.files
+                    ],
+                }
+                for group in tab_set.groups
+            ],
+        },
+        separators=(",", ":")
+    )
+
+
+def loads(data: str) -> TabSet:
+    """Deserialises a tab set previously serialised with dumps."""
+    raw: Dict[str, Any] = json.loads(data)
+
+    if raw.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported tab set version: {raw.get('version')}")
+
+    return TabSet(
+        raw["name"],
+        raw["layout"],
+        raw["active_group"],
+        [
+            TabSetGroup(
+                [
+                    TabSetFile(
+                        file_name,
+                        [(a, b) for (a, b) in selections]
+                    )
+                    for (file_name, selections) in group["files"]
+                ],
+                group["active"]
+            )
+            for group in raw["groups"]
+        ]
+    )
+
+
+class TabSetStore(object):
+    """Stores tab sets as individual JSON files within a directory."""
+    directory: str
+
+    def __init__(self, directory: str) -> None:
+        """Initialise the store."""
+        self.directory = directory
+
+    def get_path(self, name: str) -> str:
+        """Gets the path a tab set with the given name is stored at.
+
+            Names are percent-encoded, rather than having unsafe characters
+            replaced, so different names never share a file.
+        """
+        safe_name: str = quote(name, safe=" ")
+        return path.join(self.directory, f"{safe_name}{EXTENSION}")
+
+    def names(self) -> List[str]:
+        """Gets the names of the stored tab sets, in alphabetical order."""
+        names: List[str] = []
+
+        if path.isdir(self.directory) is False:
+            return names
+
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(EXTENSION):
+                tab_set: Optional[TabSet] = self._read(entry.path)
+                if tab_set is not None:
+                    names.append(tab_set.name)
+
+        return sorted(names, key=str.lower)
+
+    def save(self, tab_set: TabSet) -> None:
+        """Saves the tab set, replacing any existing set of the same name."""
+        os.makedirs(self.directory, exist_ok=True)
+        file_name: str = self.get_path(tab_set.name)
+        temp_name: str = f"{file_name}.tmp"
+
+        with open(temp_name, "w", encoding="utf-8") as handle:
+            handle.write(dumps(tab_set))
+
+        # Replace atomically so a failed write never corrupts an existing set.
+        os.replace(temp_name, file_name)
+
+    def load(self, name: str) -> Optional[TabSet]:
+        """Loads the tab set with the given name, if there is one."""
+        return self._read(self.get_path(name))
+
+    def delete(self, name: str) -> None:
+        """Deletes the tab set with the given name, if there is one."""
+        try:
+            os.remove(self.get_path(name))
+        except FileNotFoundError:
+            pass
+
+    def _read(self, file_name: str) -> Optional[TabSet]:
+        """Reads a tab set from disk, ignoring missing or invalid files."""
+        try:
+            with open(file_name, "r", encoding="utf-8") as handle:
+                return loads(handle.read())
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
@@ -0,0 +1,214 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+import csv
+import io
+import json
+import os
+from array import array
+from bisect import bisect_left
+from os import path
+from time import monotonic
+from typing import Any, Dict, List, Optional, Tuple
+
+FORMAT_VERSION: int = 1
+
+# The most recording each use may take, including checking whether to save,
+# which the benchmark tests verify. Recording takes a microsecond or two, so
+# this leaves ample margin for slower machines.
+RECORD_BUDGET_SECONDS: float = 0.00002
+
+# How often, in seconds, the histograms are saved while they're in use, so
+# little is lost if Sublime Text exits without unloading the plugin.
+SAVE_INTERVAL_SECONDS: float = 300.0
+
+# Inclusive upper bounds of each bucket, with a final bucket for anything
+# larger.
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (
+    1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000
+)
+SIZE_BUCKETS: Tuple[float, ...] = (
+    10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000
+)
+RANK_BUCKETS: Tuple[float, ...] = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+TIME_TO_PANEL: str = "time_to_panel_ms"
+TIME_TO_SELECT: str = "time_to_select_ms"
+LIST_SIZE: str = "list_size"
+CHOSEN_RANK: str = "chosen_rank"
+
+
+class Histogram(object):
+    """Counts values into fixed buckets, without keeping the values."""
+    __slots__ = ("bounds", "counts", "total")
+    bounds: Tuple[float, ...]
+    counts: array
+    total: float
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        """Initialise the histogram with the given bucket bounds."""
+        self.bounds = bounds
+        self.counts = array("Q", bytes(8 * (len(bounds) + 1)))
+        self.total = 0.0
+
+    def record(self, value: float) -> None:
+        """Counts the value in its bucket."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def count(self) -> int:
+        """Gets the number of values recorded."""
+        return sum(self.counts)
+
+    def get_labels(self) -> List[str]:
+        """Gets a label for each bucket, e.g. "<= 10" or "> 5000"."""
+        labels: List[str] = [f"<= {bound:g}" for bound in self.bounds]
+        labels.append(f"> {self.bounds[-1]:g}")
+        return labels
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialises the histogram."""
+        return {
+            "bounds": list(self.bounds),
+            "counts": list(self.counts),
+            "total": self.total,
+        }
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        """Adds the counts of a serialised histogram with the same bounds."""
+        if tuple(data["bounds"]) != self.bounds:
+            raise ValueError("Histogram bounds don't match")
+
+        for (idx, count) in enumerate(data["counts"]):
+            self.counts[idx] += int(count)
+        self.total += float(data["total"])
+
+
+class Telemetry(object):
+    """Local histograms of how Tab Filter is used, for tuning settings.
+
+        Nothing is sent anywhere; the histograms are only ever saved to, and
+        exported from, the given path.
+    """
+    __slots__ = (
+        "store_path",
+        "histograms",
+        "_time_to_panel",
+        "_time_to_select",
+        "_list_size",
+        "_chosen_rank",
+        "_saved_at",
+    )
+    store_path: Optional[str]
+    histograms: Dict[str, Histogram]
+    _time_to_panel: Histogram
+    _time_to_select: Histogram
+    _list_size: Histogram
+    _chosen_rank: Histogram
+    _saved_at: float
+
+    def __init__(self, store_path: Optional[str] = None) -> None:
+        """Initialise the telemetry, loading any saved histograms."""
+        self.store_path = store_path
+        self._time_to_panel = Histogram(LATENCY_BUCKETS_MS)
+        self._time_to_select = Histogram(LATENCY_BUCKETS_MS)
+        self._list_size = Histogram(SIZE_BUCKETS)
+        self._chosen_rank = Histogram(RANK_BUCKETS)
+        self.histograms = {
+            TIME_TO_PANEL: self._time_to_panel,
+            TIME_TO_SELECT: self._time_to_select,
+            LIST_SIZE: self._list_size,
+            CHOSEN_RANK: self._chosen_rank,
+        }
+        self._saved_at = monotonic()
+        self.load()
+
+    def record_panel(self, seconds: float, size: int) -> None:
+        """Records how long the panel took to show, and how many tabs."""
+        # Histogram.record is inlined, as these are called on every use.
+        milliseconds: float = seconds * 1000
+        latency: Histogram = self._time_to_panel
+        latency.counts[bisect_left(latency.bounds, milliseconds)] += 1
+        latency.total += milliseconds
+        sizes: Histogram = self._list_size
+        sizes.counts[bisect_left(sizes.bounds, size)] += 1
+        sizes.total += size
+
+    def record_select(self, seconds: float, rank: int) -> None:
+        """Records how long it took to select a tab, and its position."""
+        milliseconds: float = seconds * 1000
+        latency: Histogram = self._time_to_select
+        latency.counts[bisect_left(latency.bounds, milliseconds)] += 1
+        latency.total += milliseconds
+        ranks: Histogram = self._chosen_rank
+        ranks.counts[bisect_left(ranks.bounds, rank)] += 1
+        ranks.total += rank
+
+    def due_for_save(self) -> bool:
+        """Gets whether the histograms are due to be saved, restarting the
+            interval until the next save if so.
+        """
+        now: float = monotonic()
+        if now - self._saved_at < SAVE_INTERVAL_SECONDS:
+            return False
+        self._saved_at = now
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialises the histograms."""
+        return {
+            "version": FORMAT_VERSION,
+            "histograms": {
+                name: histogram.to_dict()
+                for (name, histogram) in self.histograms.items()
+            },
+        }
+
+    def to_json(self) -> str:
+        """Exports the histograms as JSON."""
+        return json.dumps(self.to_dict(), indent=4)
+
+    def to_csv(self) -> str:
+        """Exports the histograms as CSV, with a row per bucket."""
+        output: io.StringIO = io.StringIO()
+        writer = csv.writer(output, lineterminator="\n")
+        writer.writerow(["histogram", "bucket", "count"])
+
+        for (name, histogram) in self.histograms.items():
+            for (label, count) in zip(
+                histogram.get_labels(),
+                histogram.counts
+            ):
+                writer.writerow([name, label, count])
+
+        return output.getvalue()
+
+    def load(self) -> None:
+        """Adds in the saved histograms, if there are any."""
+        if self.store_path is None:
+            return
+
+        try:
+            with open(self.store_path, "r", encoding="utf-8") as handle:
+                data: Dict[str, Any] = json.load(handle)
+            if data.get("version") != FORMAT_VERSION:
+                return
+            for (name, histogram) in self.histograms.items():
+                if name in data["histograms"]:
+                    histogram.merge(data["histograms"][name])
+        except (OSError, ValueError, KeyError, TypeError):
+            # Start afresh rather than failing over a corrupt file.
+            return
+
+    def save(self) -> None:
+        """Saves the histograms."""
+        if self.store_path is None:
+            return
+
+        os.makedirs(path.dirname(self.store_path), exist_ok=True)
+        temp_name: str = f"{self.store_path}.tmp"
+        with open(temp_name, "w", encoding="utf-8") as handle:
+            handle.write(self.to_json())
+
+        # Replace atomically so a failed write never corrupts saved counts.
+        os.replace(temp_name, self.store_path)
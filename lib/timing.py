@@ -0,0 +1,51 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Names of the timed operations.
+TIMING_IMPORT: str = "import"
+TIMING_WARM_UP: str = "warm_up"
+TIMING_RUN: str = "run"
+
+
+class Timings(object):
+    """Records how long named operations took, most recently."""
+    _durations: Dict[str, float]
+    _lock: Lock
+
+    def __init__(self) -> None:
+        """Initialise the timings."""
+        self._durations = {}
+        self._lock = Lock()
+
+    def record(self, name: str, seconds: float) -> None:
+        """Records the duration of an operation."""
+        with self._lock:
+            self._durations[name] = seconds
+
+    def get(self, name: str) -> Optional[float]:
+        """Gets the most recent duration of an operation, in seconds."""
+        return self._durations.get(name)
+
+    def items(self) -> List[Tuple[str, float]]:
+        """Gets the most recent duration of each operation, by name."""
+        with self._lock:
+            return sorted(self._durations.items())
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """Records how long the wrapped block takes."""
+        start: float = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, perf_counter() - start)
+
+
+def format_duration(seconds: float) -> str:
+    """Formats a duration for display, e.g. "1.25 ms"."""
+    return f"{seconds * 1000:.2f} ms"
@@ -0,0 +1,349 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+import os
+from os import path
+from threading import RLock
+from time import monotonic
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+from .pool import get_executor
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+STATUS_MODIFIED: str = "Modified"
+STATUS_STAGED: str = "Staged"
+STATUS_UNTRACKED: str = "Untracked"
+STATUS_IGNORED: str = "Ignored"
+
+GIT_TIMEOUT: float = 10.0
+
+# Sentinel for directories whose repository root hasn't been resolved yet.
+_UNRESOLVED: str = ""
+
+
+def find_repository_root(directory: str) -> Optional[str]:
+    """Finds the root of the git repository containing the directory."""
+    current: str = directory
+    while True:
+        if path.exists(path.join(current, ".git")):
+            return current
+        parent: str = path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def parse_porcelain(
+    output: str
+) -> Tuple[Dict[str, str], List[Tuple[str, str]]]:
+    """Parses `git status --porcelain -z` output into file and directory
+        statuses, keyed by their path relative to the repository root.
+    """
+    files: Dict[str, str] = {}
+    directories: List[Tuple[str, str]] = []
+    entries: List[str] = output.split("\0")
+    idx: int = 0
+
+    while idx < len(entries):
+        entry: str = entries[idx]
+        idx = idx + 1
+
+        if len(entry) < 4:
+            continue
+
+        code: str = entry[:2]
+        name: str = entry[3:]
+
+        if code[0] in "RC":
+            # Renames and copies are followed by the original path.
+            idx = idx + 1
+
+        status: str
+        if code == "??":
+            status = STATUS_UNTRACKED
+        elif code == "!!":
+            status = STATUS_IGNORED
+        elif code[1] != " ":
+            status = STATUS_MODIFIED
+        else:
+            status = STATUS_STAGED
+
+        if name.endswith("/"):
+            # Untracked and ignored directories are collapsed into one entry.
+            directories.append((name, status))
+        else:
+            files[name] = status
+
+    return (files, directories)
+
+
+def run_git_status(root: str) -> str:
+    """Runs `git status` for the repository root and returns its output."""
+    # Imported on first use to keep loading the plugin quick.
+    import subprocess
+
+    startupinfo = None
+    if os.name == "nt":
+        # Prevent a console window flashing up on Windows.
+        startupinfo = subprocess.STARTUPINFO()  # type: ignore
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW  # type: ignore
+
+    result = subprocess.run(
+        ["git", "status", "--porcelain", "-z", "--ignored"],
+        cwd=root,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        startupinfo=startupinfo,
+        timeout=GIT_TIMEOUT,
+        check=True,
+    )
+    return result.stdout.decode("utf-8", "replace")
+
+
+class RepositoryStatus(object):
+    """Represent the cached status of a single repository."""
+    root: str
+    files: Dict[str, str]
+    directories: List[Tuple[str, str]]
+    refreshed_at: float
+    stale: bool = False
+
+    def __init__(
+        self,
+        root: str,
+        files: Dict[str, str],
+        directories: List[Tuple[str, str]],
+        refreshed_at: float
+    ) -> None:
+        """Initialise the repository status."""
+        self.root = root
+        self.files = files
+        self.directories = directories
+        self.refreshed_at = refreshed_at
+        self.stale = False
+
+    def is_stale(self, now: float, ttl: float) -> bool:
+        """Gets whether the status needs refreshing."""
+        return self.stale or now - self.refreshed_at > ttl
+
+    def get_status(self, file_name: str) -> Optional[str]:
+        """Gets the status of the given file, or None if it's unchanged."""
+        relative: str = path.relpath(file_name, self.root)
+        relative = relative.replace(path.sep, "/")
+        status: Optional[str] = self.files.get(relative)
+
+        if status is not None:
+            return status
+
+        for (directory, directory_status) in self.directories:
+            if relative.startswith(directory):
+                return directory_status
+
+        return None
+
+
+class VcsStatusCache(object):
+    """Caches repository statuses, refreshing them in the background."""
+    ttl: float
+    runner: Callable[[str], str]
+    _roots: Dict[str, Optional[str]]
+    _repositories: Dict[str, RepositoryStatus]
+    _pending_directories: Set[str]
+    _pending_roots: Set[str]
+    _inflight: Set["Future"]
+    _lock: RLock
+
+    def __init__(
+        self,
+        ttl: float = 30.0,
+        runner: Callable[[str], str] = run_git_status
+    ) -> None:
+        """Initialise the cache."""
+        self.ttl = ttl
+        self.runner = runner
+        self._roots = {}
+        self._repositories = {}
+        self._pending_directories = set()
+        self._pending_roots = set()
+        self._inflight = set()
+        self._lock = RLock()
+
+    def get_status(self, file_name: str) -> Optional[Tuple[str, bool]]:
+        """Gets the cached status for a file along with whether it's stale,
+            or None if there's nothing to show. Never blocks on git.
+        """
+        with self._lock:
+            root: Optional[str] = self._roots.get(
+                path.dirname(file_name),
+                _UNRESOLVED
+            )
+            if not root:
+                return None
+
+            repository: Optional[RepositoryStatus]
+            repository = self._repositories.get(root)
+
+            if repository is None:
+                return None
+
+            status: Optional[str] = repository.get_status(file_name)
+
+            if status is None:
+                return None
+
+            return (status, repository.is_stale(monotonic(), self.ttl))
+
+    def request(self, file_names: Iterable[str]) -> List["Future"]:
+        """Schedules a background refresh of the repositories for the given
+            files, with a single `git status` per missing or stale repository.
+            Returns the futures for all refreshes still in progress.
+        """
+        directories: Set[str] = set()
+        roots: Set[str] = set()
+        now: float = monotonic()
+
+        with self._lock:
+            for file_name in file_names:
+                directory: str = path.dirname(file_name)
+                root: Optional[str] = self._roots.get(directory, _UNRESOLVED)
+
+                if root == _UNRESOLVED:
+                    directories.add(directory)
+                elif root is not None:
+                    repository: Optional[RepositoryStatus]
+                    repository = self._repositories.get(root)
+                    if (
+                        repository is None
+                        or repository.is_stale(now, self.ttl)
+                    ):
+                        roots.add(root)
+
+            directories -= self._pending_directories
+            roots -= self._pending_roots
+
+            if len(directories) == 0 and len(roots) == 0:
+                return list(self._inflight)
+
+            self._pending_directories.update(directories)
+            self._pending_roots.update(roots)
+
+            future: "Future" = get_executor().submit(
+                self._refresh,
+                directories,
+                roots
+            )
+            self._inflight.add(future)
+            futures: List["Future"] = list(self._inflight)
+
+        future.add_done_callback(self._discard_future)
+        return futures
+
+    def invalidate(self, file_name: str) -> None:
+        """Marks the repository containing the given file as stale."""
+        with self._lock:
+            root: Optional[str] = self._roots.get(
+                path.dirname(file_name),
+                _UNRESOLVED
+            )
+            if not root:
+                return
+
+            repository: Optional[RepositoryStatus]
+            repository = self._repositories.get(root)
+
+            if repository is not None:
+                repository.stale = True
+
+    def clear(self) -> None:
+        """Clears all cached statuses."""
+        with self._lock:
+            self._roots.clear()
+            self._repositories.clear()
+
+    def _discard_future(self, future: "Future") -> None:
+        """Stops tracking a finished refresh."""
+        with self._lock:
+            self._inflight.discard(future)
+
+    def _refresh(self, directories: Set[str], roots: Set[str]) -> None:
+        """Resolves repository roots and refreshes their statuses."""
+        refreshing: Set[str] = set(roots)
+
+        try:
+            for directory in directories:
+                root: Optional[str] = find_repository_root(directory)
+
+                with self._lock:
+                    self._roots[directory] = root
+
+                    if root is None or root in self._pending_roots:
+                        continue
+
+                    repository: Optional[RepositoryStatus]
+                    repository = self._repositories.get(root)
+
+                    if (
+                        repository is not None
+                        and not repository.is_stale(monotonic(), self.ttl)
+                    ):
+                        continue
+
+                    self._pending_roots.add(root)
+                    refreshing.add(root)
+
+            for root in refreshing:
+                self._refresh_repository(root)
+        finally:
+            with self._lock:
+                self._pending_directories.difference_update(directories)
+                self._pending_roots.difference_update(refreshing)
+
+    def _refresh_repository(self, root: str) -> None:
+        """Runs `git status` for a single repository and stores the result."""
+        from subprocess import SubprocessError
+
+        files: Dict[str, str] = {}
+        directories: List[Tuple[str, str]] = []
+
+        try:
+            (files, directories) = parse_porcelain(self.runner(root))
+        except (OSError, SubprocessError):
+            # Without a usable git there's nothing to show, so cache the
+            # empty result to avoid retrying until the TTL expires.
+            pass
+
+        with self._lock:
+            self._repositories[root] = RepositoryStatus(
+                root,
+                files,
+                directories,
+                monotonic()
+            )
+
+
+_cache: Optional[VcsStatusCache] = None
+
+
+def get_status_caption(status: Tuple[str, bool]) -> str:
+    """Gets the caption for a cached status, as from get_status."""
+    if status[1] is True:
+        return f"Git: {status[0]} (stale)"
+    return f"Git: {status[0]}"
+
+
+def get_status_cache() -> VcsStatusCache:
+    """Gets the shared status cache."""
+    global _cache
+    if _cache is None:
+        _cache = VcsStatusCache()
+    return _cache
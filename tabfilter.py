@@ -1,17 +1,485 @@
 # Copyright (c) 2013 - 2021 Robin Malburn
 # See the file license.txt for copying permission.
 
+import heapq
+from functools import partial
 import sublime  # type: ignore
 import sublime_plugin  # type: ignore
-from typing import List, Tuple
-from .lib.entities import Tab
+from os import path
+from time import monotonic, perf_counter
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+from .lib import IMPORT_STARTED, pool
+from .lib.details import DETAIL_COMMANDS, get_details_cache
+from .lib.diff import diff_items, map_index, Opcode
+from .lib.entities import SheetTab, Tab
+from .lib.files import get_project_file_index, ProjectFile
+from .lib.groups import (
+    CachedList,
+    GroupListCache,
+    GroupSpec,
+    GROUPS_ACTIVE,
+    resolve_groups,
+)
+from .lib.history import (
+    ActivationHistory,
+    EvictionLog,
+    NavigationStack,
+    select_evictions,
+)
 from .lib.settings import (
+    DEFAULT_SETINGS,
+    EnrichmentTabSetting,
+    ShowFileMetadataTabSetting,
     TabSetting,
-    CommonPrefixTabSetting,
-    ShowCaptionsTabSetting,
-    IncludePathTabSetting,
-    ShowGroupCaptionTabSetting,
+    TAB_SETTINGS,
+)
+from .lib.timing import (
+    format_duration,
+    Timings,
+    TIMING_IMPORT,
+    TIMING_RUN,
+    TIMING_WARM_UP,
 )
+from .lib.metadata import (
+    format_size,
+    get_metadata_cache,
+    get_metadata_captions,
+    FileMetadata,
+)
+from .lib.pins import PinnedTabs
+from .lib.registry import (
+    Location,
+    RegistrySnapshot,
+    SORT_DIRECTORY,
+    SORT_EXTENSION,
+    SORT_ORDERS,
+    STATES,
+    TabRecord,
+    TabRegistry,
+)
+from .lib.telemetry import Telemetry
+from .lib.sizes import BufferSizes
+from .lib.tabsets import TabSet, TabSetFile, TabSetGroup, TabSetStore
+from .lib.vcs import get_status_cache, get_status_caption
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+# View settings used to mark placeholder views for files not yet loaded.
+LAZY_FILE_SETTING: str = "tab_filter_lazy_file"
+LAZY_SELECTIONS_SETTING: str = "tab_filter_lazy_selections"
+
+# The number of placeholder views created per batch when restoring tab sets.
+RESTORE_BATCH_SIZE: int = 50
+
+# How long to wait for changes to settle before refreshing an open panel.
+LIVE_UPDATE_DELAY_MS: int = 100
+
+# Actions which can be applied to several tabs selected at once.
+ACTION_CLOSE: str = "close"
+ACTION_SAVE: str = "save"
+ACTION_MOVE: str = "move"
+
+BATCH_ACTIONS: FrozenSet[str] = frozenset(
+    (ACTION_CLOSE, ACTION_SAVE, ACTION_MOVE)
+)
+
+# Tabs can be sorted into sections by group, besides the registry's orders.
+SORT_GROUP: str = "group"
+
+SORT_MODES: FrozenSet[str] = frozenset((SORT_GROUP,) + SORT_ORDERS)
+
+# The filter text typed into the open quick panel, by window id.
+_panel_filters: Dict[int, str] = {}
+# Command palette items for tabs, reused for as long as a tab is unchanged.
+_candidates: Dict[TabRecord, sublime.ListInputItem] = {}
+
+# Selections to apply to files once they've finished loading, by view id.
+_pending_selections: Dict[int, List[Tuple[int, int]]] = {}
+# Windows which are in the middle of restoring a tab set.
+_restoring: Set[int] = set()
+# Windows with an eviction scheduled to keep them within max_tabs.
+_evicting: Set[int] = set()
+# Windows whose tabs are being previewed from the panel, which aren't jumps.
+_previewing: Set[int] = set()
+
+_buffer_sizes: BufferSizes = BufferSizes()
+_group_lists: GroupListCache = GroupListCache()
+_history: ActivationHistory = ActivationHistory()
+_navigation: NavigationStack = NavigationStack()
+_eviction_log: EvictionLog = EvictionLog()
+_pinned_tabs: Optional[PinnedTabs] = None
+_registry: TabRegistry = TabRegistry()
+_timings: Timings = Timings()
+_telemetry: Optional[Telemetry] = None
+# Whether telemetry is enabled, kept up to date as the settings change
+# rather than read on every use.
+_telemetry_enabled: Optional[bool] = None
+
+
+def get_settings() -> sublime.Settings:
+    """Gets the package settings."""
+    return sublime.load_settings("tabfilter.sublime-settings")
+
+
+def log_timing(name: str) -> None:
+    """Logs how long an operation took to the console, if enabled."""
+    seconds: Optional[float] = _timings.get(name)
+    if seconds is not None and get_settings().get("log_timings") is True:
+        print(f"Tab Filter: {name} took {format_duration(seconds)}")
+
+
+def plugin_loaded() -> None:
+    """Schedules warming up the plugin's state, so even the first use of
+        Tab Filter is quick.
+    """
+    log_timing(TIMING_IMPORT)
+    sublime.set_timeout_async(warm_up, 0)
+
+
+def warm_up() -> None:
+    """Indexes the views which were open before the plugin was loaded,
+        resolves the settings plan and schedules background work for the
+        enabled enrichments.
+    """
+    with _timings.measure(TIMING_WARM_UP):
+        settings: sublime.Settings = get_settings()
+        plan: Tuple[Type[TabSetting], ...] = TAB_SETTINGS.get_plan(settings)
+        get_pinned_tabs()
+
+        records: List[TabRecord] = []
+        file_names: List[str] = []
+        # Views are looked up before taking the registry's lock, so
+        # listeners on the main thread aren't held up while they are.
+        for window in sublime.windows():
+            for view in window.views():
+                record: Optional[TabRecord] = make_record(view, window)
+                if record is None:
+                    continue
+                records.append(record)
+                tally_view(view)
+                if record.file_name is not None:
+                    file_names.append(record.file_name)
+
+        # Every view is published at once, rather than a snapshot per view.
+        # Views indexed by listeners in the meantime are more up to date,
+        # while views closed in the meantime are left out, as on_close has
+        # already discarded them.
+        with _registry.batch() as batch:
+            for record in records:
+                if batch.get(record.view_id) is not None:
+                    continue
+                if sublime.View(record.view_id).is_valid():
+                    batch.update(record)
+
+        active_window: Optional[sublime.Window] = sublime.active_window()
+        if active_window is not None:
+            for setting in plan:
+                if issubclass(setting, EnrichmentTabSetting):
+                    setting(settings, active_window).prefetch(file_names)
+
+    log_timing(TIMING_WARM_UP)
+
+
+def plugin_unloaded() -> None:
+    """Stops any background work and saves telemetry when the plugin is
+        unloaded.
+    """
+    pool.shutdown()
+    get_settings().clear_on_change("tab_filter_telemetry")
+    if _telemetry is not None:
+        _telemetry.save()
+
+
+def get_tab_set_store() -> TabSetStore:
+    """Gets the store for saved tab sets, within the cache directory."""
+    return TabSetStore(
+        path.join(sublime.cache_path(), "Tab Filter", "tab_sets")
+    )
+
+
+def get_pinned_tabs() -> PinnedTabs:
+    """Gets the pinned tabs, loading them from the cache directory on first
+        use.
+    """
+    global _pinned_tabs
+    if _pinned_tabs is None:
+        _pinned_tabs = PinnedTabs(
+            path.join(sublime.cache_path(), "Tab Filter", "pinned.json")
+        )
+    return _pinned_tabs
+
+
+def get_telemetry_path() -> str:
+    """Gets the path telemetry is saved to, within the cache directory."""
+    return path.join(sublime.cache_path(), "Tab Filter", "telemetry.json")
+
+
+def get_telemetry() -> Optional[Telemetry]:
+    """Gets the local telemetry, if it's been enabled, loading it from the
+        cache directory on first use.
+    """
+    global _telemetry
+    if _telemetry_enabled is None:
+        get_settings().add_on_change(
+            "tab_filter_telemetry",
+            update_telemetry_enabled
+        )
+        update_telemetry_enabled()
+    if _telemetry_enabled is not True:
+        return None
+    if _telemetry is None:
+        _telemetry = Telemetry(get_telemetry_path())
+    return _telemetry
+
+
+def update_telemetry_enabled() -> None:
+    """Records whether telemetry is enabled, as the settings change."""
+    global _telemetry_enabled
+    _telemetry_enabled = get_settings().get("telemetry") is True
+
+
+def save_telemetry_if_due(telemetry: Telemetry) -> None:
+    """Saves the telemetry in the background, if it's due to be saved."""
+    if telemetry.due_for_save():
+        sublime.set_timeout_async(telemetry.save, 0)
+
+
+def is_view_pinned(view: sublime.View) -> bool:
+    """Gets whether the view's tab is pinned."""
+    return get_pinned_tabs().is_pinned(view.file_name(), view.id())
+
+
+def make_record(
+    view: sublime.View,
+    window: sublime.Window
+) -> Optional[TabRecord]:
+    """Gets the current state of the view in the window, or None if it's not
+        a tab.
+    """
+    if view.settings().get("is_widget") is True or view.element() is not None:
+        # Inputs for panels, e.g. the quick panel's filter, and the views
+        # of panels themselves, e.g. output panels, aren't tabs.
+        return None
+
+    # Placeholders from tab sets stand in for files, so are indexed as such
+    # rather than as read only buffers.
+    lazy_file: Optional[str] = view.settings().get(LAZY_FILE_SETTING)
+    file_name: Optional[str] = view.file_name()
+    if file_name is None:
+        file_name = lazy_file
+
+    return TabRecord(
+        view.id(),
+        window.id(),
+        view.buffer_id(),
+        file_name,
+        view.is_dirty(),
+        view.is_read_only() and lazy_file is None,
+        view.name()
+    )
+
+
+def index_view(view: sublime.View) -> None:
+    """Records the current state of the view in the registry."""
+    window: Optional[sublime.Window] = view.window()
+    if window is None:
+        _registry.discard(view.id())
+        return
+
+    record: Optional[TabRecord] = make_record(view, window)
+    if record is not None:
+        _registry.update(record)
+
+
+def tally_view(view: sublime.View) -> None:
+    """Records the current size of the view's buffer."""
+    _buffer_sizes.update(view.id(), view.buffer_id(), view.size())
+
+
+def revalidate_metadata(view: sublime.View) -> None:
+    """Checks the view's file for changes to its metadata, if any metadata
+        captions are shown.
+    """
+    name: Optional[str] = view.file_name()
+    if name is None:
+        return
+    if ShowFileMetadataTabSetting.is_configured(get_settings()):
+        get_metadata_cache().revalidate([name])
+
+
+def invalidate_view_details(view: sublime.View) -> None:
+    """Forgets the view's details, along with any lists they're shown in.
+    """
+    get_details_cache().invalidate(view.id())
+    _group_lists.clear()
+
+
+def get_view_record(view: sublime.View) -> Optional[TabRecord]:
+    """Gets the registry record for the view, indexing it if need be."""
+    record: Optional[TabRecord] = _registry.get(view.id())
+    if record is None:
+        index_view(view)
+        record = _registry.get(view.id())
+    return record
+
+
+def get_setting_keys() -> Tuple[str, ...]:
+    """Gets the keys of the package's settings, along with those of any
+        registered tab settings, e.g. from third party packages.
+    """
+    keys: Dict[str, None] = dict.fromkeys(DEFAULT_SETINGS)
+    for setting in TAB_SETTINGS.get_order():
+        keys.update(dict.fromkeys(setting.setting_keys))
+    return tuple(keys)
+
+
+def is_view_open(window: sublime.Window, view_id: int) -> bool:
+    """Gets whether the view is still open within the window."""
+    view: sublime.View = sublime.View(view_id)
+    return view.is_valid() and view.window() == window
+
+
+def get_sheet(item: Union[sublime.View, sublime.Sheet]) -> sublime.Sheet:
+    """Gets the sheet of a tab, which views are shown within."""
+    if isinstance(item, sublime.View):
+        return item.sheet()
+    return item
+
+
+def get_selections(view: sublime.View) -> List[Tuple[int, int]]:
+    """Gets the selections of the view, including unloaded placeholders."""
+    if view.settings().has(LAZY_FILE_SETTING):
+        return [
+            (a, b) for (a, b) in view.settings().get(LAZY_SELECTIONS_SETTING)
+        ]
+    return [(region.a, region.b) for region in view.sel()]
+
+
+def apply_selections(
+    view: sublime.View,
+    selections: List[Tuple[int, int]]
+) -> None:
+    """Restores the given selections in the view."""
+    if len(selections) == 0:
+        return
+
+    view.sel().clear()
+    for (a, b) in selections:
+        view.sel().add(sublime.Region(a, b))
+    view.show(view.sel()[0])
+
+
+def open_with_selections(
+    window: sublime.Window,
+    file_name: str,
+    group: int,
+    selections: List[Tuple[int, int]]
+) -> sublime.View:
+    """Opens the file in the given group, restoring its selections once
+        it's loaded.
+    """
+    view: sublime.View = window.open_file(file_name, group=group)
+    if view.is_loading():
+        _pending_selections[view.id()] = selections
+    else:
+        apply_selections(view, selections)
+    return view
+
+
+def materialise_lazy_view(view: sublime.View) -> None:
+    """Replaces a placeholder view with the file it stands in for."""
+    window: Optional[sublime.Window] = view.window()
+    file_name: Optional[str] = view.settings().get(LAZY_FILE_SETTING)
+
+    if window is None or file_name is None or window.id() in _restoring:
+        return
+
+    (group, index) = window.get_view_index(view)
+    selections: List[Tuple[int, int]] = get_selections(view)
+    view.settings().erase(LAZY_FILE_SETTING)
+
+    loaded: sublime.View = open_with_selections(
+        window,
+        file_name,
+        group,
+        selections
+    )
+    window.set_view_index(loaded, group, index)
+    view.close()
+    window.focus_view(loaded)
+
+
+def is_evictable(view: sublime.View) -> bool:
+    """Gets whether a view can be closed automatically without losing work,
+        i.e. it has no unsaved changes and can be reopened.
+    """
+    if view.is_dirty() or is_view_pinned(view):
+        return False
+    if view.file_name() is None and view.size() > 0:
+        # Scratch buffers with content can't be recovered once closed,
+        # though placeholders from tab sets can.
+        return view.settings().has(LAZY_FILE_SETTING)
+    return True
+
+
+def evict_tabs(window: sublime.Window) -> None:
+    """Closes the least recently used tabs in the window which exceed the
+        max_tabs setting, logging them so they can be reopened.
+    """
+    _evicting.discard(window.id())
+
+    settings: sublime.Settings = get_settings()
+    max_tabs: int = int(settings.get("max_tabs", 0))
+    views: List[sublime.View] = window.views()
+    excess: int = len(views) - max_tabs
+
+    if max_tabs <= 0 or excess <= 0:
+        return
+
+    by_id: Dict[int, sublime.View] = {view.id(): view for view in views}
+    visible: Set[int] = set()
+    for group_idx in range(window.num_groups()):
+        active: Optional[sublime.View] = window.active_view_in_group(group_idx)
+        if active is not None:
+            visible.add(active.id())
+
+    evictions: List[int] = select_evictions(
+        _history.least_recent(window.id(), by_id.keys()),
+        excess,
+        lambda view_id: (
+            view_id not in visible and is_evictable(by_id[view_id])
+        )
+    )
+
+    evicted: List[str] = []
+    for view_id in evictions:
+        view: sublime.View = by_id[view_id]
+        name: Optional[str] = view.file_name()
+        if name is None:
+            name = view.settings().get(LAZY_FILE_SETTING)
+        if view.close() and name is not None:
+            evicted.append(name)
+
+    if len(evicted) > 0:
+        _eviction_log.record(evicted)
+        print(
+            f"Tab Filter: closed {len(evicted)} least recently used tabs "
+            f"to stay within max_tabs ({max_tabs}): {', '.join(evicted)}"
+        )
 
 
 class TabFilterCommand(sublime_plugin.WindowCommand):
@@ -19,93 +487,1631 @@ class TabFilterCommand(sublime_plugin.WindowCommand):
        searching and selecting open tabs.
     """
     window: sublime.Window
-    views: List[sublime.View] = []
+    views: List[Union[sublime.View, sublime.Sheet]] = []
     current_tab_idx: int = -1
+    # The number of pinned tabs, which are always first.
+    pinned_count: int = 0
+    # Maps quick panel entries to tab indexes when the panel is capped, with
+    # None meaning every tab is shown in order.
+    display_indexes: Optional[List[int]] = None
+    # The full list of formatted tabs, for showing all of a capped list.
+    formatted: List[List[str]] = []
+    preview: bool = False
+    max_items: int = 0
     settings: sublime.Settings
+    # Live updates of the open panel, when enabled. Each panel shown gets a
+    # new generation, so callbacks from replaced panels can be ignored.
+    live: bool = False
+    panel_generation: int = 0
+    highlighted_index: int = -1
+    displayed_items: List[Tuple[Hashable, Tuple[str, ...]]] = []
+    rebuild: Optional[Callable[[], List[List[str]]]] = None
+    subscription: Optional[int] = None
+    refresh_scheduled: bool = False
+    # When the panel was shown, for measuring how long selecting takes.
+    shown_at: float = 0.0
+    # Project files listed after the tabs, when included, and the index of
+    # the first of them in the quick panel.
+    include_files: bool = False
+    project_files: List[ProjectFile] = []
+    files_offset: int = 0
+    displayed_files: List[ProjectFile] = []
+    # Whether several tabs can be selected at once, and the action to apply
+    # to them, or None to choose one once they've been selected.
+    multi_select: bool = False
+    batch_action: Optional[str] = None
+    batch_group: int = -1
+    # The position in the navigation stack of each tab, when listing them
+    # by history.
+    history_positions: Optional[List[int]] = None
 
-    def gather_tabs(self, group_indexes: List[int]) -> List[Tab]:
-        """Gather tabs from the given group indexes."""
+    def gather_sheets(
+        self,
+        group_indexes: List[int],
+        only: Optional[str] = None,
+        snapshot: Optional[RegistrySnapshot] = None
+    ) -> Iterable[sublime.Sheet]:
+        """Gather sheets from the given group indexes, in tab order,
+            optionally limited to views in the given state, as of the given
+            registry snapshot, or the current one.
+        """
+        if only is None:
+            # Sheets cover views as well as image and HTML tabs, all in a
+            # single call per group.
+            for group_idx in group_indexes:
+                yield from self.window.sheets_in_group(group_idx)
+            return
+
+        # Only the matching views are looked up, rather than every tab.
+        groups: Set[int] = set(group_indexes)
+        positions: List[Tuple[int, int, sublime.View]] = []
+        if snapshot is None:
+            snapshot = _registry.snapshot()
+        for view_id in snapshot.get_views(self.window.id(), only):
+            view: sublime.View = sublime.View(view_id)
+            if view.is_valid() is False:
+                _registry.discard(view_id)
+                continue
+            (group, index) = self.window.get_view_index(view)
+            if group in groups:
+                positions.append((group, index, view))
+
+        positions.sort(key=lambda position: position[:2])
+        for (_, _, view) in positions:
+            yield view.sheet()
+
+    def gather_tabs(
+        self,
+        group_indexes: List[int],
+        only: Optional[str] = None,
+        collapse: bool = False
+    ) -> List[Tab]:
+        """Gather tabs from the given group indexes, with pinned tabs first,
+            optionally collapsing duplicates of the same file or buffer into
+            the first tab for it.
+        """
+        pinned_tabs: List[Tab] = []
+        pinned_views: List[Union[sublime.View, sublime.Sheet]] = []
         tabs: List[Tab] = []
-        idx: int = 0
         self.views = []
-        for group_idx in group_indexes:
-            for view in self.window.views_in_group(group_idx):
-                self.views.append(view)
-                if self.window.active_view().id() == view.id():
-                    # save index for later usage
-                    self.current_tab_idx = idx
-                tabs.append(Tab(view))
-                idx = idx + 1
+        self.current_tab_idx = -1
+
+        pins: PinnedTabs = get_pinned_tabs()
+        active_sheet: Optional[sublime.Sheet] = self.window.active_sheet()
+        active_id: int = -1 if active_sheet is None else active_sheet.id()
+        active_pinned: bool = False
+        active_position: int = -1
+        # The position of the first tab for each location, when collapsing.
+        seen: Dict[Location, Tuple[bool, int]] = {}
+        # A single snapshot, so states and counts agree throughout.
+        snapshot: RegistrySnapshot = _registry.snapshot()
+
+        for sheet in self.gather_sheets(group_indexes, only, snapshot):
+            tab: Tab
+            item: Union[sublime.View, sublime.Sheet]
+            view: Optional[sublime.View] = sheet.view()
+            if view is None:
+                item = sheet
+                tab = SheetTab(sheet)
+            else:
+                item = view
+                tab = Tab(view)
+
+            # Partition pinned tabs as we go, rather than sorting after.
+            pinned: bool = pins.is_pinned(tab.get_file_name(), item.id())
+            position: int = len(pinned_tabs if pinned else tabs)
+
+            record: Optional[TabRecord] = None
+            if collapse is True and view is not None:
+                record = snapshot.get(view.id()) or get_view_record(view)
+
+            if record is not None:
+                location: Location = record.location()
+                if location in seen:
+                    # Focus the tab the duplicate was collapsed into.
+                    if sheet.id() == active_id:
+                        (active_pinned, active_position) = seen[location]
+                    continue
+                seen[location] = (pinned, position)
+                tab.set_locations(snapshot.count_locations(location))
+
+            if sheet.id() == active_id:
+                active_pinned = pinned
+                active_position = position
+
+            if pinned is True:
+                tab.set_pinned(True)
+                pinned_tabs.append(tab)
+                pinned_views.append(item)
+            else:
+                tabs.append(tab)
+                self.views.append(item)
+
+        if active_position > -1:
+            # save index for later usage
+            self.current_tab_idx = active_position
+            if active_pinned is False:
+                self.current_tab_idx = active_position + len(pinned_tabs)
+
+        self.pinned_count = len(pinned_tabs)
+        tabs = pinned_tabs + tabs
+        self.views = pinned_views + self.views
         return tabs
 
+    def get_list_signature(self, groups: List[int]) -> Hashable:
+        """Gets a signature of what the list of tabs in the groups is
+            formatted from, which changes whenever the list would.
+        """
+        active: Optional[sublime.Sheet] = self.window.active_sheet()
+        return (
+            _registry.snapshot().version,
+            -1 if active is None else active.id(),
+            tuple(
+                tuple(sheet.id() for sheet in self.window.sheets_in_group(g))
+                for g in groups
+            ),
+            tuple(self.settings.get(key) for key in get_setting_keys()),
+        )
+
+    def rank_by_size(self, tabs: List[Tab]) -> List[Tab]:
+        """Orders the gathered tabs by the size of their buffers, largest
+            first, captioned with their sizes. Sheets without a view, e.g.
+            images, are left out.
+        """
+        current: Optional[Union[sublime.View, sublime.Sheet]] = None
+        if self.current_tab_idx > -1:
+            current = self.views[self.current_tab_idx]
+
+        positions: Dict[int, int] = {}
+        for (idx, item) in enumerate(self.views):
+            if isinstance(item, sublime.View):
+                if _buffer_sizes.get(item.id()) is None:
+                    # Views only go untallied until their first event.
+                    tally_view(item)
+                positions[item.id()] = idx
+
+        ranked: List[Tab] = []
+        views: List[Union[sublime.View, sublime.Sheet]] = []
+        for (view_id, size) in _buffer_sizes.heaviest(positions):
+            tab: Tab = tabs[positions[view_id]]
+            tab.add_caption(f"Buffer Size: {format_size(size)}")
+            ranked.append(tab)
+            views.append(self.views[positions[view_id]])
+
+        # Pinned tabs are ranked along with the rest.
+        self.views = views
+        self.pinned_count = 0
+        self.current_tab_idx = -1
+        if current is not None and current in views:
+            self.current_tab_idx = views.index(current)
+        return ranked
+
+    def sort_tabs(self, tabs: List[Tab], sort_by: str) -> List[Tab]:
+        """Orders the gathered tabs into sections by group, directory or
+            extension, captioned with their section, keeping pinned tabs
+            first.
+
+            Groups keep their tab order, while directories and extensions
+            are ordered by name, as kept by the registry rather than sorted
+            each time. Tabs it doesn't know of, e.g. images, follow the rest
+            in tab order.
+        """
+        current: Optional[Union[sublime.View, sublime.Sheet]] = None
+        if self.current_tab_idx > -1:
+            current = self.views[self.current_tab_idx]
+
+        order: List[int]
+        if sort_by == SORT_GROUP:
+            # Tabs are gathered group by group, so are already in order.
+            order = list(range(len(self.views)))
+        else:
+            positions: Dict[int, int] = {
+                item.id(): idx
+                for (idx, item) in enumerate(self.views)
+                if isinstance(item, sublime.View)
+            }
+            order = [
+                positions.pop(view_id)
+                for view_id in _registry.get_sorted(self.window.id(), sort_by)
+                if view_id in positions
+            ]
+            order.extend(sorted(positions.values()))
+            order.extend(
+                idx for (idx, item) in enumerate(self.views)
+                if not isinstance(item, sublime.View)
+            )
+
+        # Pinned tabs come first, in the same order as the rest.
+        order = (
+            [idx for idx in order if idx < self.pinned_count]
+            + [idx for idx in order if idx >= self.pinned_count]
+        )
+
+        # Groups are already captioned when show_group_caption is on.
+        group_captions: bool = (
+            sort_by == SORT_GROUP
+            and self.settings.get("show_group_caption") is not True
+        )
+        sorted_tabs: List[Tab] = []
+        for idx in order:
+            tab: Tab = tabs[idx]
+            file_name: Optional[str] = tab.get_file_name()
+            if group_captions is True:
+                group: int = get_sheet(self.views[idx]).group() + 1
+                tab.add_caption(f"Group: {group}")
+            elif sort_by == SORT_DIRECTORY and file_name is not None:
+                tab.add_caption(f"Directory: {path.dirname(file_name)}")
+            elif sort_by == SORT_EXTENSION and file_name is not None:
+                extension: str = path.splitext(file_name)[1].lower()
+                tab.add_caption(f"Extension: {extension or 'None'}")
+            sorted_tabs.append(tab)
+
+        self.views = [self.views[idx] for idx in order]
+        self.current_tab_idx = -1
+        if current is not None:
+            self.current_tab_idx = self.views.index(current)
+        return sorted_tabs
+
+    def order_by_history(self, tabs: List[Tab]) -> List[Tab]:
+        """Orders the gathered tabs by their latest position in the window's
+            navigation stack, latest first, captioned with how far back or
+            forward they are. Tabs which haven't been jumped to are left out.
+        """
+        (entries, position) = _navigation.entries(self.window.id())
+        positions: Dict[int, int] = {
+            item.id(): idx
+            for (idx, item) in enumerate(self.views)
+            if isinstance(item, sublime.View)
+        }
+
+        ordered: List[Tab] = []
+        views: List[Union[sublime.View, sublime.Sheet]] = []
+        self.history_positions = []
+        self.current_tab_idx = -1
+        for entry in range(len(entries) - 1, -1, -1):
+            idx: Optional[int] = positions.pop(entries[entry], None)
+            if idx is None:
+                continue
+
+            tab: Tab = tabs[idx]
+            if entry < position:
+                tab.add_caption(f"Back: {position - entry}")
+            elif entry > position:
+                tab.add_caption(f"Forward: {entry - position}")
+            else:
+                self.current_tab_idx = len(ordered)
+            ordered.append(tab)
+            views.append(self.views[idx])
+            self.history_positions.append(entry)
+
+        # Pinned tabs are ordered along with the rest.
+        self.views = views
+        self.pinned_count = 0
+        return ordered
+
     def format_tabs(
         self,
         tabs: List[Tab],
         formatting_settings: Tuple[TabSetting, ...]
     ) -> List[List[str]]:
         """Formats tabs for display in the quick info panel."""
+        gathered: List[Tab] = list(tabs)
+        collected: Dict[TabSetting, List[List[str]]]
+        collected = self.collect_enrichments(gathered, formatting_settings)
+
         for setting in formatting_settings:
+            if isinstance(setting, EnrichmentTabSetting):
+                # Captions are merged in the order of the settings rather
+                # than the order they were collected in, keeping them stable.
+                # Settings which missed their time budget are dropped.
+                if setting in collected:
+                    setting.merge(gathered, collected[setting])
+                continue
             tabs = setting.apply(tabs)
 
         return [tab.get_details() for tab in tabs]
 
+    def collect_enrichments(
+        self,
+        tabs: List[Tab],
+        formatting_settings: Tuple[TabSetting, ...]
+    ) -> Dict[TabSetting, List[List[str]]]:
+        """Collects captions for the enabled enrichment settings concurrently,
+            leaving out any which don't finish within their time budget.
+        """
+        # Imported on first use to keep loading the plugin quick.
+        from concurrent.futures import TimeoutError
+
+        start: float = monotonic()
+        futures: List[Tuple[EnrichmentTabSetting, "Future"]] = [
+            (setting, pool.get_executor().submit(setting.collect, tabs))
+            for setting in formatting_settings
+            if isinstance(setting, EnrichmentTabSetting)
+            and setting.is_enabled()
+        ]
+        collected: Dict[TabSetting, List[List[str]]] = {}
+
+        for (setting, future) in futures:
+            remaining: float = setting.get_timeout() - (monotonic() - start)
+            try:
+                collected[setting] = future.result(timeout=max(0.0, remaining))
+            except TimeoutError:
+                # The work carries on in the background and is cached, so
+                # the captions will be ready for the next invocation.
+                continue
+
+        return collected
+
+    def rank_tabs(self, max_items: int) -> List[int]:
+        """Gets the indexes of the top ranked tabs, i.e. pinned tabs, then
+            the most recently used, then those in the active group.
+        """
+        recent: List[int] = _history.most_recent(self.window.id())
+        ranks: Dict[int, int] = {
+            view_id: rank for (rank, view_id) in enumerate(recent)
+        }
+        active_group: Set[int] = set()
+        for sheet in self.window.sheets_in_group(self.window.active_group()):
+            view: Optional[sublime.View] = sheet.view()
+            if view is not None:
+                active_group.add(view.id())
+
+        def get_rank(idx: int) -> Tuple[bool, int, bool, int]:
+            item: Union[sublime.View, sublime.Sheet] = self.views[idx]
+            is_view: bool = isinstance(item, sublime.View)
+            return (
+                idx >= self.pinned_count,
+                ranks.get(item.id(), len(ranks)) if is_view else len(ranks),
+                is_view is False or item.id() not in active_group,
+                idx
+            )
+
+        return heapq.nsmallest(max_items, range(len(self.views)), get_rank)
+
     def display_quick_info_panel(
         self,
         tabs: List[List[str]],
-        preview: bool
+        preview: bool,
+        max_items: int = 0
     ) -> None:
-        """Displays the quick info panel with the formatted tabs."""
+        """Displays the quick info panel with the formatted tabs, limited to
+            the top ranked max_items tabs, if set, with an entry to show all.
+        """
+        self.preview = preview
+        self.max_items = max_items
+        (items, selected_index) = self.prepare_items(tabs, max_items)
+
+        if self.live is True:
+            _panel_filters.pop(self.window.id(), None)
+            self.show_live_panel(items, selected_index)
+            return
+
+        if self.multi_select is True:
+            self.window.show_quick_panel(
+                items,
+                self.on_done,
+                flags=sublime.MULTI_SELECT,
+                on_highlight=self.on_highlighted if preview else None,
+                selected_index=selected_index
+            )
+            return
+
         if preview is True:
             self.window.show_quick_panel(
-                tabs,
+                items,
                 self.on_done,
                 on_highlight=self.on_highlighted,
-                selected_index=self.current_tab_idx
+                selected_index=selected_index
             )
             return
 
-        self.window.show_quick_panel(tabs, self.on_done)
+        self.window.show_quick_panel(items, self.on_done)
 
-    def on_done(self, index: int) -> None:
-        """Callback handler to move focus to the selected tab index."""
+    def prepare_items(
+        self,
+        tabs: List[List[str]],
+        max_items: int
+    ) -> Tuple[List[List[str]], int]:
+        """Gets the quick panel items for the formatted tabs, along with the
+            index of the item to select.
+        """
+        self.formatted = tabs
+        self.display_indexes = None
+        selected_index: int = self.current_tab_idx
+
+        if max_items > 0 and len(tabs) > max_items:
+            self.display_indexes = self.rank_tabs(max_items)
+            selected_index = -1
+            if self.current_tab_idx in self.display_indexes:
+                selected_index = self.display_indexes.index(
+                    self.current_tab_idx
+                )
+            tabs = [tabs[idx] for idx in self.display_indexes]
+            tabs.append([
+                f"Show all {len(self.formatted)} tabs…",
+                f"Showing the {max_items} most recently used"
+            ])
+
+        self.files_offset = len(tabs)
+        if len(self.project_files) > 0:
+            tabs = tabs + [file.details for file in self.project_files]
+
+        return (tabs, selected_index)
+
+    def request_project_files(self) -> None:
+        """Schedules a refresh of the window's project folders in the
+            background, refreshing a live panel if any files change.
+        """
+        view: Optional[sublime.View] = self.window.active_view()
+        # View settings include any project specific exclusions.
+        settings: sublime.Settings = sublime.load_settings(
+            "Preferences.sublime-settings"
+        )
+        if view is not None:
+            settings = view.settings()
+
+        futures: List["Future"] = get_project_file_index().request(
+            self.window.folders(),
+            settings.get("folder_exclude_patterns") or [],
+            settings.get("file_exclude_patterns") or []
+        )
+        if self.live is True:
+            for future in futures:
+                future.add_done_callback(self.on_files_indexed)
+
+    def gather_project_files(self) -> None:
+        """Gathers the project files indexed so far which aren't already
+            open.
+        """
+        open_files: Set[str] = set()
+        for item in self.views:
+            if isinstance(item, sublime.View):
+                file_name: Optional[str] = item.file_name()
+                if file_name is not None:
+                    open_files.add(file_name)
+
+        self.project_files = [
+            file for file in get_project_file_index().get_files(
+                self.window.folders()
+            )
+            if file.file_name not in open_files
+        ]
+
+    def on_files_indexed(self, future: "Future") -> None:
+        """Schedules a refresh of the panel once the index has been
+            refreshed, if any files have changed.
+        """
+        if future.cancelled() or future.exception() is not None:
+            return
+        if future.result() is True:
+            window_id: int = self.window.id()
+            sublime.set_timeout(lambda: self.on_tabs_changed(window_id), 0)
+
+    def show_live_panel(
+        self,
+        items: List[List[str]],
+        selected_index: int
+    ) -> None:
+        """Shows the quick panel, refreshing it as the window's tabs change
+            until it's closed.
+        """
+        self.panel_generation = self.panel_generation + 1
+        self.highlighted_index = selected_index
+        self.displayed_items = self.get_displayed_items(items)
+        self.displayed_files = self.project_files
+        if self.subscription is None:
+            self.subscription = _registry.subscribe(self.on_tabs_changed)
+
+        self.window.show_quick_panel(
+            items,
+            partial(self.on_live_done, self.panel_generation),
+            flags=sublime.MULTI_SELECT if self.multi_select else 0,
+            on_highlight=partial(
+                self.on_live_highlighted,
+                self.panel_generation
+            ),
+            selected_index=selected_index
+        )
+
+    def stop_live_updates(self) -> None:
+        """Stops refreshing the panel."""
+        if self.subscription is not None:
+            _registry.unsubscribe(self.subscription)
+            self.subscription = None
+
+    def get_displayed_items(
+        self,
+        items: List[List[str]]
+    ) -> List[Tuple[Hashable, Tuple[str, ...]]]:
+        """Identifies each quick panel item by its view or sheet, along with
+            its details, so changes can be found between refreshes.
+        """
+        displayed: List[Tuple[Hashable, Tuple[str, ...]]] = []
+        # Project files are compared separately, as there may be many.
+        for (index, item) in enumerate(items[:self.files_offset]):
+            tab_idx: int = self.get_tab_index(index)
+            key: Hashable = None
+            if tab_idx > -1:
+                view: Union[sublime.View, sublime.Sheet] = self.views[tab_idx]
+                key = (isinstance(view, sublime.View), view.id())
+            displayed.append((key, tuple(item)))
+        return displayed
+
+    def on_tabs_changed(self, window_id: int) -> None:
+        """Schedules a refresh of the panel when the window's tabs change,
+            so a burst of changes only refreshes it once.
+        """
+        if window_id != self.window.id() or self.refresh_scheduled is True:
+            return
+
+        self.refresh_scheduled = True
+        sublime.set_timeout(self.refresh, LIVE_UPDATE_DELAY_MS)
+
+    def refresh(self) -> None:
+        """Re-shows the open panel if its items have changed, keeping the
+            filter text and selection.
+        """
+        self.refresh_scheduled = False
+        if self.subscription is None or self.rebuild is None:
+            return
+
+        current: Optional[Union[sublime.View, sublime.Sheet]] = None
+        if self.current_tab_idx > -1:
+            current = self.views[self.current_tab_idx]
+
+        formatted: List[List[str]] = self.rebuild()
+        if self.include_files is True:
+            self.gather_project_files()
+        files_offset: int = self.files_offset
+        (items, _) = self.prepare_items(formatted, self.max_items)
+        # Keep the tab to return to if the panel is cancelled, as previewing
+        # may have changed which is active.
+        self.current_tab_idx = -1
+        if current is not None and current in self.views:
+            self.current_tab_idx = self.views.index(current)
+
+        opcodes: List[Opcode] = diff_items(
+            self.displayed_items,
+            self.get_displayed_items(items)
+        )
+        if len(opcodes) == 0 and self.displayed_files == self.project_files:
+            return
+
+        selected_index: int = self.highlighted_index
+        if selected_index < files_offset:
+            selected_index = map_index(
+                opcodes,
+                selected_index,
+                self.files_offset
+            )
+        else:
+            # Project files keep their place after the tabs.
+            selected_index = min(
+                selected_index - files_offset + self.files_offset,
+                len(items) - 1
+            )
+
+        self.show_live_panel(items, selected_index)
+        text: str = _panel_filters.get(self.window.id(), "")
+        if len(text) > 0:
+            self.window.run_command("insert", {"characters": text})
+
+    def on_live_done(
+        self,
+        generation: int,
+        index: Union[int, List[int]]
+    ) -> None:
+        """Callback handler for live panels, ignoring replaced panels."""
+        if generation != self.panel_generation:
+            return
+        self.stop_live_updates()
+        self.on_done(index)
+
+    def on_live_highlighted(self, generation: int, index: int) -> None:
+        """Callback handler for live panels, tracking the highlighted item
+            and previewing it if enabled.
+        """
+        if generation != self.panel_generation:
+            return
+        self.highlighted_index = index
+        if self.preview is True:
+            self.on_highlighted(index)
+
+    def get_tab_index(self, index: int) -> int:
+        """Maps a quick panel index to a tab index, or -1 if the entry isn't
+            a tab.
+        """
+        if self.display_indexes is not None:
+            if index < 0 or index >= len(self.display_indexes):
+                return -1
+            return self.display_indexes[index]
+
+        if index < 0 or index >= len(self.views):
+            return -1
+        return index
+
+    def get_file_index(self, index: int) -> int:
+        """Maps a quick panel index to a project file index, or -1 if the
+            entry isn't a project file.
+        """
+        file_idx: int = index - self.files_offset
+        if index < 0 or file_idx < 0 or file_idx >= len(self.project_files):
+            return -1
+        return file_idx
+
+    def is_show_all(self, index: int) -> bool:
+        """Gets whether the quick panel index is the entry to show all."""
+        return (
+            self.display_indexes is not None
+            and index == len(self.display_indexes)
+        )
+
+    def focus_tab(self, index: int) -> None:
+        """Moves focus to the view or sheet for the given tab index."""
+        item: Union[sublime.View, sublime.Sheet] = self.views[index]
+        if isinstance(item, sublime.View):
+            self.window.focus_view(item)
+        else:
+            self.window.focus_sheet(item)
+
+    def jump_to_tab(self, index: int) -> None:
+        """Moves focus to the tab for the given tab index, recording the
+            jump in the navigation stack, or moving within it when listing
+            tabs by history.
+        """
+        item: Union[sublime.View, sublime.Sheet] = self.views[index]
+        if self.history_positions is not None:
+            _navigation.go_to(self.window.id(), self.history_positions[index])
+        elif isinstance(item, sublime.View):
+            _navigation.record(self.window.id(), item.id())
+        self.focus_tab(index)
+
+    def on_done(self, index: Union[int, List[int]]) -> None:
+        """Callback handler to move focus to the selected tab index, or to
+            act on each of the tabs selected at once.
+        """
+        # Previewing has finished, whether or not a tab was selected.
+        _previewing.discard(self.window.id())
+        if isinstance(index, list):
+            self.on_done_multiple(index)
+            return
+
+        if self.is_show_all(index):
+            # The panel can't be reopened from within its own callback.
+            sublime.set_timeout(
+                lambda: self.display_quick_info_panel(
+                    self.formatted,
+                    self.preview
+                ),
+                0
+            )
+            return
+
+        tab_idx: int = self.get_tab_index(index)
+        file_idx: int = self.get_file_index(index)
         if index == -1 and self.current_tab_idx != -1:
             # If the selection was quit, re-focus the last selected Tab
-            self.window.focus_view(self.views[self.current_tab_idx])
-        elif index > -1 and index < len(self.views):
-            self.window.focus_view(self.views[index])
+            self.focus_tab(self.current_tab_idx)
+            return
+        elif tab_idx > -1:
+            self.jump_to_tab(tab_idx)
+        elif file_idx > -1:
+            self.window.open_file(self.project_files[file_idx].file_name)
+        else:
+            return
+
+        telemetry: Optional[Telemetry] = get_telemetry()
+        if telemetry is not None:
+            telemetry.record_select(perf_counter() - self.shown_at, index)
+            save_telemetry_if_due(telemetry)
+
+    def on_done_multiple(self, indexes: List[int]) -> None:
+        """Callback handler for several selected entries, applying the
+            batch action to their tabs, or choosing one to apply. Project
+            files and the entry to show all are ignored.
+        """
+        items: List[Union[sublime.View, sublime.Sheet]] = []
+        for index in indexes:
+            tab_idx: int = self.get_tab_index(index)
+            if tab_idx > -1 and self.views[tab_idx] not in items:
+                items.append(self.views[tab_idx])
+
+        if len(items) == 0:
+            if self.current_tab_idx != -1:
+                self.focus_tab(self.current_tab_idx)
+            return
+
+        if self.batch_action is None:
+            # The panel can't be reopened from within its own callback.
+            sublime.set_timeout(lambda: self.choose_batch_action(items), 0)
+            return
+
+        self.apply_batch_action(items, self.batch_action, self.batch_group)
+
+    def get_batch_actions(self, count: int) -> List[Tuple[str, int, str]]:
+        """Gets the actions which can be applied to the given number of
+            tabs, each with its group and caption.
+        """
+        tabs: str = f"{count} Tab" if count == 1 else f"{count} Tabs"
+        actions: List[Tuple[str, int, str]] = [
+            (ACTION_CLOSE, -1, f"Close {tabs}"),
+            (ACTION_SAVE, -1, f"Save {tabs}"),
+        ]
+        if self.window.num_groups() > 1:
+            for group in range(self.window.num_groups()):
+                caption: str = f"Move {tabs} to Group {group + 1}"
+                actions.append((ACTION_MOVE, group, caption))
+        return actions
+
+    def choose_batch_action(
+        self,
+        items: List[Union[sublime.View, sublime.Sheet]]
+    ) -> None:
+        """Shows a quick panel to choose the action to apply to the tabs."""
+        actions: List[Tuple[str, int, str]] = self.get_batch_actions(
+            len(items)
+        )
+
+        def on_choose(index: int) -> None:
+            if index > -1 and index < len(actions):
+                (action, group, _) = actions[index]
+                self.apply_batch_action(items, action, group)
+            elif self.current_tab_idx != -1:
+                self.focus_tab(self.current_tab_idx)
+
+        self.window.show_quick_panel(
+            [caption for (_, _, caption) in actions],
+            on_choose
+        )
+
+    def apply_batch_action(
+        self,
+        items: List[Union[sublime.View, sublime.Sheet]],
+        action: str,
+        group: int = -1
+    ) -> None:
+        """Applies the action to each of the tabs in a single pass, focusing
+            the originally active tab once afterwards rather than after each.
+            Pinned tabs are never closed.
+        """
+        active: Optional[sublime.Sheet] = None
+        if self.current_tab_idx != -1:
+            active = get_sheet(self.views[self.current_tab_idx])
+        sheets: List[sublime.Sheet] = [get_sheet(item) for item in items]
+
+        if action == ACTION_CLOSE:
+            skipped: int = 0
+            for item in items:
+                if isinstance(item, sublime.View) and is_view_pinned(item):
+                    skipped = skipped + 1
+                    continue
+                get_sheet(item).close()
+            if skipped > 0:
+                sublime.status_message(
+                    f"Tab Filter: kept {skipped} pinned tabs open"
+                )
+        elif action == ACTION_SAVE:
+            for item in items:
+                # Only views have anything to save.
+                if isinstance(item, sublime.View) and item.is_dirty():
+                    item.run_command("save")
+        elif action == ACTION_MOVE:
+            if group < 0 or group >= self.window.num_groups():
+                sublime.status_message(f"Tab Filter: no group {group + 1}")
+                return
+            # Tabs are appended to the group, keeping their selected order.
+            index: int = len(self.window.sheets_in_group(group))
+            for sheet in sheets:
+                if sheet.group() == group:
+                    continue
+                self.window.set_sheet_index(sheet, group, index)
+                index = index + 1
+        else:
+            sublime.status_message(f"Tab Filter: unknown action: {action}")
+            return
+
+        if active is not None and active.window() is not None:
+            self.window.focus_sheet(active)
 
     def on_highlighted(self, index: int) -> None:
         """Callback handler to focus the currently highlighted Tab."""
-        if index > -1 and index < len(self.views):
-            self.window.focus_view(self.views[index])
+        tab_idx: int = self.get_tab_index(index)
+        if tab_idx > -1:
+            _previewing.add(self.window.id())
+            self.focus_tab(tab_idx)
 
-    def run(self, active_group_only=False) -> None:
+    def run(
+        self,
+        active_group_only=False,
+        only=None,
+        include_files=False,
+        multi_select=False,
+        action=None,
+        group=-1,
+        heaviest=False,
+        groups=None,
+        sort_by=None,
+        history=False
+    ) -> None:
         """Shows a quick panel to filter and select tabs from
-            the active window.
+            the active window, optionally only those in the given state,
+            or followed by the files in the window's project folders.
+
+            With multi_select, several tabs can be selected and then closed,
+            saved or moved to a group together, as given by action and
+            group, or as chosen once they've been selected.
+
+            With heaviest, tabs are ranked by the size of their buffers,
+            which can be combined with multi_select or action to close
+            several together.
+
+            The groups to list tabs from can be given as a group index, a
+            list of them, or one of "all", "active", "others", "left" or
+            "right", the latter relative to the active group.
+
+            Tabs can be sorted into sections by "group", "directory" or
+            "extension", overriding the sort_by setting.
+
+            With history, tabs are listed by their position in the
+            navigation stack, and selecting one moves to that position.
+        """
+        if action is not None and action not in BATCH_ACTIONS:
+            sublime.status_message(f"Tab Filter: unknown action: {action}")
+            return
+        self.multi_select = multi_select is True or action is not None
+        self.batch_action = action
+        self.batch_group = int(group)
+
+        with _timings.measure(TIMING_RUN):
+            self.show_tabs(
+                active_group_only,
+                only,
+                include_files,
+                heaviest,
+                groups,
+                sort_by,
+                history
+            )
+        self.shown_at = perf_counter()
+        log_timing(TIMING_RUN)
+
+        telemetry: Optional[Telemetry] = get_telemetry()
+        if telemetry is not None:
+            telemetry.record_panel(
+                _timings.get(TIMING_RUN) or 0.0,
+                len(self.views)
+            )
+            save_telemetry_if_due(telemetry)
+
+    def show_tabs(
+        self,
+        active_group_only: bool,
+        only: Optional[str],
+        include_files: bool = False,
+        heaviest: bool = False,
+        group_spec: GroupSpec = None,
+        sort_by: Optional[str] = None,
+        history: bool = False
+    ) -> None:
+        """Gathers, formats and displays the tabs of the given groups,
+            along with any project files indexed so far, optionally ranked by
+            size, sorted into sections or ordered by history.
         """
+        self.stop_live_updates()
         self.views = []
-        self.settings = sublime.load_settings("tabfilter.sublime-settings")
+        self.history_positions = None
+        self.project_files = []
+        self.settings = get_settings()
+        self.live = self.settings.get("live_update") is True
+        self.include_files = include_files
 
-        groups: List[int] = [self.window.active_group()]
+        if only is not None and only not in STATES:
+            sublime.status_message(f"Tab Filter: unknown tab state: {only}")
+            return
 
-        if active_group_only is False:
-            groups = list(range(self.window.num_groups()))
+        if sort_by is None:
+            sort_by = str(self.settings.get("sort_by") or "")
+        if sort_by != "" and sort_by not in SORT_MODES:
+            sublime.status_message(
+                f"Tab Filter: unknown sort order: {sort_by}"
+            )
+            return
 
-        tabs = self.gather_tabs(groups)
+        if group_spec is None and active_group_only is True:
+            group_spec = GROUPS_ACTIVE
+        try:
+            groups: List[int] = resolve_groups(
+                group_spec,
+                self.window.active_group(),
+                self.window.layout()["cells"]
+            )
+        except ValueError as error:
+            sublime.status_message(f"Tab Filter: {error}")
+            return
+        if len(groups) == 0:
+            sublime.status_message("Tab Filter: no groups to list tabs from")
+            return
+
+        collapse: bool = self.settings.get("collapse_duplicates") is True
+
+        def gather() -> List[Tab]:
+            gathered: List[Tab] = self.gather_tabs(groups, only, collapse)
+            if heaviest is True:
+                return self.rank_by_size(gathered)
+            if history is True:
+                return self.order_by_history(gathered)
+            if sort_by != "":
+                return self.sort_tabs(gathered, sort_by)
+            return gathered
+
+        # Only the settings which are switched on are instantiated, in the
+        # order the registry has resolved for them.
+        formatting_settings: Tuple[TabSetting, ...] = tuple(
+            setting(self.settings, self.window)
+            for setting in TAB_SETTINGS.get_plan(self.settings)
+        )
 
-        preview: bool = self.settings.get("preview_tab") is True
+        # Lists are reused until anything they're formatted from changes,
+        # other than sizes and enrichments, which change in the background.
+        scope: Hashable = (
+            self.window.id(),
+            tuple(groups),
+            only,
+            collapse,
+            sort_by
+        )
+        signature: Optional[Hashable] = None
+        if heaviest is False and history is False and not any(
+            isinstance(setting, EnrichmentTabSetting) and setting.is_enabled()
+            for setting in formatting_settings
+        ):
+            signature = self.get_list_signature(groups)
+
+        formatted: List[List[str]]
+        cached: Optional[CachedList] = None
+        if signature is not None:
+            cached = _group_lists.get(scope, signature)
+
+        if cached is not None:
+            self.views = list(cached.items)
+            self.current_tab_idx = cached.current_tab_idx
+            self.pinned_count = cached.pinned_count
+            formatted = cached.formatted
+        else:
+            formatted = self.format_tabs(gather(), formatting_settings)
+            if signature is not None:
+                _group_lists.put(
+                    scope,
+                    signature,
+                    CachedList(
+                        tuple(self.views),
+                        formatted,
+                        self.current_tab_idx,
+                        self.pinned_count
+                    )
+                )
+
+        if heaviest is True:
+            total: str = format_size(_buffer_sizes.total())
+            sublime.status_message(f"Tab Filter: {total} open in total")
 
-        if active_group_only is False:
-            preview = preview and self.window.num_groups() == 1
+        if include_files is True:
+            folders: List[str] = self.window.folders()
+            # Tabs are shown straight away, so while the index is still
+            # being built the panel is refreshed once it's ready.
+            if get_project_file_index().is_ready(folders) is False:
+                self.live = True
+                sublime.status_message("Tab Filter: indexing project files…")
+            self.request_project_files()
+            self.gather_project_files()
 
-        formatting_settings: Tuple[TabSetting, ...] = (
-            CommonPrefixTabSetting(self.settings, self.window),
-            ShowGroupCaptionTabSetting(self.settings, self.window),
-            ShowCaptionsTabSetting(self.settings, self.window),
-            IncludePathTabSetting(self.settings, self.window),
+        # Previewing moves focus between tabs, so is only possible within a
+        # single group.
+        preview: bool = (
+            self.settings.get("preview_tab") is True
+            and len(groups) == 1
+        )
+
+        self.rebuild = lambda: self.format_tabs(
+            gather(),
+            formatting_settings
         )
 
         self.display_quick_info_panel(
-            self.format_tabs(tabs, formatting_settings),
-            preview
+            formatted,
+            preview,
+            int(self.settings.get("max_items", 0))
+        )
+
+
+class TabFilterListener(sublime_plugin.EventListener):
+    """Keeps cached tab metadata and the tab registry up to date."""
+
+    def on_new(self, view: sublime.View) -> None:
+        """Indexes the new buffer."""
+        index_view(view)
+        tally_view(view)
+
+    def on_modified(self, view: sublime.View) -> None:
+        """Reindexes the view, as it may have become dirty or clean, and
+            tracks the quick panel's filter text for live updates.
+        """
+        if view.element() == "quick_panel:input":
+            window: Optional[sublime.Window] = view.window()
+            if window is not None:
+                _panel_filters[window.id()] = view.substr(
+                    sublime.Region(0, view.size())
+                )
+            return
+        index_view(view)
+
+    def on_modified_async(self, view: sublime.View) -> None:
+        """Keeps the size of the changed buffer up to date, away from the
+            main thread.
+        """
+        if view.element() is None:
+            tally_view(view)
+
+    def on_post_save(self, view: sublime.View) -> None:
+        """Reindexes the view, which is now clean and may be a file, whose
+            syntax, encoding or line endings may have changed.
+        """
+        index_view(view)
+        invalidate_view_details(view)
+
+    def on_post_text_command(
+        self,
+        view: sublime.View,
+        command_name: str,
+        args: Optional[Dict]
+    ) -> None:
+        """Forgets the view's details once they've been changed."""
+        if command_name in DETAIL_COMMANDS:
+            invalidate_view_details(view)
+
+    def on_revert(self, view: sublime.View) -> None:
+        """Reindexes the view, which is now clean."""
+        index_view(view)
+        tally_view(view)
+
+    def on_reload(self, view: sublime.View) -> None:
+        """Reindexes the view, which may have changed on disk."""
+        index_view(view)
+        tally_view(view)
+        invalidate_view_details(view)
+        revalidate_metadata(view)
+
+    def on_post_save_async(self, view: sublime.View) -> None:
+        """Invalidates the cached metadata of the saved file."""
+        name: Optional[str] = view.file_name()
+        if name is not None:
+            get_status_cache().invalidate(name)
+        revalidate_metadata(view)
+
+    def on_activated(self, view: sublime.View) -> None:
+        """Records the activation, loads placeholder views from restored tab
+            sets on first use and keeps the window within max_tabs.
+        """
+        window: Optional[sublime.Window] = view.window()
+        if window is None:
+            return
+
+        # Restoring a tab set activates each placeholder as it's created,
+        # which the user never jumped to.
+        if window.id() not in _restoring:
+            _history.touch(window.id(), view.id())
+            if window.id() not in _previewing:
+                _navigation.record(window.id(), view.id())
+        # Read only changes don't raise events, and views may have moved
+        # between windows, so catch up on activation.
+        index_view(view)
+        materialise_lazy_view(view)
+
+        settings: sublime.Settings = get_settings()
+        if (
+            int(settings.get("max_tabs", 0)) > 0
+            and window.id() not in _evicting
+            and window.id() not in _restoring
+        ):
+            # Batch up evictions on the async thread, rather than closing
+            # tabs in the middle of switching between them.
+            _evicting.add(window.id())
+            sublime.set_timeout_async(lambda: evict_tabs(window), 0)
+
+    def on_load(self, view: sublime.View) -> None:
+        """Indexes the loaded file and restores selections for files opened
+            from tab sets.
+        """
+        index_view(view)
+        tally_view(view)
+        # Syntaxes are assigned once files have loaded.
+        invalidate_view_details(view)
+        selections: Optional[List[Tuple[int, int]]]
+        selections = _pending_selections.pop(view.id(), None)
+        if selections is not None:
+            apply_selections(view, selections)
+
+    def on_close(self, view: sublime.View) -> None:
+        """Forgets any state held for the closed view."""
+        _pending_selections.pop(view.id(), None)
+        _history.discard(view.id())
+        _registry.discard(view.id())
+        _buffer_sizes.discard(view.id())
+        get_details_cache().invalidate(view.id())
+        get_pinned_tabs().discard_view(view.id())
+
+    def on_pre_close_window(self, window: sublime.Window) -> None:
+        """Forgets the closed window's navigation stack."""
+        _previewing.discard(window.id())
+        _navigation.discard_window(window.id())
+
+
+def get_candidate(record: TabRecord) -> sublime.ListInputItem:
+    """Gets the command palette item for a tab, from the cache if the tab
+        is unchanged.
+    """
+    item: Optional[sublime.ListInputItem] = _candidates.get(record)
+    if item is not None:
+        return item
+
+    text: str = record.name
+    if record.file_name is not None and len(text) == 0:
+        text = path.basename(record.file_name)
+    if len(text) == 0:
+        text = "untitled"
+
+    annotations: List[str] = []
+    if record.dirty is True:
+        annotations.append("Unsaved Changes")
+    if record.read_only is True:
+        annotations.append("Read Only")
+
+    item = sublime.ListInputItem(
+        text,
+        record.view_id,
+        annotation=", ".join(annotations)
+    )
+    _candidates[record] = item
+    return item
+
+
+def get_candidates(window: sublime.Window) -> List[sublime.ListInputItem]:
+    """Gets the command palette items for the window's tabs, most recently
+        used first, built from the tab registry rather than the views.
+    """
+    records: Dict[int, TabRecord] = {}
+    for record in _registry.get_records(window.id()):
+        view: sublime.View = sublime.View(record.view_id)
+        if view.is_valid() is False:
+            _registry.discard(record.view_id)
+            continue
+        if record.file_name is None:
+            # Buffers can be renamed without raising an event, so catch up.
+            if view.name() != record.name:
+                index_view(view)
+                record = _registry.get(record.view_id) or record
+        records[record.view_id] = record
+
+    order: List[int] = [
+        view_id for view_id in _history.most_recent(window.id())
+        if view_id in records
+    ]
+    if len(order) < len(records):
+        seen: Set[int] = set(order)
+        order.extend(
+            sorted(view_id for view_id in records if view_id not in seen)
         )
+
+    items: List[sublime.ListInputItem] = []
+    for view_id in order:
+        items.append(get_candidate(records[view_id]))
+
+    # Drop items for tabs which have since changed or closed.
+    for record in list(_candidates):
+        if records.get(record.view_id) != record:
+            del _candidates[record]
+
+    return items
+
+
+class TabFilterInputHandler(sublime_plugin.ListInputHandler):
+    """Input handler for selecting one of the active window's tabs, for use
+        in the command palette or by other commands.
+
+        The tabs come from the tab registry and previews from the cached
+        file metadata and version control statuses, so listing them doesn't
+        touch every view or the disk.
+    """
+    window: sublime.Window
+
+    def __init__(self, window: sublime.Window) -> None:
+        self.window = window
+
+    def name(self) -> str:
+        return "view_id"
+
+    def placeholder(self) -> str:
+        return "Tab"
+
+    def list_items(self) -> List[sublime.ListInputItem]:
+        return get_candidates(self.window)
+
+    def preview(self, value: int) -> str:
+        record: Optional[TabRecord] = _registry.get(value)
+        if record is None or record.file_name is None:
+            return ""
+
+        captions: List[str] = [record.file_name]
+        status: Optional[Tuple[str, bool]]
+        status = get_status_cache().get_status(record.file_name)
+        if status is not None:
+            captions.append(get_status_caption(status))
+        metadata: Optional[FileMetadata]
+        metadata = get_metadata_cache().get(record.file_name)
+        if metadata is not None:
+            captions.extend(get_metadata_captions(metadata))
+
+        return " · ".join(captions)
+
+
+class TabSetNameInputHandler(sublime_plugin.TextInputHandler):
+    """Input handler for the name of a new tab set."""
+
+    def name(self) -> str:
+        return "name"
+
+    def placeholder(self) -> str:
+        return "Tab set name"
+
+    def validate(self, text: str) -> bool:
+        return len(text.strip()) > 0
+
+
+class TabSetInputHandler(sublime_plugin.ListInputHandler):
+    """Input handler for selecting an existing tab set."""
+
+    def name(self) -> str:
+        return "name"
+
+    def placeholder(self) -> str:
+        return "Tab set"
+
+    def list_items(self) -> List[str]:
+        return get_tab_set_store().names()
+
+
+class TabFilterSaveSetCommand(sublime_plugin.WindowCommand):
+    """Saves the tabs of the active window as a named tab set."""
+
+    def input(self, args: Dict) -> Optional[TabSetNameInputHandler]:
+        if "name" not in args:
+            return TabSetNameInputHandler()
+        return None
+
+    def run(self, name: str) -> None:
+        gatherer: TabFilterCommand = TabFilterCommand(self.window)
+        groups: List[TabSetGroup] = []
+
+        for group_idx in range(self.window.num_groups()):
+            files: List[TabSetFile] = []
+            active: int = -1
+            active_view: Optional[sublime.View]
+            active_view = self.window.active_view_in_group(group_idx)
+
+            for tab in gatherer.gather_tabs([group_idx]):
+                view: Optional[sublime.View] = tab.get_view()
+                if view is None:
+                    continue
+
+                file_name: Optional[str] = tab.get_file_name()
+                if file_name is None:
+                    file_name = view.settings().get(LAZY_FILE_SETTING)
+                if file_name is None:
+                    # Buffers have nothing on disk to restore them from.
+                    continue
+
+                if active_view is not None and active_view.id() == view.id():
+                    active = len(files)
+                files.append(TabSetFile(file_name, get_selections(view)))
+
+            groups.append(TabSetGroup(files, active))
+
+        tab_set: TabSet = TabSet(
+            name.strip(),
+            self.window.layout(),
+            self.window.active_group(),
+            groups
+        )
+        get_tab_set_store().save(tab_set)
+        sublime.status_message(
+            f"Saved {tab_set.file_count()} tabs as tab set: {tab_set.name}"
+        )
+
+
+class TabFilterRestoreSetCommand(sublime_plugin.WindowCommand):
+    """Restores a named tab set into the active window.
+
+        Only the visible file in each group is loaded straight away, with the
+        rest opened as lightweight placeholders which load on activation.
+    """
+
+    def input(self, args: Dict) -> Optional[TabSetInputHandler]:
+        if "name" not in args:
+            return TabSetInputHandler()
+        return None
+
+    def run(self, name: str) -> None:
+        tab_set: Optional[TabSet] = get_tab_set_store().load(name)
+
+        if tab_set is None:
+            sublime.status_message(f"Tab set not found: {name}")
+            return
+
+        # Apply the layout in one go, before any files are opened.
+        self.window.set_layout(tab_set.layout)
+
+        active_views: List[sublime.View] = []
+        placeholders: List[Tuple[int, int, TabSetFile]] = []
+        num_groups: int = self.window.num_groups()
+
+        for (group_idx, group) in enumerate(tab_set.groups[:num_groups]):
+            # Restored files are added after any tabs already in the group.
+            position: int = len(self.window.sheets_in_group(group_idx))
+            for (idx, entry) in enumerate(group.files):
+                if idx == group.active:
+                    active_views.append(
+                        open_with_selections(
+                            self.window,
+                            entry.file_name,
+                            group_idx,
+                            entry.selections
+                        )
+                    )
+                elif self.window.find_open_file(entry.file_name) is None:
+                    placeholders.append((group_idx, position, entry))
+                else:
+                    continue
+                position = position + 1
+
+        _restoring.add(self.window.id())
+        self.create_placeholders(
+            placeholders,
+            0,
+            active_views,
+            tab_set.active_group
+        )
+
+    def create_placeholders(
+        self,
+        placeholders: List[Tuple[int, int, TabSetFile]],
+        start: int,
+        active_views: List[sublime.View],
+        active_group: int
+    ) -> None:
+        """Creates a batch of placeholder views, scheduling the next batch
+            so the editor stays responsive while restoring.
+        """
+        end: int = start + RESTORE_BATCH_SIZE
+
+        for (group, index, entry) in placeholders[start:end]:
+            if self.window.active_group() != group:
+                self.window.focus_group(group)
+            view: sublime.View = self.window.new_file()
+            view.set_scratch(True)
+            view.set_name(path.basename(entry.file_name))
+            view.settings().set(LAZY_FILE_SETTING, entry.file_name)
+            view.settings().set(LAZY_SELECTIONS_SETTING, entry.selections)
+            view.set_read_only(True)
+            index_view(view)
+            index = min(index, len(self.window.sheets_in_group(group)) - 1)
+            self.window.set_view_index(view, group, index)
+
+        if end < len(placeholders):
+            sublime.set_timeout(
+                lambda: self.create_placeholders(
+                    placeholders,
+                    end,
+                    active_views,
+                    active_group
+                ),
+                0
+            )
+            return
+
+        for view in active_views:
+            self.window.focus_view(view)
+        self.window.focus_group(active_group)
+        _restoring.discard(self.window.id())
+
+
+class TabFilterDeleteSetCommand(sublime_plugin.WindowCommand):
+    """Deletes a named tab set."""
+
+    def input(self, args: Dict) -> Optional[TabSetInputHandler]:
+        if "name" not in args:
+            return TabSetInputHandler()
+        return None
+
+    def run(self, name: str) -> None:
+        get_tab_set_store().delete(name)
+        sublime.status_message(f"Deleted tab set: {name}")
+
+
+class TabFilterFocusTabCommand(sublime_plugin.WindowCommand):
+    """Focuses a tab, selected in the command palette if not given."""
+
+    def input(self, args: Dict) -> Optional[TabFilterInputHandler]:
+        if "view_id" not in args:
+            return TabFilterInputHandler(self.window)
+        return None
+
+    def input_description(self) -> str:
+        return "Tab"
+
+    def run(self, view_id: int) -> None:
+        view: sublime.View = sublime.View(view_id)
+        if view.is_valid():
+            self.window.focus_view(view)
+
+
+class TabFilterExportTelemetryCommand(sublime_plugin.WindowCommand):
+    """Exports the local telemetry histograms as JSON or CSV, within the
+        cache directory, and opens the export.
+    """
+
+    def is_enabled(self, export_format: str = "json") -> bool:
+        return get_telemetry() is not None
+
+    def run(self, export_format: str = "json") -> None:
+        telemetry: Optional[Telemetry] = get_telemetry()
+        if telemetry is None:
+            return
+
+        telemetry.save()
+        file_name: str = get_telemetry_path()
+
+        if export_format == "csv":
+            file_name = path.splitext(file_name)[0] + ".csv"
+            with open(file_name, "w", encoding="utf-8") as handle:
+                handle.write(telemetry.to_csv())
+
+        self.window.open_file(file_name)
+        sublime.status_message(
+            f"Tab Filter: exported telemetry to {file_name}"
+        )
+
+
+class TabFilterReopenEvictedCommand(sublime_plugin.WindowCommand):
+    """Shows a quick panel to reopen tabs closed to stay within max_tabs."""
+    file_names: List[str] = []
+
+    def run(self) -> None:
+        self.file_names = _eviction_log.entries()
+
+        if len(self.file_names) == 0:
+            sublime.status_message("Tab Filter: no tabs have been evicted")
+            return
+
+        self.window.show_quick_panel(
+            [
+                [path.basename(file_name), file_name]
+                for file_name in self.file_names
+            ],
+            self.on_done
+        )
+
+    def on_done(self, index: int) -> None:
+        """Callback handler to reopen the selected file."""
+        if index > -1 and index < len(self.file_names):
+            file_name: str = self.file_names[index]
+            _eviction_log.discard(file_name)
+            self.window.open_file(file_name)
+
+
+class TabFilterCloseDuplicatesCommand(sublime_plugin.WindowCommand):
+    """Closes tabs in the active window which duplicate another tab for the
+        same file or buffer, keeping the active, pinned or most recently used
+        of each.
+    """
+
+    def run(self) -> None:
+        active: Optional[sublime.View] = self.window.active_view()
+        active_id: int = -1 if active is None else active.id()
+        recent: List[int] = _history.most_recent(self.window.id())
+        ranks: Dict[int, int] = {
+            view_id: rank for (rank, view_id) in enumerate(recent)
+        }
+        closed: int = 0
+
+        for view_ids in _registry.get_duplicates(self.window.id()):
+            views: List[sublime.View] = sorted(
+                (sublime.View(view_id) for view_id in view_ids),
+                key=lambda view: (
+                    view.id() != active_id,
+                    is_view_pinned(view) is False,
+                    ranks.get(view.id(), len(ranks))
+                )
+            )
+            # Closing a clone loses nothing while its buffer stays open
+            # elsewhere, but closing the last view of a dirty buffer would.
+            kept_buffers: Set[int] = {views[0].buffer_id()}
+
+            for view in views[1:]:
+                if is_view_pinned(view) or (
+                    view.is_dirty()
+                    and view.buffer_id() not in kept_buffers
+                ):
+                    kept_buffers.add(view.buffer_id())
+                    continue
+                if view.close():
+                    closed = closed + 1
+
+        sublime.status_message(f"Tab Filter: closed {closed} duplicate tabs")
+
+
+class TabFilterBackCommand(sublime_plugin.WindowCommand):
+    """Goes back to the tab jumped from, skipping any since closed."""
+
+    def run(self) -> None:
+        view_id: Optional[int] = _navigation.back(
+            self.window.id(),
+            partial(is_view_open, self.window)
+        )
+        if view_id is None:
+            sublime.status_message("Tab Filter: no tabs to go back to")
+            return
+        self.window.focus_view(sublime.View(view_id))
+
+
+class TabFilterForwardCommand(sublime_plugin.WindowCommand):
+    """Goes forward to the tab gone back from, skipping any since closed."""
+
+    def run(self) -> None:
+        view_id: Optional[int] = _navigation.forward(
+            self.window.id(),
+            partial(is_view_open, self.window)
+        )
+        if view_id is None:
+            sublime.status_message("Tab Filter: no tabs to go forward to")
+            return
+        self.window.focus_view(sublime.View(view_id))
+
+
+class TabFilterTogglePinCommand(sublime_plugin.WindowCommand):
+    """Pins or unpins a tab, defaulting to the active one.
+
+        Pinned tabs are listed first by Tab Filter and are never closed in
+        bulk.
+    """
+
+    def get_view(self, group: int, index: int) -> Optional[sublime.View]:
+        """Gets the view for the given tab, or the active view."""
+        if group < 0 or index < 0:
+            return self.window.active_view()
+
+        sheets: List[sublime.Sheet] = self.window.sheets_in_group(group)
+        if index >= len(sheets):
+            return None
+        return sheets[index].view()
+
+    def is_enabled(self, group: int = -1, index: int = -1) -> bool:
+        return self.get_view(group, index) is not None
+
+    def is_checked(self, group: int = -1, index: int = -1) -> bool:
+        view: Optional[sublime.View] = self.get_view(group, index)
+        return view is not None and is_view_pinned(view)
+
+    def run(self, group: int = -1, index: int = -1) -> None:
+        view: Optional[sublime.View] = self.get_view(group, index)
+        if view is None:
+            return
+
+        pinned: bool = get_pinned_tabs().toggle(view.file_name(), view.id())
+        # Pinned tabs are listed first, so cached lists are out of order.
+        _group_lists.clear()
+        sublime.status_message(
+            f"Tab Filter: {'pinned' if pinned else 'unpinned'} tab"
+        )
+
+
+_timings.record(TIMING_IMPORT, perf_counter() - IMPORT_STARTED)
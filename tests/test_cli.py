@@ -0,0 +1,150 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+import io
+import json
+from contextlib import redirect_stderr, redirect_stdout
+from os import path
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List, Tuple
+from unittest import TestCase
+try:
+    from lib import cli, session
+except ImportError:
+    # If we're running these tests in UnitTesting, then we need to use
+    # The package name - Tab Filter - so let's grab import lib and try again.
+    from importlib import import_module
+    cli = import_module(".lib.cli", "Tab Filter")
+    session = import_module(".lib.session", "Tab Filter")
+
+SessionRecord = session.SessionRecord
+
+PROJECT: str = path.join(path.sep, "missing", "project")
+MODELS: str = path.join(PROJECT, "app", "models.py")
+VIEWS: str = path.join(PROJECT, "app", "views.py")
+# As the project doesn't exist, the common prefix stops at its last
+# separator.
+SHORT_MODELS: str = "..." + path.sep + path.join("app", "models.py")
+SHORT_VIEWS: str = "..." + path.sep + path.join("app", "views.py")
+
+
+class CliTestCase(TestCase):
+    """Tests listing recorded tabs from the command line."""
+
+    directory: TemporaryDirectory
+
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(self, name: str, data: Dict[str, Any]) -> str:
+        file_name: str = path.join(self.directory.name, name)
+        with open(file_name, "w", encoding="utf-8") as handle:
+            json.dump(data, handle)
+        return file_name
+
+    def run_main(self, *argv: str) -> Tuple[int, List[str], str]:
+        stdout: io.StringIO = io.StringIO()
+        stderr: io.StringIO = io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            status: int = cli.main(list(argv))
+        return (status, stdout.getvalue().splitlines(), stderr.getvalue())
+
+    def test_matches_query(self) -> None:
+        """Tests queries match their characters in order, ignoring case."""
+        dataset: Tuple[Tuple[str, str, bool], ...] = (
+            ("", "models.py", True),
+            ("mod", "models.py", True),
+            ("MDpy", "models.py", True),
+            ("dom", "models.py", False),
+            ("models.pyc", "models.py", False),
+        )
+
+        for (query, text, expected) in dataset:
+            with self.subTest(query=query, text=text):
+                self.assertEqual(expected, cli.matches_query(query, text))
+
+    def test_format_records(self) -> None:
+        """Tests tabs are formatted a window at a time, as in the editor."""
+        records: List[SessionRecord] = [
+            SessionRecord(0, 0, MODELS, "", False),
+            SessionRecord(0, 0, VIEWS, "", True),
+            SessionRecord(0, 1, None, "notes", True),
+            SessionRecord(1, 0, MODELS, "", False),
+        ]
+
+        self.assertListEqual(
+            [
+                ["models.py", SHORT_MODELS],
+                ["views.py", SHORT_VIEWS, "Unsaved Changes"],
+                ["notes", "notes", "Unsaved Changes"],
+                ["models.py", SHORT_MODELS],
+            ],
+            [tab.get_details() for (_, tab) in cli.format_records(records)]
+        )
+
+        self.assertEqual(
+            SHORT_MODELS,
+            cli.format_records(records, include_path=True)[0][1].get_title()
+        )
+
+    def test_main(self) -> None:
+        """Tests listing the tabs of several files, with a query."""
+        workspace: str = self.write(
+            "project.sublime-workspace",
+            {"buffers": [{"file": MODELS}, {"file": VIEWS}]}
+        )
+        other: str = self.write(
+            "other.sublime-workspace",
+            {"buffers": [{"file": VIEWS}]}
+        )
+
+        (status, lines, _) = self.run_main(workspace, other)
+        self.assertEqual(0, status)
+        self.assertListEqual(
+            [
+                f"{workspace}\t0\t0\tmodels.py\t{SHORT_MODELS}",
+                f"{workspace}\t0\t0\tviews.py\t{SHORT_VIEWS}",
+                f"{other}\t0\t0\tviews.py\t{SHORT_VIEWS}",
+            ],
+            lines
+        )
+
+        (status, lines, _) = self.run_main("--json", "-q", "mdl", workspace)
+        self.assertEqual(0, status)
+        self.assertListEqual(
+            [
+                {
+                    "source": workspace,
+                    "window": 0,
+                    "group": 0,
+                    "file_name": MODELS,
+                    "title": "models.py",
+                    "subtitle": SHORT_MODELS,
+                    "dirty": False,
+                },
+            ],
+            [json.loads(line) for line in lines]
+        )
+
+        (status, lines, _) = self.run_main("-q", "zzz", workspace, other)
+        self.assertEqual(cli.EXIT_NO_MATCHES, status)
+        self.assertListEqual([], lines)
+
+    def test_main_with_invalid_file(self) -> None:
+        """Tests unreadable files are reported, without stopping the rest
+            from being listed.
+        """
+        missing: str = path.join(self.directory.name, "missing.json")
+        workspace: str = self.write(
+            "project.sublime-workspace",
+            {"buffers": [{"file": MODELS}]}
+        )
+
+        (status, lines, errors) = self.run_main(missing, workspace)
+
+        self.assertEqual(cli.EXIT_ERROR, status)
+        self.assertEqual(1, len(lines))
+        self.assertIn(missing, errors)
@@ -0,0 +1,65 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from typing import List, Tuple
+from unittest import TestCase
+try:
+    from lib import details
+except ImportError:
+    # If we're running these tests in UnitTesting, then we need to use
+    # The package name - Tab Filter - so let's grab import lib and try again.
+    from importlib import import_module
+    details = import_module(".lib.details", "Tab Filter")
+
+ViewDetails = details.ViewDetails
+ViewDetailsCache = details.ViewDetailsCache
+
+
+class ViewDetailsTestCase(TestCase):
+    """Tests describing the syntax, encoding and line endings of views."""
+
+    def test_get_details_captions(self) -> None:
+        """Tests captions are shown as asked for, leaving out unknowns."""
+        python: ViewDetails = ViewDetails("Python", "UTF-8", "Unix")
+        dataset: Tuple[Tuple[ViewDetails, Tuple[bool, ...], List[str]], ...]
+        dataset = (
+            (
+                python,
+                (True, True, True),
+                ["Syntax: Python", "Encoding: UTF-8", "Line Endings: Unix"]
+            ),
+            (python, (True, False, False), ["Syntax: Python"]),
+            (python, (False, False, True), ["Line Endings: Unix"]),
+            (
+                ViewDetails("", details.UNDEFINED_ENCODING, "Windows"),
+                (True, True, True),
+                ["Line Endings: Windows"]
+            ),
+        )
+
+        for (view_details, flags, expected) in dataset:
+            with self.subTest(details=view_details, flags=flags):
+                self.assertListEqual(
+                    expected,
+                    details.get_details_captions(view_details, *flags)
+                )
+
+    def test_cache(self) -> None:
+        """Tests details are cached per view until invalidated."""
+        cache: ViewDetailsCache = ViewDetailsCache()
+        python: ViewDetails = ViewDetails("Python", "UTF-8", "Unix")
+
+        self.assertIsNone(cache.get(10))
+        cache.put(10, python)
+        cache.put(11, python._replace(syntax="JSON"))
+
+        self.assertEqual(python, cache.get(10))
+
+        cache.invalidate(10)
+        self.assertIsNone(cache.get(10))
+        self.assertEqual("JSON", cache.get(11).syntax)
+
+        # Invalidating an unknown view is harmless.
+        cache.invalidate(99)
+        cache.clear()
+        self.assertIsNone(cache.get(11))
@@ -0,0 +1,65 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from unittest import TestCase
+try:
+    from lib import diff
+except ImportError:
+    # If we're running these tests in UnitTesting, then we need to use
+    # The package name - Tab Filter - so let's grab import lib and try again.
+    from importlib import import_module
+    diff = import_module(".lib.diff", "Tab Filter")
+
+
+class DiffItemsTestCase(TestCase):
+    """Tests diffing quick panel items."""
+
+    def test_equal(self) -> None:
+        """Tests equal lists have no edits."""
+        self.assertListEqual([], diff.diff_items(["a", "b"], ["a", "b"]))
+        self.assertListEqual([], diff.diff_items([], []))
+
+    def test_edits(self) -> None:
+        """Tests only the changed runs are returned."""
+        self.assertListEqual(
+            [
+                ("insert", 0, 0, 0, 1),
+                ("replace", 2, 3, 3, 4),
+                ("delete", 4, 5, 5, 5),
+            ],
+            diff.diff_items(
+                ["a", "b", "c", "d", "e"],
+                ["x", "a", "b", "y", "d"]
+            )
+        )
+
+
+class MapIndexTestCase(TestCase):
+    """Tests mapping selections between refreshes."""
+
+    def test_map_index(self) -> None:
+        """Tests indexes follow their items, or the closest position."""
+        old = ["a", "b", "c", "d"]
+        new = ["x", "a", "d"]
+        opcodes = diff.diff_items(old, new)
+
+        data = [
+            (-1, -1),
+            (0, 1),
+            (1, 2),
+            (2, 2),
+            (3, 2),
+        ]
+
+        for (index, expected) in data:
+            with self.subTest(index=index, expected=expected):
+                self.assertEqual(
+                    expected,
+                    diff.map_index(opcodes, index, len(new))
+                )
+
+    def test_map_index_to_empty(self) -> None:
+        """Tests mapping into an emptied list."""
+        opcodes = diff.diff_items(["a"], [])
+
+        self.assertEqual(0, diff.map_index(opcodes, 0, 0))
@@ -14,6 +14,8 @@ except ImportError:
     entities = import_module(".lib.entities", "Tab Filter")
 
 Tab = entities.Tab
+SheetTab = entities.SheetTab
+SessionTab = entities.SessionTab
 
 
 class TabTestCase(TestCase):
@@ -133,6 +135,25 @@ class TabTestCase(TestCase):
         expected: str = path.dirname(fixture)
         self.assertEquals(expected, entity.get_path())
 
+    def test_get_file_name(self) -> None:
+        """Tests getting the file name for a Tab."""
+        scratch_view: sublime.View = sublime.active_window().new_file()
+
+        entity: Tab = Tab(scratch_view)
+
+        self.assertIsNone(entity.get_file_name())
+
+        dir: str = path.dirname(__file__)
+
+        fixture: str = path.normpath(
+            path.join(dir, "./fixtures/foo.txt")
+        )
+
+        file_view: sublime.View = sublime.active_window().open_file(fixture)
+
+        entity = Tab(file_view)
+        self.assertEquals(fixture, entity.get_file_name())
+
     def test_get_view(self) -> None:
         """Tests getting the underlying view for a Tab."""
         scratch_view: sublime.View = sublime.active_window().new_file()
@@ -228,3 +249,52 @@ class TabTestCase(TestCase):
         entity: Tab = Tab(scratch_view)
 
         self.assertEquals(entity.get_title(), str(entity))
+
+
+class SheetTabTestCase(TestCase):
+    """Tests the sheet tab entity works as expected."""
+
+    def tearDown(self) -> None:
+        for sheet in sublime.active_window().sheets():
+            if sheet.view() is None:
+                sheet.close()
+
+    def test_initialisation(self) -> None:
+        """Test initialising a SheetTab from a sheet without a view."""
+        sheet: sublime.HtmlSheet = sublime.active_window().new_html_sheet(
+            "",
+            "<p>Hello</p>"
+        )
+
+        entity: SheetTab = SheetTab(sheet)
+
+        self.assertIsNone(entity.get_view())
+        self.assertIs(sheet, entity.get_sheet())
+        self.assertEqual("untitled", entity.get_title())
+        self.assertEqual("untitled", entity.get_subtitle())
+        self.assertFalse(entity.is_file_view())
+        self.assertIsNone(entity.get_file_name())
+        self.assertEqual(SheetTab(sheet), entity)
+
+
+class SessionTabTestCase(TestCase):
+    """Tests the session tab entity works as expected."""
+
+    def test_initialisation(self) -> None:
+        """Test initialising a SessionTab from recorded names."""
+        file_name: str = path.join("project", "src", "foo.py")
+        dataset: Tuple[Tuple[Optional[str], str, str, str, bool], ...] = (
+            (file_name, "", "foo.py", file_name, True),
+            (None, "notes", "notes", "notes", False),
+            (None, "", "untitled", "untitled", False),
+        )
+
+        for (name, view_name, title, subtitle, is_file) in dataset:
+            with self.subTest(name=name, view_name=view_name):
+                entity: SessionTab = SessionTab(name, view_name)
+
+                self.assertIsNone(entity.get_view())
+                self.assertEqual(title, entity.get_title())
+                self.assertEqual(subtitle, entity.get_subtitle())
+                self.assertEqual(is_file, entity.is_file_view())
+                self.assertEqual(name, entity.get_file_name())
@@ -0,0 +1,229 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+import os
+from concurrent.futures import Future
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+from typing import Any, Callable, List
+try:
+    from lib import files
+except ImportError:
+    # If we're running these tests in UnitTesting, then we need to use
+    # The package name - Tab Filter - so let's grab import lib and try again.
+    from importlib import import_module
+    files = import_module(".lib.files", "Tab Filter")
+
+FolderIndex = files.FolderIndex
+ProjectFileIndex = files.ProjectFileIndex
+
+
+class ImmediateExecutor(object):
+    """Executor stand-in that runs submitted work straight away."""
+
+    def submit(self, fn: Callable, *args: Any) -> Future:
+        future: Future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+class FolderIndexTestCase(TestCase):
+    """Tests indexing the files within a folder."""
+
+    directory: TemporaryDirectory
+    root: str
+
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+        self.root = path.join(self.directory.name, "project")
+        for name in ("src/lib/b.py", "src/a.py", "README.md", ".git/HEAD"):
+            self.write(name)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(self, name: str) -> str:
+        file_name: str = path.join(self.root, *name.split("/"))
+        os.makedirs(path.dirname(file_name), exist_ok=True)
+        with open(file_name, "w") as handle:
+            handle.write(name)
+        return file_name
+
+    def touch_directory(self, name: str, offset: int) -> None:
+        """Moves a directory's modification time, as file systems with
+            coarse timestamps may not register changes made within a test.
+        """
+        directory: str = path.join(self.root, *name.split("/"))
+        mtime: int = os.stat(directory).st_mtime_ns + offset
+        os.utime(directory, ns=(mtime, mtime))
+
+    def get_display_paths(self, index: FolderIndex) -> List[str]:
+        return [
+            file.display_path.replace(os.sep, "/")
+            for file in index.get_files()
+        ]
+
+    def test_refresh(self) -> None:
+        """Tests files are listed by directory, in name order, relative to
+            the folder's parent.
+        """
+        index: FolderIndex = FolderIndex(self.root)
+
+        self.assertFalse(index.is_ready())
+        self.assertEqual((), index.get_files())
+
+        self.assertTrue(index.refresh())
+        self.assertTrue(index.is_ready())
+        self.assertListEqual(
+            [
+                "project/README.md",
+                "project/.git/HEAD",
+                "project/src/a.py",
+                "project/src/lib/b.py",
+            ],
+            self.get_display_paths(index)
+        )
+        self.assertEqual(
+            path.join(self.root, "README.md"),
+            index.get_files()[0].file_name
+        )
+        self.assertListEqual(
+            [
+                "README.md",
+                path.join("project", "README.md"),
+                files.PROJECT_FILE_CAPTION,
+            ],
+            index.get_files()[0].details
+        )
+
+    def test_refresh_excludes_patterns(self) -> None:
+        """Tests excluded folders aren't scanned and excluded files aren't
+            listed.
+        """
+        index: FolderIndex = FolderIndex(self.root, [".git", "li?"], ["*.md"])
+        index.refresh()
+
+        self.assertListEqual(
+            ["project/src/a.py"],
+            self.get_display_paths(index)
+        )
+
+    def test_refresh_incremental(self) -> None:
+        """Tests only changed directories are rescanned."""
+        index: FolderIndex = FolderIndex(self.root)
+        index.refresh()
+
+        with patch.object(
+            FolderIndex,
+            "_scan",
+            autospec=True,
+            side_effect=FolderIndex._scan
+        ) as mock_scan:
+            self.assertFalse(index.refresh())
+            mock_scan.assert_not_called()
+
+            self.write("src/lib/c.py")
+            self.touch_directory("src/lib", 1000)
+
+            self.assertTrue(index.refresh())
+            mock_scan.assert_called_once_with(
+                index,
+                path.join(self.root, "src", "lib"),
+                os.stat(path.join(self.root, "src", "lib")).st_mtime_ns
+            )
+
+        self.assertIn("project/src/lib/c.py", self.get_display_paths(index))
+
+    def test_refresh_removed_directory(self) -> None:
+        """Tests the files of removed directories are dropped."""
+        index: FolderIndex = FolderIndex(self.root)
+        index.refresh()
+
+        os.remove(path.join(self.root, "src", "lib", "b.py"))
+        os.rmdir(path.join(self.root, "src", "lib"))
+        self.touch_directory("src", 1000)
+
+        self.assertTrue(index.refresh())
+        self.assertNotIn(
+            "project/src/lib/b.py",
+            self.get_display_paths(index)
+        )
+
+    def test_refresh_missing_folder(self) -> None:
+        """Tests missing folders are indexed as empty."""
+        index: FolderIndex = FolderIndex(path.join(self.root, "missing"))
+
+        self.assertTrue(index.refresh())
+        self.assertTrue(index.is_ready())
+        self.assertEqual((), index.get_files())
+
+
+class ProjectFileIndexTestCase(TestCase):
+    """Tests indexing project folders in the background."""
+
+    directory: TemporaryDirectory
+
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+        patcher = patch.object(
+            files,
+            "get_executor",
+            return_value=ImmediateExecutor()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def make_folder(self, name: str, *file_names: str) -> str:
+        folder: str = path.join(self.directory.name, name)
+        os.makedirs(folder)
+        for file_name in file_names:
+            with open(path.join(folder, file_name), "w") as handle:
+                handle.write(file_name)
+        return folder
+
+    def test_request(self) -> None:
+        """Tests folders are indexed on request, and their files listed in
+            the order of the folders.
+        """
+        first: str = self.make_folder("first", "a.txt")
+        second: str = self.make_folder("second", "b.txt", "c.txt")
+        index: ProjectFileIndex = ProjectFileIndex()
+
+        self.assertFalse(index.is_ready([first, second]))
+        self.assertEqual([], index.get_files([first, second]))
+
+        futures: List[Future] = index.request([second, first])
+
+        self.assertEqual(2, len(futures))
+        self.assertTrue(all(future.result() for future in futures))
+        self.assertTrue(index.is_ready([first, second]))
+        self.assertListEqual(
+            [
+                path.join(first, "a.txt"),
+                path.join(second, "b.txt"),
+                path.join(second, "c.txt"),
+            ],
+            [file.file_name for file in index.get_files([first, second])]
+        )
+
+        # Unchanged folders are refreshed without changing.
+        self.assertFalse(index.request([first])[0].result())
+
+    def test_request_with_changed_patterns(self) -> None:
+        """Tests folders are indexed afresh when the exclusions change."""
+        folder: str = self.make_folder("folder", "a.txt", "b.log")
+        index: ProjectFileIndex = ProjectFileIndex()
+
+        index.request([folder])
+        self.assertEqual(2, len(index.get_files([folder])))
+
+        self.assertTrue(index.request([folder], [], ["*.log"])[0].result())
+        self.assertListEqual(
+            [path.join(folder, "a.txt")],
+            [file.file_name for file in index.get_files([folder])]
+        )
@@ -0,0 +1,88 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from typing import Any, List, Tuple
+from unittest import TestCase
+try:
+    from lib import groups
+except ImportError:
+    # If we're running these tests in UnitTesting, then we need to use
+    # The package name - Tab Filter - so let's grab import lib and try again.
+    from importlib import import_module
+    groups = import_module(".lib.groups", "Tab Filter")
+
+CachedList = groups.CachedList
+GroupListCache = groups.GroupListCache
+
+# Three columns, with the last split into two rows.
+CELLS: List[List[float]] = [
+    [0, 0, 1, 2],
+    [1, 0, 2, 2],
+    [2, 0, 3, 1],
+    [2, 1, 3, 2],
+]
+
+
+class ResolveGroupsTestCase(TestCase):
+    """Tests resolving which groups to list tabs from."""
+
+    def test_resolve_groups(self) -> None:
+        """Tests groups are resolved by index and relative to the active
+            group.
+        """
+        dataset: Tuple[Tuple[Any, int, List[int]], ...] = (
+            (None, 1, [0, 1, 2, 3]),
+            (groups.GROUPS_ALL, 1, [0, 1, 2, 3]),
+            (groups.GROUPS_ACTIVE, 1, [1]),
+            (groups.GROUPS_OTHERS, 1, [0, 2, 3]),
+            (groups.GROUPS_LEFT, 1, [0]),
+            (groups.GROUPS_RIGHT, 1, [2, 3]),
+            (groups.GROUPS_LEFT, 0, []),
+            (groups.GROUPS_RIGHT, 3, []),
+            (groups.GROUPS_LEFT, 3, [0, 1]),
+            (2, 0, [2]),
+            ([3, 0, 3], 0, [3, 0]),
+        )
+
+        for (spec, active_group, expected) in dataset:
+            with self.subTest(spec=spec, active_group=active_group):
+                self.assertListEqual(
+                    expected,
+                    groups.resolve_groups(spec, active_group, CELLS)
+                )
+
+    def test_resolve_invalid_groups(self) -> None:
+        """Tests unknown scopes and groups are rejected."""
+        for spec in ("middle", 4, -1, [0, 9], [True], ["0"], 1.5):
+            with self.subTest(spec=spec):
+                with self.assertRaises(ValueError):
+                    groups.resolve_groups(spec, 0, CELLS)
+
+
+class GroupListCacheTestCase(TestCase):
+    """Tests caching formatted lists per scope."""
+
+    def test_get(self) -> None:
+        """Tests lists are only reused while their signature is unchanged."""
+        cache: GroupListCache = GroupListCache()
+        cached: CachedList = CachedList((1, 2), [["a"], ["b"]], 0, 0)
+        cache.put((1, (0,)), (5, 10), cached)
+
+        self.assertIs(cached, cache.get((1, (0,)), (5, 10)))
+        self.assertIsNone(cache.get((1, (0,)), (6, 10)))
+        self.assertIsNone(cache.get((1, (1,)), (5, 10)))
+
+        cache.clear()
+        self.assertIsNone(cache.get((1, (0,)), (5, 10)))
+
+    def test_max_scopes(self) -> None:
+        """Tests the least recently used scopes are dropped."""
+        cache: GroupListCache = GroupListCache(max_scopes=2)
+        for scope in ("a", "b"):
+            cache.put(scope, 1, CachedList((), [], -1, 0))
+        cache.get("a", 1)
+        cache.put("c", 1, CachedList((), [], -1, 0))
+
+        self.assertIsNotNone(cache.get("a", 1))
+        self.assertIsNone(cache.get("b", 1))
+        self.assertIsNotNone(cache.get("c", 1))
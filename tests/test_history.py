@@ -0,0 +1,141 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from unittest import TestCase
+try:
+    from lib import history
+except ImportError:
+    # If we're running these tests in UnitTesting, then we need to use
+    # The package name - Tab Filter - so let's grab import lib and try again.
+    from importlib import import_module
+    history = import_module(".lib.history", "Tab Filter")
+
+ActivationHistory = history.ActivationHistory
+EvictionLog = history.EvictionLog
+NavigationStack = history.NavigationStack
+
+
+class ActivationHistoryTestCase(TestCase):
+    """Tests tracking the order views are activated in."""
+
+    def test_most_recent(self) -> None:
+        """Tests views are ordered most recently activated first."""
+        activations: ActivationHistory = ActivationHistory()
+        activations.touch(1, 10)
+        activations.touch(1, 11)
+        activations.touch(1, 12)
+        activations.touch(1, 10)
+        activations.touch(2, 20)
+
+        self.assertListEqual([10, 12, 11], activations.most_recent(1))
+        self.assertListEqual([20], activations.most_recent(2))
+        self.assertListEqual([], activations.most_recent(3))
+
+    def test_least_recent(self) -> None:
+        """Tests views never activated are treated as least recent."""
+        activations: ActivationHistory = ActivationHistory()
+        activations.touch(1, 10)
+        activations.touch(1, 11)
+        activations.touch(1, 10)
+
+        self.assertListEqual(
+            [12, 13, 11, 10],
+            activations.least_recent(1, [10, 11, 12, 13])
+        )
+
+    def test_discard_and_move(self) -> None:
+        """Tests closed views are forgotten and moved views are tracked."""
+        activations: ActivationHistory = ActivationHistory()
+        activations.touch(1, 10)
+        activations.touch(1, 11)
+        activations.discard(10)
+        activations.touch(2, 11)
+
+        self.assertListEqual([], activations.most_recent(1))
+        self.assertListEqual([11], activations.most_recent(2))
+
+        # Discarding an unknown view is harmless.
+        activations.discard(99)
+
+
+class EvictionTestCase(TestCase):
+    """Tests selecting and logging evictions."""
+
+    def test_navigation(self) -> None:
+        """Tests going back and forward through tab jumps, dropping the
+            jumps ahead once another is made.
+        """
+        stack: NavigationStack = NavigationStack()
+        for view_id in (10, 11, 11, 12):
+            stack.record(1, view_id)
+        stack.record(2, 20)
+
+        def is_open(view_id: int) -> bool:
+            return True
+
+        self.assertEqual(11, stack.back(1, is_open))
+        self.assertEqual(10, stack.back(1, is_open))
+        self.assertIsNone(stack.back(1, is_open))
+        self.assertEqual(11, stack.forward(1, is_open))
+
+        # Activating the view gone back to isn't another jump.
+        stack.record(1, 11)
+        self.assertTupleEqual(([10, 11, 12], 1), stack.entries(1))
+
+        stack.record(1, 13)
+        self.assertTupleEqual(([10, 11, 13], 2), stack.entries(1))
+        self.assertIsNone(stack.forward(1, is_open))
+        self.assertTupleEqual(([20], 0), stack.entries(2))
+        self.assertIsNone(stack.back(3, is_open))
+
+        stack.go_to(1, 0)
+        self.assertTupleEqual(([10, 11, 13], 0), stack.entries(1))
+
+        stack.discard_window(1)
+        self.assertTupleEqual(([], -1), stack.entries(1))
+
+    def test_navigation_skips_closed(self) -> None:
+        """Tests closed views, and the current view, are skipped over."""
+        stack: NavigationStack = NavigationStack(size=4)
+        for view_id in (10, 11, 12, 13, 11, 14):
+            stack.record(1, view_id)
+
+        # Only the most recent jumps are kept.
+        self.assertTupleEqual(([12, 13, 11, 14], 3), stack.entries(1))
+
+        def is_open(view_id: int) -> bool:
+            return view_id != 13
+
+        self.assertEqual(11, stack.back(1, is_open))
+        self.assertEqual(12, stack.back(1, is_open))
+        self.assertEqual(11, stack.forward(1, is_open))
+
+    def test_select_evictions(self) -> None:
+        """Tests only evictable views are selected, up to the excess."""
+        protected = {11, 13}
+
+        self.assertListEqual(
+            [10, 12],
+            history.select_evictions(
+                [10, 11, 12, 13, 14],
+                2,
+                lambda view_id: view_id not in protected
+            )
+        )
+        self.assertListEqual(
+            [],
+            history.select_evictions([10, 11], 0, lambda view_id: True)
+        )
+
+    def test_eviction_log(self) -> None:
+        """Tests the log is bounded, de-duplicated and newest first."""
+        log: EvictionLog = EvictionLog(size=3)
+        log.record(["a", "b", "c"])
+        log.record(["a", "d"])
+
+        self.assertListEqual(["d", "a", "c"], log.entries())
+
+        log.discard("a")
+        log.discard("missing")
+
+        self.assertListEqual(["d", "c"], log.entries())
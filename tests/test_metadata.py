@@ -0,0 +1,166 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+import os
+from concurrent.futures import Future
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+from typing import Any, Callable, Optional, Tuple
+try:
+    from lib import metadata
+except ImportError:
+    # If we're running these tests in UnitTesting, then we need to use
+    # The package name - Tab Filter - so let's grab import lib and try again.
+    from importlib import import_module
+    metadata = import_module(".lib.metadata", "Tab Filter")
+
+MetadataCache = metadata.MetadataCache
+
+
+class ImmediateExecutor(object):
+    """Executor stand-in that runs submitted work straight away."""
+
+    def submit(self, fn: Callable, *args: Any) -> Future:
+        future: Future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+class MetadataTestCase(TestCase):
+    """Tests computing and caching file metadata."""
+
+    directory: TemporaryDirectory
+
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+        patcher = patch.object(
+            metadata,
+            "get_executor",
+            return_value=ImmediateExecutor()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write(self, name: str, contents: bytes) -> str:
+        file_name: str = path.join(self.directory.name, name)
+        with open(file_name, "wb") as handle:
+            handle.write(contents)
+        return file_name
+
+    def test_count_lines(self) -> None:
+        """Tests counting lines, with and without a trailing newline."""
+        data_set: Tuple[Tuple[bytes, int], ...] = (
+            (b"", 0),
+            (b"foo", 1),
+            (b"foo\n", 1),
+            (b"foo\nbar", 2),
+            (b"foo\nbar\n", 2),
+        )
+
+        for (contents, expected) in data_set:
+            with self.subTest(contents=contents, expected=expected):
+                file_name: str = self.write("lines.txt", contents)
+                self.assertEqual(
+                    expected,
+                    metadata.count_lines(file_name, len(contents))
+                )
+
+    def test_count_lines_memory_mapped(self) -> None:
+        """Tests counting lines in files large enough to be memory mapped."""
+        line: bytes = b"x" * 99 + b"\n"
+        count: int = (metadata.MMAP_THRESHOLD * 3) // len(line)
+        file_name: str = self.write("large.log", line * count + b"tail")
+
+        self.assertEqual(
+            count + 1,
+            metadata.count_lines(file_name, os.stat(file_name).st_size)
+        )
+
+    def test_format_size(self) -> None:
+        """Tests formatting sizes for humans."""
+        data_set: Tuple[Tuple[int, str], ...] = (
+            (0, "0 B"),
+            (1023, "1023 B"),
+            (1536, "1.5 KB"),
+            (5 * 1024 * 1024, "5.0 MB"),
+        )
+
+        for (size, expected) in data_set:
+            with self.subTest(size=size, expected=expected):
+                self.assertEqual(expected, metadata.format_size(size))
+
+    def test_get_metadata_captions(self) -> None:
+        """Tests captions are built for each of the chosen details."""
+        details: metadata.FileMetadata = metadata.FileMetadata(1536, 0, 1200)
+
+        self.assertListEqual(
+            ["Size: 1.5 KB", "Lines: 1,200"],
+            metadata.get_metadata_captions(details, show_mtime=False)
+        )
+        self.assertListEqual(
+            [f"Modified: {metadata.format_mtime(0)}"],
+            metadata.get_metadata_captions(details, False, False, True)
+        )
+
+    def test_request(self) -> None:
+        """Tests requested metadata is cached and kept up to date."""
+        cache: MetadataCache = MetadataCache()
+        file_name: str = self.write("foo.txt", b"foo\nbar\n")
+
+        self.assertIsNone(cache.get(file_name))
+
+        cache.request([file_name])
+        cached: Optional[metadata.FileMetadata] = cache.get(file_name)
+
+        self.assertIsNotNone(cached)
+        self.assertEqual(8, cached.size)  # type: ignore
+        self.assertEqual(2, cached.lines)  # type: ignore
+
+        with patch.object(metadata, "count_lines") as mock_count_lines:
+            # An unchanged file shouldn't be counted again.
+            cache.request([file_name])
+            cache.revalidate([file_name])
+            mock_count_lines.assert_not_called()
+
+        self.write("foo.txt", b"foo\nbar\nbaz\n")
+        cache.revalidate([file_name])
+
+        self.assertEqual(3, cache.get(file_name).lines)  # type: ignore
+
+    def test_request_throttled(self) -> None:
+        """Tests recently checked files aren't checked again on request."""
+        cache: MetadataCache = MetadataCache()
+        file_name: str = self.write("foo.txt", b"foo\n")
+        cache.request([file_name])
+
+        with patch.object(cache, "_refresh") as mock_refresh:
+            self.assertListEqual([], cache.request([file_name]))
+            mock_refresh.assert_not_called()
+
+            with patch.object(
+                metadata,
+                "monotonic",
+                return_value=metadata.monotonic()
+                + metadata.REVALIDATE_INTERVAL
+            ):
+                cache.request([file_name])
+            mock_refresh.assert_called_once_with(file_name)
+
+        # Invalidated files are checked again on the next request.
+        cache.invalidate(file_name)
+        cache.request([file_name])
+        self.assertEqual(1, cache.get(file_name).lines)  # type: ignore
+
+    def test_request_missing_file(self) -> None:
+        """Tests missing files have no metadata."""
+        cache: MetadataCache = MetadataCache()
+        file_name: str = path.join(self.directory.name, "missing.txt")
+
+        cache.request([file_name])
+
+        self.assertIsNone(cache.get(file_name))
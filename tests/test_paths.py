@@ -0,0 +1,110 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from os import path
+from typing import Tuple
+from unittest import TestCase
+from unittest.mock import patch
+try:
+    from lib import paths
+except ImportError:
+    # If we're running these tests in UnitTesting, then we need to use
+    # The package name - Tab Filter - so let's grab import lib and try again.
+    from importlib import import_module
+    paths = import_module(".lib.paths", "Tab Filter")
+
+ElisionCache = paths.ElisionCache
+
+
+def native(file_path: str) -> str:
+    """Converts a path written with forward slashes to the native form."""
+    return file_path.replace("/", path.sep)
+
+
+class ElisionTestCase(TestCase):
+    """Tests shortening paths by eliding their middle directories."""
+
+    def test_get_elisions(self) -> None:
+        """Tests directories are shortened from the middle out, keeping their
+            first and last components.
+        """
+        dataset: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+            ("src", ("src",)),
+            ("src/app", ("src/app",)),
+            (
+                "src/app/api/handlers",
+                (
+                    "src/app/api/handlers",
+                    "src/…/api/handlers",
+                    "src/…/handlers",
+                )
+            ),
+            ("/home/src/app", ("/home/src/app", "/home/…/app")),
+            # The marker of a truncated prefix isn't a directory.
+            (".../a/b", (".../a/b",)),
+            (
+                ".../src/app/api/handlers",
+                (
+                    ".../src/app/api/handlers",
+                    ".../src/…/api/handlers",
+                    ".../src/…/handlers",
+                )
+            ),
+        )
+
+        for (directory, expected) in dataset:
+            with self.subTest(directory=directory):
+                self.assertTupleEqual(
+                    expected,
+                    paths.get_elisions(directory, "/")
+                )
+
+    def test_elide(self) -> None:
+        """Tests paths are shortened only as much as they need to be."""
+        cache: ElisionCache = ElisionCache()
+        file_path: str = native("src/app/api/handlers/foo.py")
+
+        dataset: Tuple[Tuple[int, str], ...] = (
+            (100, "src/app/api/handlers/foo.py"),
+            (27, "src/app/api/handlers/foo.py"),
+            (26, "src/…/api/handlers/foo.py"),
+            (21, "src/…/handlers/foo.py"),
+            # Paths which can't fit still keep their first and last parts.
+            (5, "src/…/handlers/foo.py"),
+        )
+
+        for (width, expected) in dataset:
+            with self.subTest(width=width):
+                self.assertEqual(
+                    native(expected),
+                    cache.elide(file_path, width)
+                )
+
+        self.assertEqual("foo.py", cache.elide("foo.py", 1))
+
+        # Paths whose common prefix was truncated keep their first directory.
+        self.assertEqual(
+            native(".../src/…/handlers/foo.py"),
+            cache.elide(native(".../src/app/very/deep/handlers/foo.py"), 20)
+        )
+
+    def test_elide_caches_directories(self) -> None:
+        """Tests each directory is only split up once, however many files
+            there are within it.
+        """
+        cache: ElisionCache = ElisionCache()
+
+        with patch.object(
+            paths,
+            "get_elisions",
+            side_effect=paths.get_elisions
+        ) as mock_get_elisions:
+            for directory in ("src/app/api/one", "src/app/api/two"):
+                for name in ("a.py", "bb.py", "ccc.py"):
+                    cache.elide(native(f"{directory}/{name}"), 10)
+
+            self.assertEqual(2, mock_get_elisions.call_count)
+
+            cache.clear()
+            cache.elide(native("src/app/api/one/a.py"), 10)
+            self.assertEqual(3, mock_get_elisions.call_count)
@@ -0,0 +1,82 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+import os
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+try:
+    from lib import pins
+except ImportError:
+    # If we're running these tests in UnitTesting, then we need to use
+    # The package name - Tab Filter - so let's grab import lib and try again.
+    from importlib import import_module
+    pins = import_module(".lib.pins", "Tab Filter")
+
+PinnedTabs = pins.PinnedTabs
+
+
+class PinnedTabsTestCase(TestCase):
+    """Tests the pinned tabs set."""
+
+    directory: TemporaryDirectory
+    store_path: str
+
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+        self.store_path = path.join(self.directory.name, "cache", "pins.json")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_pin_files_and_buffers(self) -> None:
+        """Tests files are pinned by name and buffers by view id."""
+        pinned: PinnedTabs = PinnedTabs()
+
+        pinned.pin("/src/foo.py", 1)
+        pinned.pin(None, 2)
+
+        self.assertTrue(pinned.is_pinned("/src/foo.py", 99))
+        self.assertTrue(pinned.is_pinned(None, 2))
+        self.assertFalse(pinned.is_pinned(None, 1))
+        self.assertFalse(pinned.is_pinned("/src/bar.py", 2))
+
+        pinned.unpin("/src/foo.py", 1)
+        pinned.discard_view(2)
+
+        self.assertFalse(pinned.is_pinned("/src/foo.py", 1))
+        self.assertFalse(pinned.is_pinned(None, 2))
+
+    def test_toggle(self) -> None:
+        """Tests toggling returns the new state."""
+        pinned: PinnedTabs = PinnedTabs()
+
+        self.assertTrue(pinned.toggle("/src/foo.py", 1))
+        self.assertFalse(pinned.toggle("/src/foo.py", 1))
+
+    def test_persistence(self) -> None:
+        """Tests pinned files, but not buffers, are persisted."""
+        pinned: PinnedTabs = PinnedTabs(self.store_path)
+        pinned.pin("/src/foo.py", 1)
+        pinned.pin(None, 2)
+
+        reloaded: PinnedTabs = PinnedTabs(self.store_path)
+
+        self.assertTrue(reloaded.is_pinned("/src/foo.py", 1))
+        self.assertFalse(reloaded.is_pinned(None, 2))
+        # The store is written to a temporary file and moved into place.
+        self.assertListEqual(
+            ["pins.json"],
+            os.listdir(path.dirname(self.store_path))
+        )
+
+    def test_invalid_store(self) -> None:
+        """Tests a corrupt store is treated as empty."""
+        with open(path.join(self.directory.name, "pins.json"), "w") as handle:
+            handle.write("{")
+
+        pinned: PinnedTabs = PinnedTabs(
+            path.join(self.directory.name, "pins.json")
+        )
+
+        self.assertFalse(pinned.is_pinned("/src/foo.py", 1))
@@ -0,0 +1,360 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from threading import Thread
+from typing import List
+from unittest import TestCase
+try:
+    from lib import registry
+except ImportError:
+    # If we're running these tests in UnitTesting, then we need to use
+    # The package name - Tab Filter - so let's grab import lib and try again.
+    from importlib import import_module
+    registry = import_module(".lib.registry", "Tab Filter")
+
+TabRecord = registry.TabRecord
+TabRegistry = registry.TabRegistry
+RegistrySnapshot = registry.RegistrySnapshot
+
+
+class TabRecordTestCase(TestCase):
+    """Tests the states of indexed views."""
+
+    def test_states(self) -> None:
+        """Tests each record reports the states it's in."""
+        data = [
+            (
+                TabRecord(1, 1, 101, "/src/foo.py", False, False),
+                frozenset()
+            ),
+            (
+                TabRecord(1, 1, 101, "/src/foo.py", True, True),
+                frozenset((registry.STATE_DIRTY, registry.STATE_READ_ONLY))
+            ),
+            (
+                TabRecord(1, 1, 101, None, True, False),
+                frozenset((registry.STATE_DIRTY, registry.STATE_BUFFERS))
+            ),
+        ]
+
+        for (record, expected) in data:
+            with self.subTest(record=record, expected=expected):
+                self.assertEqual(expected, record.states())
+
+
+class TabRegistryTestCase(TestCase):
+    """Tests indexing views by state."""
+
+    def test_get_views(self) -> None:
+        """Tests views are listed by state, per window."""
+        tabs: TabRegistry = TabRegistry()
+        tabs.update(TabRecord(10, 1, 110, "/src/foo.py", True, False))
+        tabs.update(TabRecord(11, 1, 111, None, True, False))
+        tabs.update(TabRecord(12, 1, 112, "/src/bar.py", False, True))
+        tabs.update(TabRecord(20, 2, 120, None, False, False))
+
+        self.assertCountEqual(
+            [10, 11],
+            tabs.get_views(1, registry.STATE_DIRTY)
+        )
+        self.assertListEqual([11], tabs.get_views(1, registry.STATE_BUFFERS))
+        self.assertListEqual(
+            [12],
+            tabs.get_views(1, registry.STATE_READ_ONLY)
+        )
+        self.assertListEqual([20], tabs.get_views(2, registry.STATE_BUFFERS))
+        self.assertListEqual([], tabs.get_views(3, registry.STATE_DIRTY))
+
+    def test_update(self) -> None:
+        """Tests views move between indexes as their state changes."""
+        tabs: TabRegistry = TabRegistry()
+        tabs.update(TabRecord(10, 1, 110, None, True, False))
+        tabs.update(TabRecord(10, 2, 110, "/src/foo.py", False, False))
+
+        self.assertListEqual([], tabs.get_views(1, registry.STATE_DIRTY))
+        self.assertListEqual([], tabs.get_views(1, registry.STATE_BUFFERS))
+        self.assertListEqual([], tabs.get_views(2, registry.STATE_DIRTY))
+        self.assertEqual(
+            TabRecord(10, 2, 110, "/src/foo.py", False, False),
+            tabs.get(10)
+        )
+
+    def test_discard(self) -> None:
+        """Tests closed views are forgotten."""
+        tabs: TabRegistry = TabRegistry()
+        tabs.update(TabRecord(10, 1, 110, None, True, False))
+        tabs.discard(10)
+
+        self.assertIsNone(tabs.get(10))
+        self.assertListEqual([], tabs.get_views(1, registry.STATE_DIRTY))
+
+        # Discarding an unknown view is harmless.
+        tabs.discard(99)
+
+    def test_get_records(self) -> None:
+        """Tests the records of every view are listed by window."""
+        tabs: TabRegistry = TabRegistry()
+        tabs.update(TabRecord(10, 1, 110, "/src/foo.py", False, False))
+        tabs.update(TabRecord(11, 1, 111, None, False, False, "notes"))
+        tabs.update(TabRecord(20, 2, 120, None, False, False))
+        tabs.update(TabRecord(20, 1, 120, None, False, False))
+        tabs.discard(10)
+
+        self.assertCountEqual(
+            [
+                TabRecord(11, 1, 111, None, False, False, "notes"),
+                TabRecord(20, 1, 120, None, False, False),
+            ],
+            tabs.get_records(1)
+        )
+        self.assertListEqual([], tabs.get_records(2))
+
+    def test_get_duplicates(self) -> None:
+        """Tests views of the same file or buffer are grouped by window."""
+        tabs: TabRegistry = TabRegistry()
+        # The same file, in separate buffers, in two windows.
+        tabs.update(TabRecord(10, 1, 110, "/src/foo.py", False, False))
+        tabs.update(TabRecord(11, 1, 111, "/src/foo.py", False, False))
+        tabs.update(TabRecord(20, 2, 120, "/src/foo.py", False, False))
+        # A buffer and its clone.
+        tabs.update(TabRecord(12, 1, 112, None, False, False))
+        tabs.update(TabRecord(13, 1, 112, None, False, False))
+        # A different buffer of the same name.
+        tabs.update(TabRecord(14, 1, 114, None, False, False))
+
+        self.assertEqual(3, tabs.count_locations("/src/foo.py"))
+        self.assertEqual(2, tabs.count_locations(112))
+        self.assertEqual(1, tabs.count_locations(114))
+        self.assertEqual(0, tabs.count_locations("/src/bar.py"))
+
+        self.assertCountEqual(
+            [[10, 11], [12, 13]],
+            [sorted(views) for views in tabs.get_duplicates(1)]
+        )
+        self.assertListEqual([], tabs.get_duplicates(2))
+
+        tabs.update(TabRecord(13, 1, 112, "/src/bar.py", False, False))
+        tabs.discard(11)
+
+        self.assertEqual(2, tabs.count_locations("/src/foo.py"))
+        self.assertEqual(1, tabs.count_locations(112))
+        self.assertListEqual([], tabs.get_duplicates(1))
+
+    def test_subscribe(self) -> None:
+        """Tests subscribers are notified of changes to each window."""
+        tabs: TabRegistry = TabRegistry()
+        changes: List[int] = []
+        token: int = tabs.subscribe(changes.append)
+
+        tabs.update(TabRecord(10, 1, 110, None, False, False))
+        # Unchanged records aren't a change.
+        tabs.update(TabRecord(10, 1, 110, None, False, False))
+        # Moving between windows changes both.
+        tabs.update(TabRecord(10, 2, 110, None, False, False))
+        tabs.discard(10)
+        tabs.discard(10)
+
+        self.assertListEqual([1, 1, 2, 2], sorted(changes))
+
+        tabs.unsubscribe(token)
+        tabs.update(TabRecord(11, 1, 111, None, False, False))
+
+        self.assertEqual(4, len(changes))
+
+    def test_unknown_state(self) -> None:
+        """Tests asking for an unknown state is an error."""
+        tabs: TabRegistry = TabRegistry()
+
+        with self.assertRaises(ValueError):
+            tabs.get_views(1, "unknown")
+
+    def test_snapshot(self) -> None:
+        """Tests snapshots are unaffected by later changes, and versioned."""
+        tabs: TabRegistry = TabRegistry()
+        tabs.update(TabRecord(10, 1, 110, "/src/foo.py", True, False))
+        snapshot: RegistrySnapshot = tabs.snapshot()
+
+        tabs.update(TabRecord(11, 1, 111, "/src/foo.py", True, False))
+        tabs.discard(10)
+
+        self.assertEqual(1, snapshot.version)
+        self.assertListEqual([10], snapshot.get_views(1, registry.STATE_DIRTY))
+        self.assertEqual(1, snapshot.count_locations("/src/foo.py"))
+        self.assertIsNone(snapshot.get(11))
+        self.assertEqual(3, tabs.snapshot().version)
+        self.assertListEqual([11], tabs.get_views(1, registry.STATE_DIRTY))
+
+        with self.assertRaises(TypeError):
+            snapshot.records[12] = TabRecord(12, 1, 112, None, False, False)
+
+        # Unchanged records don't publish a new snapshot.
+        tabs.update(TabRecord(11, 1, 111, "/src/foo.py", True, False))
+        self.assertEqual(3, tabs.snapshot().version)
+
+    def test_batch(self) -> None:
+        """Tests a batch of changes is published at once, notifying each
+            changed window once.
+        """
+        tabs: TabRegistry = TabRegistry()
+        changes: List[int] = []
+        tabs.subscribe(changes.append)
+
+        with tabs.batch() as batch:
+            batch.update(TabRecord(10, 1, 110, None, False, False))
+            batch.update(TabRecord(11, 1, 111, None, False, False))
+            batch.update(TabRecord(20, 2, 120, None, False, False))
+            batch.discard(11)
+            self.assertIsNone(tabs.get(10))
+
+        self.assertEqual(1, tabs.snapshot().version)
+        self.assertListEqual([10], tabs.get_views(1, registry.STATE_BUFFERS))
+        self.assertListEqual([1, 2], sorted(changes))
+        self.assertListEqual(
+            [20],
+            tabs.get_sorted(2, registry.SORT_EXTENSION)
+        )
+
+    def test_sorted(self) -> None:
+        """Tests each window's views are kept in order by directory and
+            extension as they're added, changed and removed.
+        """
+        tabs: TabRegistry = TabRegistry()
+        tabs.update(TabRecord(10, 1, 110, "/src/lib/b.py", False, False))
+        tabs.update(TabRecord(11, 1, 111, "/src/a.txt", False, False))
+        tabs.update(TabRecord(12, 1, 112, None, False, False, "notes"))
+        tabs.update(TabRecord(13, 1, 113, "/src/lib/A.md", False, False))
+        tabs.update(TabRecord(20, 2, 120, "/src/c.py", False, False))
+
+        data = [
+            (registry.SORT_DIRECTORY, [11, 13, 10, 12]),
+            (registry.SORT_EXTENSION, [13, 10, 11, 12]),
+        ]
+
+        for (order, expected) in data:
+            with self.subTest(order=order):
+                self.assertListEqual(expected, tabs.get_sorted(1, order))
+
+        # Renaming a file moves it, and closing it removes it.
+        tabs.update(TabRecord(11, 1, 111, "/src/lib/z.c", False, False))
+        tabs.discard(10)
+        self.assertListEqual(
+            [13, 11, 12],
+            tabs.get_sorted(1, registry.SORT_DIRECTORY)
+        )
+        self.assertListEqual(
+            [11, 13, 12],
+            tabs.get_sorted(1, registry.SORT_EXTENSION)
+        )
+
+        # Moving a view to another window moves it between orders.
+        tabs.update(TabRecord(13, 2, 113, "/src/lib/A.md", False, False))
+        self.assertListEqual(
+            [20, 13],
+            tabs.get_sorted(2, registry.SORT_DIRECTORY)
+        )
+        self.assertListEqual([], tabs.get_sorted(3, registry.SORT_DIRECTORY))
+
+        tabs.discard(20)
+        tabs.discard(13)
+        self.assertNotIn(2, tabs.snapshot().orders[registry.SORT_DIRECTORY])
+
+        with self.assertRaises(ValueError):
+            tabs.get_sorted(1, "size")
+
+    def test_sorted_within_section(self) -> None:
+        """Tests views sharing a directory or extension are sorted by name,
+            rather than the order they were added.
+        """
+        tabs: TabRegistry = TabRegistry()
+        tabs.update(TabRecord(10, 1, 110, "/src/c.py", False, False))
+        tabs.update(TabRecord(11, 1, 111, "/lib/b.py", False, False))
+        tabs.update(TabRecord(12, 1, 112, "/src/A.py", False, False))
+        tabs.update(TabRecord(13, 1, 113, None, False, False, "z"))
+        tabs.update(TabRecord(14, 1, 114, None, False, False, "m"))
+
+        data = [
+            (registry.SORT_DIRECTORY, [11, 12, 10, 14, 13]),
+            (registry.SORT_EXTENSION, [12, 11, 10, 14, 13]),
+        ]
+
+        for (order, expected) in data:
+            with self.subTest(order=order):
+                self.assertListEqual(expected, tabs.get_sorted(1, order))
+
+    def test_failed_batch(self) -> None:
+        """Tests batches which fail aren't published."""
+        tabs: TabRegistry = TabRegistry()
+        tabs.update(TabRecord(10, 1, 110, None, False, False))
+
+        with self.assertRaises(RuntimeError):
+            with tabs.batch() as batch:
+                batch.discard(10)
+                raise RuntimeError("Failed")
+
+        self.assertEqual(1, tabs.snapshot().version)
+        self.assertIsNotNone(tabs.get(10))
+
+        # The registry is still usable afterwards.
+        tabs.discard(10)
+        self.assertIsNone(tabs.get(10))
+
+    def test_concurrent_access(self) -> None:
+        """Tests readers always see whole batches while writers race."""
+        tabs: TabRegistry = TabRegistry()
+        errors: List[str] = []
+        writers: int = 4
+        rounds: int = 200
+
+        def write(window_id: int) -> None:
+            for idx in range(rounds):
+                # Each batch moves a pair of views between dirty and clean,
+                # so every snapshot has an even number of dirty views.
+                dirty: bool = idx % 2 == 0
+                with tabs.batch() as batch:
+                    for offset in (0, 1):
+                        view_id: int = window_id * 10 + offset
+                        batch.update(
+                            TabRecord(
+                                view_id,
+                                window_id,
+                                view_id + 100,
+                                f"/src/{view_id}.py",
+                                dirty,
+                                False
+                            )
+                        )
+
+        def read() -> None:
+            version: int = 0
+            while any(thread.is_alive() for thread in threads):
+                snapshot: RegistrySnapshot = tabs.snapshot()
+                if snapshot.version < version:
+                    errors.append(f"Version went back to {snapshot.version}")
+                version = snapshot.version
+                for window_id in range(writers):
+                    dirty: List[int] = snapshot.get_views(
+                        window_id,
+                        registry.STATE_DIRTY
+                    )
+                    if len(dirty) % 2 != 0:
+                        errors.append(f"Partial batch in {window_id}")
+
+        threads: List[Thread] = [
+            Thread(target=write, args=(window_id,))
+            for window_id in range(writers)
+        ]
+        readers: List[Thread] = [Thread(target=read) for _ in range(2)]
+        for thread in threads + readers:
+            thread.start()
+        for thread in threads + readers:
+            thread.join()
+
+        self.assertListEqual([], errors)
+        self.assertEqual(writers * rounds, tabs.snapshot().version)
+        self.assertEqual(
+            writers * 2,
+            sum(
+                len(tabs.get_records(window_id))
+                for window_id in range(writers)
+            )
+        )
@@ -0,0 +1,152 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+import io
+import json
+from typing import Any, Dict, List, Tuple
+from unittest import TestCase
+try:
+    from lib import session
+except ImportError:
+    # If we're running these tests in UnitTesting, then we need to use
+    # The package name - Tab Filter - so let's grab import lib and try again.
+    from importlib import import_module
+    session = import_module(".lib.session", "Tab Filter")
+
+SessionRecord = session.SessionRecord
+
+WINDOW: Dict[str, Any] = {
+    "buffers": [
+        {
+            "file": "/project/src/foo.py",
+            "settings": {"buffer_size": 12, "encoding": "UTF-8"},
+        },
+        {
+            "contents": "Unsaved \"notes\"\n" * 100,
+            "settings": {"buffer_size": 1600, "name": "notes"},
+        },
+    ],
+    "groups": [
+        {
+            "sheets": [
+                {
+                    "buffer": 0,
+                    "file": "/project/src/foo.py",
+                    "settings": {
+                        "selection": [[1, 1], [2, 5]],
+                        "settings": {"syntax": "Python.sublime-syntax"},
+                    },
+                    "type": "text",
+                },
+                {"buffer": 1, "settings": {}, "type": "text"},
+            ],
+        },
+        {
+            "sheets": [{"file": "/project/logo.png", "type": "image"}],
+        },
+    ],
+    "layout": {"cols": [0.0, 0.5, 1.0], "rows": [0.0, 1.0]},
+    "zoom": -1.5e-3,
+}
+
+RECORDS: List[SessionRecord] = [
+    SessionRecord(0, 0, "/project/src/foo.py", "", False),
+    SessionRecord(0, 0, None, "notes", True),
+    SessionRecord(0, 1, "/project/logo.png", "", False),
+]
+
+
+class SessionTestCase(TestCase):
+    """Tests reading the tabs recorded in session and workspace files."""
+
+    def test_iter_tokens(self) -> None:
+        """Tests tokens are the same however the document is chunked, with
+            strings left encoded.
+        """
+        document: str = json.dumps(WINDOW, indent=4)
+        expected: List[Tuple[str, str]] = list(
+            session.iter_tokens(io.StringIO(document))
+        )
+
+        contents: str = WINDOW["buffers"][1]["contents"]
+        self.assertIn(
+            (session.TOKEN_STRING, json.dumps(contents)),
+            expected
+        )
+        self.assertIn((session.TOKEN_LITERAL, "-0.0015"), expected)
+
+        for chunk_size in (1, 2, 3, 7, 64):
+            with self.subTest(chunk_size=chunk_size):
+                tokens: List[Tuple[str, str]] = list(
+                    session.iter_tokens(io.StringIO(document), chunk_size)
+                )
+                self.assertListEqual(expected, tokens)
+
+    def test_iter_tokens_invalid(self) -> None:
+        """Tests invalid documents are rejected."""
+        for document in ('{"a": tru}', '{"a": "b', "[1, @]"):
+            with self.subTest(document=document):
+                with self.assertRaises(ValueError):
+                    list(session.iter_tokens(io.StringIO(document), 2))
+
+    def test_parse(self) -> None:
+        """Tests only the top level values of entries and their settings are
+            kept, noting rather than keeping unsaved contents.
+        """
+        document: str = json.dumps({"windows": [{}, WINDOW]})
+        entries: List = list(
+            session.SessionParser(
+                session.iter_tokens(io.StringIO(document))
+            ).parse()
+        )
+
+        self.assertListEqual(
+            [
+                (session.ENTRY_BUFFER, 1, -1, 0),
+                (session.ENTRY_BUFFER, 1, -1, 1),
+                (session.ENTRY_SHEET, 1, 0, 0),
+                (session.ENTRY_SHEET, 1, 0, 1),
+                (session.ENTRY_SHEET, 1, 1, 0),
+            ],
+            [entry[:4] for entry in entries]
+        )
+        self.assertDictEqual(
+            {
+                "contents": True,
+                "settings": {"buffer_size": 1600, "name": "notes"},
+            },
+            entries[1].values
+        )
+        self.assertDictEqual(
+            {
+                "buffer": 0,
+                "file": "/project/src/foo.py",
+                "settings": {},
+                "type": "text",
+            },
+            entries[2].values
+        )
+
+    def test_read_records(self) -> None:
+        """Tests reading the tabs of session and workspace files."""
+        dataset: Tuple[Tuple[str, Any, List[SessionRecord]], ...] = (
+            ("workspace", WINDOW, RECORDS),
+            (
+                "session",
+                {"windows": [WINDOW, WINDOW], "workspaces": {}},
+                RECORDS + [record._replace(window=1) for record in RECORDS]
+            ),
+            (
+                "buffers only",
+                {"buffers": WINDOW["buffers"]},
+                [RECORDS[0], RECORDS[1]]
+            ),
+            ("empty", {}, []),
+        )
+
+        for (name, data, expected) in dataset:
+            with self.subTest(name=name):
+                self.assertListEqual(
+                    expected,
+                    session.read_records(io.StringIO(json.dumps(data)))
+                )
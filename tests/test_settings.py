@@ -3,21 +3,31 @@
 
 import sublime  # type: ignore
 from unittesting import DeferrableTestCase  # type: ignore
+from concurrent.futures import Future
 from os import path
+from time import monotonic
+from unittest.mock import patch, MagicMock
 from typing import List, Tuple, Dict, Generator
 try:
-    from lib import settings, entities
+    from lib import details, settings, entities
 except ImportError:
     # If we're running these tests in UnitTesting, then we need to use
     # The package name - Tab Filter - so let's grab import lib and try again.
     from importlib import import_module
+    details = import_module(".lib.details", "Tab Filter")
     settings = import_module(".lib.settings", "Tab Filter")
     entities = import_module(".lib.entities", "Tab Filter")
 
 TabSetting = settings.TabSetting
 ShowCaptionsTabSetting = settings.ShowCaptionsTabSetting
 IncludePathTabSetting = settings.IncludePathTabSetting
+ElidePathTabSetting = settings.ElidePathTabSetting
+FilterBySyntaxTabSetting = settings.FilterBySyntaxTabSetting
 ShowGroupCaptionTabSetting = settings.ShowGroupCaptionTabSetting
+ShowVcsCaptionsTabSetting = settings.ShowVcsCaptionsTabSetting
+ShowFileMetadataTabSetting = settings.ShowFileMetadataTabSetting
+CommonPrefixTabSetting = settings.CommonPrefixTabSetting
+TabSettingRegistry = settings.TabSettingRegistry
 Tab = entities.Tab
 
 DEFAULT_SETINGS = settings.DEFAULT_SETINGS
@@ -71,7 +81,27 @@ class DefaultSettingsTestCase(BaseSettingsTestCase):
                 ShowGroupCaptionTabSetting,
                 DEFAULT_SETINGS["show_group_caption"],
                 "show_group_caption"
-            )
+            ),
+            (
+                ShowVcsCaptionsTabSetting,
+                DEFAULT_SETINGS["show_vcs_captions"],
+                "show_vcs_captions"
+            ),
+            (
+                ShowFileMetadataTabSetting,
+                DEFAULT_SETINGS["show_file_size"],
+                "show_file_size"
+            ),
+            (
+                ElidePathTabSetting,
+                DEFAULT_SETINGS["elide_paths"],
+                "elide_paths"
+            ),
+            (
+                FilterBySyntaxTabSetting,
+                DEFAULT_SETINGS["filter_by_syntax"],
+                "filter_by_syntax"
+            ),
         )
 
         for (cls, enabled, caption) in data_set:
@@ -203,6 +233,88 @@ class ShowCaptionsTabSettingTestCase(BaseSettingsTestCase):
             tabs[0].get_captions()
         )
 
+    def test_pinned_and_duplicates(self) -> None:
+        """Tests captioning pinned tabs and tabs open in several places."""
+        setting: ShowCaptionsTabSetting = ShowCaptionsTabSetting(
+            self.settings,
+            sublime.active_window()
+        )
+        scratch_view: sublime.View = sublime.active_window().new_file()
+        tabs: List[Tab] = [Tab(scratch_view)]
+        tabs[0].set_pinned(True)
+        tabs[0].set_locations(3)
+
+        self.assertTrue(setting.is_enabled())
+        self.assertListEqual(tabs, setting.apply(tabs))
+        self.assertListEqual(
+            ["Pinned", "Open in 3 places", "Current File", "Unsaved File"],
+            tabs[0].get_captions()
+        )
+
+    def test_view_details(self) -> Generator[int, None, None]:
+        """Tests captioning views with their syntax, encoding and line
+            endings, which are looked up once until invalidated.
+        """
+        self.settings.set("show_captions", False)
+        self.settings.set("show_syntax_caption", True)
+        self.settings.set("show_encoding_caption", True)
+        self.settings.set("show_line_endings_caption", True)
+        setting: ShowCaptionsTabSetting = ShowCaptionsTabSetting(
+            self.settings,
+            sublime.active_window()
+        )
+        foo_fixture: str = path.normpath(
+            path.join(path.dirname(__file__), "./fixtures/foo.txt")
+        )
+        foo_view: sublime.View = sublime.active_window().open_file(foo_fixture)
+
+        yield 100
+
+        details.get_details_cache().invalidate(foo_view.id())
+        tabs: List[Tab] = [Tab(foo_view)]
+
+        self.assertTrue(setting.is_enabled())
+        self.assertListEqual(tabs, setting.apply(tabs))
+        self.assertListEqual(
+            [
+                "Syntax: Plain Text",
+                f"Encoding: {foo_view.encoding()}",
+                f"Line Endings: {foo_view.line_endings()}",
+            ],
+            tabs[0].get_captions()
+        )
+
+        with patch.object(sublime.View, "syntax") as mock_syntax:
+            setting.apply([Tab(foo_view)])
+            mock_syntax.assert_not_called()
+
+            details.get_details_cache().invalidate(foo_view.id())
+            setting.apply([Tab(foo_view)])
+            mock_syntax.assert_called_once_with()
+
+        details.get_details_cache().invalidate(foo_view.id())
+
+    def test_filter_by_syntax(self) -> Generator[int, None, None]:
+        """Tests the syntax is added to the title of views, for filtering."""
+        self.settings.set("filter_by_syntax", True)
+        setting: FilterBySyntaxTabSetting = FilterBySyntaxTabSetting(
+            self.settings,
+            sublime.active_window()
+        )
+        foo_fixture: str = path.normpath(
+            path.join(path.dirname(__file__), "./fixtures/foo.txt")
+        )
+        foo_view: sublime.View = sublime.active_window().open_file(foo_fixture)
+
+        yield 100
+
+        details.get_details_cache().invalidate(foo_view.id())
+        tabs: List[Tab] = [Tab(foo_view)]
+
+        self.assertTrue(setting.is_enabled())
+        self.assertListEqual(tabs, setting.apply(tabs))
+        self.assertEqual("foo.txt (Plain Text)", tabs[0].get_title())
+
 
 class IncludePathTabSettingTestCase(BaseSettingsTestCase):
     """Tests the Include path Tab Settings."""
@@ -258,6 +370,60 @@ class IncludePathTabSettingTestCase(BaseSettingsTestCase):
         self.assertEqual(foo_fixture, tabs[0].get_subtitle())
 
 
+class ElidePathTabSettingTestCase(BaseSettingsTestCase):
+    """Tests the elide paths Tab Settings."""
+
+    def test_setting_disabled(self) -> Generator[int, None, None]:
+        """Tests with the setting disabled."""
+        self.settings.set("elide_paths", False)
+        self.settings.set("max_path_width", 10)
+        setting: ElidePathTabSetting = ElidePathTabSetting(
+            self.settings,
+            sublime.active_window()
+        )
+
+        foo_fixture: str = path.normpath(
+            path.join(path.dirname(__file__), "./fixtures/foo.txt")
+        )
+        foo_view: sublime.View = sublime.active_window().open_file(foo_fixture)
+        tabs: List[Tab] = [Tab(foo_view)]
+
+        yield 100
+
+        self.assertFalse(setting.is_enabled())
+        self.assertListEqual(tabs, setting.apply(tabs))
+        self.assertEqual(foo_fixture, tabs[0].get_subtitle())
+
+    def test_with_file_view(self) -> Generator[int, None, None]:
+        """Tests the middle of the path is elided, keeping the first and
+            last directories along with the file name.
+        """
+        self.settings.set("elide_paths", True)
+        self.settings.set("max_path_width", 10)
+        setting: ElidePathTabSetting = ElidePathTabSetting(
+            self.settings,
+            sublime.active_window()
+        )
+
+        foo_fixture: str = path.normpath(
+            path.join(path.dirname(__file__), "./fixtures/foo.txt")
+        )
+        foo_view: sublime.View = sublime.active_window().open_file(foo_fixture)
+        scratch_view: sublime.View = sublime.active_window().new_file()
+        tabs: List[Tab] = [Tab(foo_view), Tab(scratch_view)]
+
+        yield 100
+
+        self.assertTrue(setting.is_enabled())
+        self.assertListEqual(tabs, setting.apply(tabs))
+
+        subtitle: str = tabs[0].get_subtitle()
+        elided: str = path.sep.join(["", "…", "fixtures", "foo.txt"])
+        self.assertTrue(subtitle.endswith(elided))
+        self.assertTrue(foo_fixture.startswith(subtitle.split("…")[0]))
+        self.assertEqual("untitled", tabs[1].get_subtitle())
+
+
 class ShowGroupCaptionsTabSettingTestCase(BaseSettingsTestCase):
     """Tests the Show Group Captions Tab Settings."""
 
@@ -325,3 +491,265 @@ class ShowGroupCaptionsTabSettingTestCase(BaseSettingsTestCase):
         self.assertListEqual(tabs, setting.apply(tabs))
         captions: List[List[str]] = [tab.get_captions() for tab in tabs]
         self.assertListEqual([["Group: 1"], ["Group: 2"]], captions)
+
+
+class ShowVcsCaptionsTabSettingTestCase(BaseSettingsTestCase):
+    """Tests the Show VCS Captions Tab Settings."""
+
+    def test_setting_disabled(self) -> None:
+        """Tests with the setting disabled."""
+        self.settings.set("show_vcs_captions", False)
+        setting: ShowVcsCaptionsTabSetting = ShowVcsCaptionsTabSetting(
+            self.settings,
+            sublime.active_window()
+        )
+        scratch_view: sublime.View = sublime.active_window().new_file()
+        tabs: List[Tab] = [Tab(scratch_view)]
+
+        self.assertFalse(setting.is_enabled())
+        self.assertListEqual(tabs, setting.apply(tabs))
+        self.assertListEqual([], tabs[0].get_captions())
+
+    def test_with_cached_statuses(self) -> Generator[int, None, None]:
+        """Tests captions are shown from the cache, marking stale entries."""
+        self.settings.set("show_vcs_captions", True)
+        setting: ShowVcsCaptionsTabSetting = ShowVcsCaptionsTabSetting(
+            self.settings,
+            sublime.active_window()
+        )
+
+        dir: str = path.dirname(__file__)
+
+        foo_fixture: str = path.normpath(
+            path.join(dir, "./fixtures/foo.txt")
+        )
+        bar_fixture: str = path.normpath(
+            path.join(dir, "./fixtures/bar.txt")
+        )
+
+        foo_view: sublime.View = sublime.active_window().open_file(foo_fixture)
+        bar_view: sublime.View = sublime.active_window().open_file(bar_fixture)
+        scratch_view: sublime.View = sublime.active_window().new_file()
+
+        yield 100
+
+        statuses = {
+            foo_fixture: ("Modified", False),
+            bar_fixture: ("Untracked", True),
+        }
+        cache: MagicMock = MagicMock()
+        cache.request.return_value = []
+        cache.get_status.side_effect = statuses.get
+
+        tabs: List[Tab] = [Tab(foo_view), Tab(bar_view), Tab(scratch_view)]
+
+        with patch.object(settings, "get_status_cache", return_value=cache):
+            self.assertTrue(setting.is_enabled())
+            self.assertListEqual(tabs, setting.apply(tabs))
+
+        cache.request.assert_called_once_with([foo_fixture, bar_fixture])
+        captions: List[List[str]] = [tab.get_captions() for tab in tabs]
+        self.assertListEqual(
+            [["Git: Modified"], ["Git: Untracked (stale)"], []],
+            captions
+        )
+
+    def test_collect_does_not_wait(self) -> Generator[int, None, None]:
+        """Tests cached statuses are collected straight away, rather than
+            waiting on refreshes which are still running.
+        """
+        self.settings.set("show_vcs_captions", True)
+        self.settings.set("enrichment_timeout_ms", 1000)
+        setting: ShowVcsCaptionsTabSetting = ShowVcsCaptionsTabSetting(
+            self.settings,
+            sublime.active_window()
+        )
+
+        fixture: str = path.normpath(
+            path.join(path.dirname(__file__), "./fixtures/foo.txt")
+        )
+        view: sublime.View = sublime.active_window().open_file(fixture)
+
+        yield 100
+
+        cache: MagicMock = MagicMock()
+        # A refresh which never finishes, e.g. a slow git status.
+        cache.request.return_value = [Future()]
+        cache.get_status.return_value = ("Modified", True)
+
+        with patch.object(settings, "get_status_cache", return_value=cache):
+            start: float = monotonic()
+            captions: List[List[str]] = setting.collect([Tab(view)])
+
+        self.assertLess(monotonic() - start, 0.5)
+        self.assertListEqual([["Git: Modified (stale)"]], captions)
+
+
+class ShowFileMetadataTabSettingTestCase(BaseSettingsTestCase):
+    """Tests the Show File Metadata Tab Settings."""
+
+    def test_setting_disabled(self) -> None:
+        """Tests with the setting disabled."""
+        setting: ShowFileMetadataTabSetting = ShowFileMetadataTabSetting(
+            self.settings,
+            sublime.active_window()
+        )
+        scratch_view: sublime.View = sublime.active_window().new_file()
+        tabs: List[Tab] = [Tab(scratch_view)]
+
+        self.assertFalse(setting.is_enabled())
+        self.assertListEqual(tabs, setting.apply(tabs))
+        self.assertListEqual([], tabs[0].get_captions())
+
+    def test_with_cached_metadata(self) -> Generator[int, None, None]:
+        """Tests captions are only shown for computed metadata."""
+        self.settings.set("show_file_size", True)
+        self.settings.set("show_line_count", True)
+        setting: ShowFileMetadataTabSetting = ShowFileMetadataTabSetting(
+            self.settings,
+            sublime.active_window()
+        )
+
+        dir: str = path.dirname(__file__)
+
+        foo_fixture: str = path.normpath(
+            path.join(dir, "./fixtures/foo.txt")
+        )
+        bar_fixture: str = path.normpath(
+            path.join(dir, "./fixtures/bar.txt")
+        )
+
+        foo_view: sublime.View = sublime.active_window().open_file(foo_fixture)
+        bar_view: sublime.View = sublime.active_window().open_file(bar_fixture)
+
+        yield 100
+
+        cache: MagicMock = MagicMock()
+        cache.request.return_value = []
+        cache.get.side_effect = {
+            foo_fixture: settings.FileMetadata(2048, 0.0, 1200),
+        }.get
+
+        tabs: List[Tab] = [Tab(foo_view), Tab(bar_view)]
+
+        with patch.object(settings, "get_metadata_cache", return_value=cache):
+            self.assertTrue(setting.is_enabled())
+            self.assertListEqual(tabs, setting.apply(tabs))
+
+        cache.request.assert_called_once_with([foo_fixture, bar_fixture])
+        captions: List[List[str]] = [tab.get_captions() for tab in tabs]
+        self.assertListEqual(
+            [["Size: 2.0 KB", "Lines: 1,200"], []],
+            captions
+        )
+
+
+class SubtitleTabSetting(TabSetting):
+    """Third party style setting which rewrites subtitles."""
+    writes = frozenset({settings.FIELD_SUBTITLE})
+    setting_keys = ("third_party_subtitle",)
+
+    def is_enabled(self) -> bool:
+        return True
+
+    def apply(self, tabs: List[Tab]) -> List[Tab]:
+        return tabs
+
+
+class OrderTabSetting(TabSetting):
+    """Third party style setting which reorders tabs."""
+    writes = frozenset({settings.FIELD_ORDER})
+
+    def is_enabled(self) -> bool:
+        return True
+
+    def apply(self, tabs: List[Tab]) -> List[Tab]:
+        return list(reversed(tabs))
+
+
+class TabSettingRegistryTestCase(BaseSettingsTestCase):
+    """Tests the Tab Setting registry."""
+
+    def test_default_order(self) -> None:
+        """Tests the built in settings are ordered as registered."""
+        self.assertTupleEqual(
+            (
+                CommonPrefixTabSetting,
+                ShowGroupCaptionTabSetting,
+                ShowCaptionsTabSetting,
+                ShowVcsCaptionsTabSetting,
+                ShowFileMetadataTabSetting,
+                ElidePathTabSetting,
+                IncludePathTabSetting,
+                FilterBySyntaxTabSetting,
+            ),
+            settings.TAB_SETTINGS.get_order()
+        )
+
+    def test_register_orders_list_settings(self) -> None:
+        """Tests settings working on the whole list run after settings which
+            reorder it, while settings working on each tab needn't.
+        """
+        registry: TabSettingRegistry = TabSettingRegistry()
+        registry.register(CommonPrefixTabSetting)
+        registry.register(ShowCaptionsTabSetting)
+        registry.register(OrderTabSetting)
+
+        self.assertTupleEqual(
+            (
+                ShowCaptionsTabSetting,
+                OrderTabSetting,
+                CommonPrefixTabSetting,
+            ),
+            registry.get_order()
+        )
+        self.assertIn(
+            settings.FIELD_ORDER,
+            CommonPrefixTabSetting.get_reads()
+        )
+        self.assertNotIn(
+            settings.FIELD_ORDER,
+            ShowCaptionsTabSetting.get_reads()
+        )
+
+    def test_plan_skips_disabled_settings(self) -> None:
+        """Tests settings which are switched off are left out of the plan."""
+        self.assertTupleEqual(
+            (CommonPrefixTabSetting, ShowCaptionsTabSetting),
+            settings.TAB_SETTINGS.get_plan(self.settings)
+        )
+
+        self.settings.set("include_path", True)
+        self.settings.set("show_captions", False)
+
+        self.assertTupleEqual(
+            (CommonPrefixTabSetting, IncludePathTabSetting),
+            settings.TAB_SETTINGS.get_plan(self.settings)
+        )
+
+    def test_register_orders_by_dependencies(self) -> None:
+        """Tests registered settings run before settings reading their
+            output, regardless of registration order.
+        """
+        registry: TabSettingRegistry = TabSettingRegistry()
+        registry.register(IncludePathTabSetting)
+        registry.register(ShowCaptionsTabSetting)
+        registry.register(SubtitleTabSetting)
+
+        self.assertTupleEqual(
+            (
+                ShowCaptionsTabSetting,
+                SubtitleTabSetting,
+                IncludePathTabSetting,
+            ),
+            registry.get_order()
+        )
+
+        self.settings.set("third_party_subtitle", True)
+        self.assertIn(SubtitleTabSetting, registry.get_plan(self.settings))
+
+        registry.unregister(SubtitleTabSetting)
+        self.assertTupleEqual(
+            (IncludePathTabSetting, ShowCaptionsTabSetting),
+            registry.get_order()
+        )
@@ -0,0 +1,69 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from unittest import TestCase
+try:
+    from lib import sizes
+except ImportError:
+    # If we're running these tests in UnitTesting, then we need to use
+    # The package name - Tab Filter - so let's grab import lib and try again.
+    from importlib import import_module
+    sizes = import_module(".lib.sizes", "Tab Filter")
+
+BufferSizes = sizes.BufferSizes
+
+
+class BufferSizesTestCase(TestCase):
+    """Tests tallying the sizes of open buffers."""
+
+    def test_update(self) -> None:
+        """Tests the total follows changes in size as deltas."""
+        tally: BufferSizes = BufferSizes()
+
+        self.assertEqual(100, tally.update(10, 110, 100))
+        self.assertEqual(50, tally.update(11, 111, 50))
+        self.assertEqual(-40, tally.update(10, 110, 60))
+
+        self.assertEqual(110, tally.total())
+        self.assertEqual(60, tally.get(10))
+        self.assertIsNone(tally.get(12))
+
+    def test_clones(self) -> None:
+        """Tests views into the same buffer share its size, which is counted
+            once, until the last of them is closed.
+        """
+        tally: BufferSizes = BufferSizes()
+        tally.update(10, 110, 100)
+        tally.update(11, 110, 120)
+
+        self.assertEqual(120, tally.total())
+        self.assertEqual(120, tally.get(10))
+
+        self.assertEqual(0, tally.discard(10))
+        self.assertEqual(120, tally.total())
+        self.assertEqual(-120, tally.discard(11))
+        self.assertEqual(0, tally.total())
+
+        # Discarding an unknown view is harmless.
+        self.assertEqual(0, tally.discard(11))
+
+    def test_heaviest(self) -> None:
+        """Tests views are ranked by size, leaving out unknown views."""
+        tally: BufferSizes = BufferSizes()
+        tally.update(10, 110, 5)
+        tally.update(11, 111, 500)
+        tally.update(12, 112, 50)
+        tally.update(13, 111, 500)
+
+        self.assertListEqual(
+            [(11, 500), (13, 500), (12, 50), (10, 5)],
+            tally.heaviest([10, 11, 12, 13, 99])
+        )
+        self.assertListEqual(
+            [(11, 500), (12, 50)],
+            tally.heaviest([10, 11, 12], limit=2)
+        )
+
+        tally.clear()
+        self.assertEqual(0, tally.total())
+        self.assertListEqual([], tally.heaviest([10, 11]))
@@ -4,11 +4,12 @@
 import sublime  # type: ignore
 from unittesting import DeferrableTestCase  # type: ignore
 from os import path
+from threading import Event
 from unittest.mock import patch
-from typing import List, Dict, Generator
+from typing import List, Dict, Generator, Optional
 try:
     import tabfilter
-    from lib import settings, entities
+    from lib import settings, entities, files, pins, registry
 except ImportError:
     # If we're running these tests in UnitTesting, then we need to use
     # The package name - Tab Filter - so let's grab import lib and try again.
@@ -16,12 +17,44 @@ except ImportError:
     tabfilter = import_module(".tabfilter", "Tab Filter")
     settings = import_module(".lib.settings", "Tab Filter")
     entities = import_module(".lib.entities", "Tab Filter")
+    files = import_module(".lib.files", "Tab Filter")
+    pins = import_module(".lib.pins", "Tab Filter")
+    registry = import_module(".lib.registry", "Tab Filter")
 
 TabFilterCommand = tabfilter.TabFilterCommand
+TabFilterBackCommand = tabfilter.TabFilterBackCommand
+TabFilterForwardCommand = tabfilter.TabFilterForwardCommand
 
 DEFAULT_SETINGS = settings.DEFAULT_SETINGS
 
 
+class FakeEnrichmentTabSetting(settings.EnrichmentTabSetting):
+    """Enrichment setting with a fixed caption and optional delay."""
+    caption: str
+    release: Event
+
+    def __init__(
+        self,
+        settings: sublime.Settings,
+        window: sublime.Window,
+        caption: str,
+        release: Event
+    ) -> None:
+        super().__init__(settings, window)
+        self.caption = caption
+        self.release = release
+
+    def is_enabled(self) -> bool:
+        return True
+
+    def get_timeout(self) -> float:
+        return 0.2
+
+    def collect(self, tabs: List[entities.Tab]) -> List[List[str]]:
+        self.release.wait(1)
+        return [[self.caption] for _ in tabs]
+
+
 class TabFilterCommandTestCase(DeferrableTestCase):
     """Tests the tab filter command works as expected."""
 
@@ -128,6 +161,157 @@ class TabFilterCommandTestCase(DeferrableTestCase):
             cmd.gather_tabs(groups)
         )
 
+    def test_gather_tabs_with_sheets(self) -> None:
+        """Tests gathering tabs includes sheets without a view."""
+        window: sublime.Window = sublime.active_window()
+        view: sublime.View = window.new_file()
+        view.set_scratch(True)
+        sheet: sublime.HtmlSheet = window.new_html_sheet("", "<p>Hello</p>")
+
+        groups: List[int] = list(range(window.num_groups()))
+
+        cmd: TabFilterCommand = TabFilterCommand(window)
+
+        try:
+            self.assertListEqual(
+                [entities.Tab(view), entities.SheetTab(sheet)],
+                cmd.gather_tabs(groups)
+            )
+            self.assertListEqual([view, sheet], cmd.views)
+            # The newly opened sheet is the active one.
+            self.assertEqual(1, cmd.current_tab_idx)
+        finally:
+            sheet.close()
+
+    def test_gather_tabs_with_pinned_tabs(self) -> None:
+        """Tests gathering tabs lists pinned tabs first."""
+        window: sublime.Window = sublime.active_window()
+        view: sublime.View = window.new_file()
+        view.set_scratch(True)
+        second_view: sublime.View = window.new_file()
+        second_view.set_scratch(True)
+
+        groups: List[int] = list(range(window.num_groups()))
+        pinned_tabs: pins.PinnedTabs = pins.PinnedTabs()
+        pinned_tabs.pin(None, second_view.id())
+
+        cmd: TabFilterCommand = TabFilterCommand(window)
+
+        with patch.object(
+            tabfilter,
+            "get_pinned_tabs",
+            return_value=pinned_tabs
+        ):
+            tabs: List[entities.Tab] = cmd.gather_tabs(groups)
+
+        self.assertListEqual(
+            [entities.Tab(second_view), entities.Tab(view)],
+            tabs
+        )
+        self.assertListEqual([True, False], [t.is_pinned() for t in tabs])
+        self.assertListEqual([second_view, view], cmd.views)
+        # The pinned view was the last opened, and is the active one.
+        self.assertEqual(0, cmd.current_tab_idx)
+
+    def test_gather_tabs_only_dirty(self) -> Generator[int, None, None]:
+        """Tests gathering just the tabs with unsaved changes."""
+        window: sublime.Window = sublime.active_window()
+        view: sublime.View = window.new_file()
+        dirty_view: sublime.View = window.new_file()
+        dirty_view.run_command("append", {"characters": "Hello"})
+
+        yield 100
+
+        groups: List[int] = list(range(window.num_groups()))
+
+        cmd: TabFilterCommand = TabFilterCommand(window)
+
+        self.assertListEqual(
+            [entities.Tab(dirty_view)],
+            cmd.gather_tabs(groups, only="dirty")
+        )
+        self.assertListEqual(
+            [entities.Tab(view), entities.Tab(dirty_view)],
+            cmd.gather_tabs(groups, only="buffers")
+        )
+        self.assertListEqual([], cmd.gather_tabs(groups, only="read_only"))
+
+    def test_gather_tabs_collapse_duplicates(
+        self
+    ) -> Generator[int, None, None]:
+        """Tests gathering tabs collapses clones into the first tab."""
+        window: sublime.Window = sublime.active_window()
+        view: sublime.View = window.new_file()
+        view.set_scratch(True)
+        window.run_command("clone_file")
+
+        yield 100
+
+        clone: sublime.View = window.active_view()
+        groups: List[int] = list(range(window.num_groups()))
+
+        cmd: TabFilterCommand = TabFilterCommand(window)
+
+        self.assertNotEqual(view.id(), clone.id())
+        self.assertEqual(2, len(cmd.gather_tabs(groups)))
+
+        tabs: List[entities.Tab] = cmd.gather_tabs(groups, collapse=True)
+
+        self.assertListEqual([entities.Tab(view)], tabs)
+        self.assertEqual(2, tabs[0].get_locations())
+        self.assertListEqual([view], cmd.views)
+        # The active clone was collapsed into the first tab.
+        self.assertEqual(0, cmd.current_tab_idx)
+
+    def test_rank_by_size(self) -> Generator[int, None, None]:
+        """Tests tabs are ranked by the size of their buffers, largest first,
+            keeping track of the active tab.
+        """
+        window: sublime.Window = sublime.active_window()
+        views: List[sublime.View] = []
+        for (name, text) in (("small", "a"), ("large", "a" * 2048)):
+            view: sublime.View = window.new_file()
+            view.set_name(name)
+            view.run_command("append", {"characters": text})
+            views.append(view)
+        window.focus_view(views[0])
+
+        # Sizes are tallied as changes are made, away from the main thread.
+        yield 200
+
+        cmd: TabFilterCommand = TabFilterCommand(window)
+        tabs: List[entities.Tab] = cmd.rank_by_size(
+            cmd.gather_tabs(list(range(window.num_groups())))
+        )
+
+        self.assertListEqual(
+            ["large", "small"],
+            [tab.get_title() for tab in tabs]
+        )
+        self.assertIn("Buffer Size: 2.0 KB", tabs[0].get_captions())
+        self.assertIn("Buffer Size: 1 B", tabs[1].get_captions())
+        self.assertListEqual([views[1], views[0]], cmd.views)
+        self.assertEqual(1, cmd.current_tab_idx)
+
+    def test_run_heaviest_single_select(self) -> None:
+        """Tests the heaviest tabs are listed to jump to one, unless several
+            are asked to be selected.
+        """
+        window: sublime.Window = sublime.active_window()
+        cmd: TabFilterCommand = TabFilterCommand(window)
+
+        data = [
+            ({"heaviest": True}, False),
+            ({"heaviest": True, "multi_select": True}, True),
+            ({"heaviest": True, "action": "close"}, True),
+        ]
+
+        with patch.object(TabFilterCommand, "show_tabs"):
+            for (args, multi_select) in data:
+                with self.subTest(args=args):
+                    cmd.run(**args)
+                    self.assertEqual(multi_select, cmd.multi_select)
+
     def test_format_tabs(self) -> None:
         """Tests formatting tabs."""
         window: sublime.Window = sublime.active_window()
@@ -158,6 +342,72 @@ class TabFilterCommandTestCase(DeferrableTestCase):
             )
             mock_apply.assert_called_once_with(tabs)
 
+    def test_format_tabs_with_enrichments(self) -> None:
+        """Tests enrichment captions are merged in the order of the settings,
+            regardless of the order they finish in.
+        """
+        window: sublime.Window = sublime.active_window()
+        view: sublime.View = window.new_file()
+        view.set_scratch(True)
+
+        cmd: TabFilterCommand = TabFilterCommand(window)
+
+        first_release: Event = Event()
+        second_release: Event = Event()
+        first: FakeEnrichmentTabSetting = FakeEnrichmentTabSetting(
+            self.settings,
+            window,
+            "First",
+            first_release
+        )
+        second: FakeEnrichmentTabSetting = FakeEnrichmentTabSetting(
+            self.settings,
+            window,
+            "Second",
+            second_release
+        )
+
+        # The second setting finishes first.
+        second_release.set()
+        sublime.set_timeout_async(first_release.set, 50)
+
+        self.assertListEqual(
+            [["untitled", "untitled", "First, Second"]],
+            cmd.format_tabs([entities.Tab(view)], (first, second))
+        )
+
+    def test_format_tabs_drops_slow_enrichments(self) -> None:
+        """Tests enrichments missing their time budget are dropped."""
+        window: sublime.Window = sublime.active_window()
+        view: sublime.View = window.new_file()
+        view.set_scratch(True)
+
+        cmd: TabFilterCommand = TabFilterCommand(window)
+
+        slow_release: Event = Event()
+        fast_release: Event = Event()
+        fast_release.set()
+        slow: FakeEnrichmentTabSetting = FakeEnrichmentTabSetting(
+            self.settings,
+            window,
+            "Slow",
+            slow_release
+        )
+        fast: FakeEnrichmentTabSetting = FakeEnrichmentTabSetting(
+            self.settings,
+            window,
+            "Fast",
+            fast_release
+        )
+
+        try:
+            self.assertListEqual(
+                [["untitled", "untitled", "Fast"]],
+                cmd.format_tabs([entities.Tab(view)], (slow, fast))
+            )
+        finally:
+            slow_release.set()
+
     def test_display_quick_info_no_preview(self) -> None:
         """Tests displaying the quick info panel, without preview."""
         with patch.object(sublime.Window, "show_quick_panel") as mock_panel:
@@ -189,16 +439,134 @@ class TabFilterCommandTestCase(DeferrableTestCase):
                 selected_index=-1
             )
 
+    def test_display_quick_info_with_max_items(self) -> None:
+        """Tests displaying the quick info panel, capped to max items."""
+        window: sublime.Window = sublime.active_window()
+        views: List[sublime.View] = []
+        for _ in range(3):
+            views.append(window.new_file())
+            views[-1].set_scratch(True)
+        groups: List[int] = list(range(window.num_groups()))
+
+        cmd: TabFilterCommand = TabFilterCommand(window)
+        cmd.gather_tabs(groups)
+        tabs: List[List[str]] = [[view.name()] for view in cmd.views]
+
+        with patch.object(sublime.Window, "show_quick_panel") as mock_panel:
+            cmd.display_quick_info_panel(tabs, preview=False, max_items=2)
+
+            # The most recently used views are listed first.
+            self.assertListEqual([2, 1], cmd.display_indexes)
+            mock_panel.assert_called_once_with(
+                [
+                    tabs[2],
+                    tabs[1],
+                    ["Show all 3 tabs…", "Showing the 2 most recently used"]
+                ],
+                cmd.on_done
+            )
+
+        with patch.object(sublime.Window, "focus_view") as mock_focus_view:
+            cmd.on_done(1)
+
+            mock_focus_view.assert_called_once_with(views[1])
+
+        self.assertTrue(cmd.is_show_all(2))
+        self.assertEqual(-1, cmd.get_tab_index(2))
+
+    def test_display_quick_info_under_max_items(self) -> None:
+        """Tests the quick info panel isn't capped when under max items."""
+        with patch.object(sublime.Window, "show_quick_panel") as mock_panel:
+            window: sublime.Window = sublime.active_window()
+
+            cmd: TabFilterCommand = TabFilterCommand(window)
+
+            tabs: List[List[str]] = [["untitled", "untitled"]]
+
+            cmd.display_quick_info_panel(tabs, preview=False, max_items=1)
+
+            self.assertIsNone(cmd.display_indexes)
+            mock_panel.assert_called_once_with(tabs, cmd.on_done)
+
+    def test_display_quick_info_with_project_files(self) -> None:
+        """Tests project files are listed after the tabs, and opened when
+            selected.
+        """
+        window: sublime.Window = sublime.active_window()
+        cmd: TabFilterCommand = TabFilterCommand(window)
+        cmd.views = [window.new_file()]
+        cmd.views[0].set_scratch(True)
+        cmd.project_files = [
+            files.ProjectFile(
+                "/project/src/foo.py",
+                "project/src/foo.py",
+                ["foo.py", "project/src/foo.py", "Project File"]
+            ),
+        ]
+        tabs: List[List[str]] = [["untitled", "untitled"]]
+
+        with patch.object(sublime.Window, "show_quick_panel") as mock_panel:
+            cmd.display_quick_info_panel(tabs, preview=False)
+
+            mock_panel.assert_called_once_with(
+                [
+                    ["untitled", "untitled"],
+                    ["foo.py", "project/src/foo.py", "Project File"]
+                ],
+                cmd.on_done
+            )
+
+        self.assertEqual(-1, cmd.get_tab_index(1))
+        self.assertEqual(0, cmd.get_file_index(1))
+        self.assertEqual(-1, cmd.get_file_index(0))
+
+        with patch.object(sublime.Window, "open_file") as mock_open_file:
+            cmd.on_done(1)
+
+            mock_open_file.assert_called_once_with("/project/src/foo.py")
+
+    def test_display_quick_info_live(self) -> Generator[int, None, None]:
+        """Tests live panels are refreshed as tabs change, and stop being
+            refreshed once closed.
+        """
+        self.settings.set("live_update", True)
+        window: sublime.Window = sublime.active_window()
+        view: sublime.View = window.new_file()
+        view.set_scratch(True)
+
+        cmd: TabFilterCommand = TabFilterCommand(window)
+
+        with patch.object(sublime.Window, "show_quick_panel") as mock_panel:
+            cmd.run()
+
+            self.assertEqual(1, mock_panel.call_count)
+            self.assertEqual(1, len(mock_panel.call_args[0][0]))
+
+            second_view: sublime.View = window.new_file()
+            second_view.set_scratch(True)
+
+            yield tabfilter.LIVE_UPDATE_DELAY_MS + 100
+
+            self.assertEqual(2, mock_panel.call_count)
+            self.assertEqual(2, len(mock_panel.call_args[0][0]))
+
+            # Callbacks from the replaced panel are ignored.
+            mock_panel.call_args_list[0][0][1](-1)
+            self.assertIsNotNone(cmd.subscription)
+
+            mock_panel.call_args[0][1](-1)
+            self.assertIsNone(cmd.subscription)
+
     @patch.object(settings.CommonPrefixTabSetting, "apply")
     @patch.object(settings.ShowGroupCaptionTabSetting, "apply")
     @patch.object(settings.ShowCaptionsTabSetting, "apply")
     @patch.object(settings.IncludePathTabSetting, "apply")
     def test_run(
         self,
-        mock_common_prefix_apply,
-        mock_group_caption_apply,
+        mock_include_path_apply,
         mock_captions_apply,
-        mock_include_path_apply
+        mock_group_caption_apply,
+        mock_common_prefix_apply
     ) -> None:
         """Tests the run method with a mocked set up."""
         with patch.object(sublime.Window, "show_quick_panel") as mock_panel:
@@ -218,9 +586,10 @@ class TabFilterCommandTestCase(DeferrableTestCase):
             cmd.run()
 
             mock_common_prefix_apply.assert_called_once_with(tabs)
-            mock_group_caption_apply.assert_called_once_with(tabs)
             mock_captions_apply.assert_called_once_with(tabs)
-            mock_include_path_apply.assert_called_once_with(tabs)
+            # Settings which are switched off shouldn't be applied at all.
+            mock_group_caption_apply.assert_not_called()
+            mock_include_path_apply.assert_not_called()
 
             mock_panel.assert_called_once_with(details, cmd.on_done)
 
@@ -230,10 +599,10 @@ class TabFilterCommandTestCase(DeferrableTestCase):
     @patch.object(settings.IncludePathTabSetting, "apply")
     def test_run_with_no_files(
         self,
-        mock_common_prefix_apply,
-        mock_group_caption_apply,
+        mock_include_path_apply,
         mock_captions_apply,
-        mock_include_path_apply
+        mock_group_caption_apply,
+        mock_common_prefix_apply
     ) -> None:
         """Tests the run method with a mocked set up and no files."""
         with patch.object(sublime.Window, "show_quick_panel") as mock_panel:
@@ -250,12 +619,39 @@ class TabFilterCommandTestCase(DeferrableTestCase):
             cmd.run()
 
             mock_common_prefix_apply.assert_called_once_with(tabs)
-            mock_group_caption_apply.assert_called_once_with(tabs)
             mock_captions_apply.assert_called_once_with(tabs)
-            mock_include_path_apply.assert_called_once_with(tabs)
+            # Settings which are switched off shouldn't be applied at all.
+            mock_group_caption_apply.assert_not_called()
+            mock_include_path_apply.assert_not_called()
 
             mock_panel.assert_called_once_with([], cmd.on_done)
 
+    @patch.object(settings.CommonPrefixTabSetting, "apply")
+    @patch.object(settings.IncludePathTabSetting, "apply")
+    def test_run_with_enabled_settings(
+        self,
+        mock_include_path_apply,
+        mock_common_prefix_apply
+    ) -> None:
+        """Tests the run method applies settings once switched on."""
+        self.settings.set("include_path", True)
+
+        with patch.object(sublime.Window, "show_quick_panel"):
+            window: sublime.Window = sublime.active_window()
+            view: sublime.View = window.new_file()
+            view.set_scratch(True)
+
+            tabs: List[entities.Tab] = [entities.Tab(view)]
+
+            mock_common_prefix_apply.return_value = tabs
+            mock_include_path_apply.return_value = tabs
+
+            cmd: TabFilterCommand = TabFilterCommand(window)
+            cmd.run()
+
+            mock_common_prefix_apply.assert_called_once_with(tabs)
+            mock_include_path_apply.assert_called_once_with(tabs)
+
     def test_run_with_scratch_default_settings(self) -> None:
         """Test running with a scratch buffer and default settings."""
         with patch.object(sublime.Window, "show_quick_panel") as mock_panel:
@@ -354,6 +750,251 @@ class TabFilterCommandTestCase(DeferrableTestCase):
 
             mock_panel.assert_called_once_with(expected, cmd.on_done)
 
+    def test_run_with_groups(self) -> Generator[int, None, None]:
+        """Tests listing the tabs of other groups, reusing the formatted list
+            until the tabs change.
+        """
+        window: sublime.Window = sublime.active_window()
+        window.set_layout({
+            "cells": [[0, 0, 1, 1], [1, 0, 2, 1]],
+            "cols": [0.0, 0.5, 1.0],
+            "rows": [0.0, 1.0]
+        })
+        left_view: sublime.View = window.new_file()
+        left_view.set_name("left")
+        right_view: sublime.View = window.new_file()
+        right_view.set_name("right")
+        window.set_view_index(left_view, group=0, idx=0)
+        window.set_view_index(right_view, group=1, idx=0)
+
+        yield 100
+
+        window.focus_view(left_view)
+        cmd: TabFilterCommand = TabFilterCommand(window)
+
+        with patch.object(
+            TabFilterCommand,
+            "format_tabs",
+            autospec=True,
+            side_effect=TabFilterCommand.format_tabs
+        ) as mock_format, patch.object(
+            sublime.Window,
+            "show_quick_panel"
+        ) as mock_panel:
+            for groups in ("others", "right", [1]):
+                with self.subTest(groups=groups):
+                    cmd.run(groups=groups)
+                    self.assertEqual(
+                        "right",
+                        mock_panel.call_args[0][0][0][0]
+                    )
+                    self.assertListEqual([right_view], cmd.views)
+
+            self.assertEqual(1, mock_format.call_count)
+
+            # Previewing is possible when listing a single group.
+            self.settings.set("preview_tab", True)
+            cmd.run(groups="left")
+            self.assertEqual("left", mock_panel.call_args[0][0][0][0])
+            self.assertIn("on_highlight", mock_panel.call_args[1])
+            self.assertEqual(2, mock_format.call_count)
+
+            right_view.run_command("append", {"characters": "changed"})
+            cmd.run(groups="others")
+            self.assertEqual(3, mock_format.call_count)
+
+    def test_list_signature_third_party_settings(self) -> None:
+        """Tests the signature of a list changes with the settings of third
+            party tab settings, as well as the package's own.
+        """
+        window: sublime.Window = sublime.active_window()
+        cmd: TabFilterCommand = TabFilterCommand(window)
+        cmd.settings = self.settings
+
+        class ShoutTabSetting(settings.TabSetting):
+            setting_keys = ("shout_titles",)
+
+            def is_enabled(self) -> bool:
+                return self.settings.get("shout_titles") is True
+
+            def apply(
+                self,
+                tabs: List[entities.Tab]
+            ) -> List[entities.Tab]:
+                return tabs
+
+        settings.TAB_SETTINGS.register(ShoutTabSetting)
+        self.addCleanup(settings.TAB_SETTINGS.unregister, ShoutTabSetting)
+        self.addCleanup(self.settings.erase, "shout_titles")
+
+        self.settings.set("shout_titles", False)
+        signature = cmd.get_list_signature([0])
+        self.settings.set("shout_titles", True)
+        self.assertNotEqual(signature, cmd.get_list_signature([0]))
+
+    def test_make_record_skips_panels(self) -> None:
+        """Tests output panels aren't indexed as tabs."""
+        window: sublime.Window = sublime.active_window()
+        panel: sublime.View = window.create_output_panel("tab_filter_test")
+        self.addCleanup(window.destroy_output_panel, "tab_filter_test")
+        view: sublime.View = window.new_file()
+        view.set_scratch(True)
+
+        self.assertIsNone(tabfilter.make_record(panel, window))
+        self.assertIsNotNone(tabfilter.make_record(view, window))
+        view.close()
+
+    def test_warm_up_skips_closed_views(self) -> None:
+        """Tests views closed while warming up aren't indexed again after
+            they've been discarded.
+        """
+        window: sublime.Window = sublime.active_window()
+        view: sublime.View = window.new_file()
+        view.set_scratch(True)
+        view_id: int = view.id()
+        make_record = tabfilter.make_record
+
+        def close_after(
+            other: sublime.View,
+            other_window: sublime.Window
+        ) -> Optional[registry.TabRecord]:
+            record = make_record(other, other_window)
+            if other.id() == view_id:
+                other.close()
+            return record
+
+        with patch.object(tabfilter, "make_record", side_effect=close_after):
+            tabfilter.warm_up()
+
+        self.assertFalse(view.is_valid())
+        self.assertIsNone(tabfilter._registry.get(view_id))
+
+    def test_sort_tabs(self) -> Generator[int, None, None]:
+        """Tests tabs are sorted into sections, keeping track of the active
+            tab.
+        """
+        window: sublime.Window = sublime.active_window()
+        window.set_layout({
+            "cells": [[0, 0, 1, 1], [1, 0, 2, 1]],
+            "cols": [0.0, 0.5, 1.0],
+            "rows": [0.0, 1.0]
+        })
+        views: List[sublime.View] = []
+        for (name, group) in (("b", 0), ("c", 1), ("a", 0)):
+            view: sublime.View = window.new_file()
+            view.set_name(name)
+            window.set_view_index(view, group=group, idx=0)
+            views.append(view)
+        window.focus_view(views[0])
+
+        # Views are indexed by the registry as they're opened.
+        yield 100
+
+        cmd: TabFilterCommand = TabFilterCommand(window)
+        cmd.settings = self.settings
+
+        data = [
+            ("group", ["a", "b", "c"], "Group: 1"),
+            ("directory", ["a", "b", "c"], None),
+            ("extension", ["a", "b", "c"], None),
+        ]
+
+        for (sort_by, titles, caption) in data:
+            with self.subTest(sort_by=sort_by):
+                tabs: List[entities.Tab] = cmd.sort_tabs(
+                    cmd.gather_tabs([0, 1]),
+                    sort_by
+                )
+                self.assertListEqual(
+                    titles,
+                    [tab.get_title() for tab in tabs]
+                )
+                if caption is not None:
+                    self.assertIn(caption, tabs[0].get_captions())
+                self.assertListEqual(
+                    [views[2], views[0], views[1]],
+                    cmd.views
+                )
+                self.assertEqual(1, cmd.current_tab_idx)
+
+    def test_navigation(self) -> Generator[int, None, None]:
+        """Tests going back and forward through the tabs jumped between,
+            skipping closed tabs, and listing them by history.
+        """
+        window: sublime.Window = sublime.active_window()
+        views: List[sublime.View] = []
+        for name in ("a", "b", "c", "d"):
+            view: sublime.View = window.new_file()
+            view.set_name(name)
+            view.set_scratch(True)
+            views.append(view)
+        for view in views:
+            window.focus_view(view)
+
+        yield 100
+
+        views[2].close()
+        TabFilterBackCommand(window).run()
+        self.assertEqual(views[1], window.active_view())
+        TabFilterBackCommand(window).run()
+        self.assertEqual(views[0], window.active_view())
+        TabFilterForwardCommand(window).run()
+        self.assertEqual(views[1], window.active_view())
+
+        cmd: TabFilterCommand = TabFilterCommand(window)
+        tabs: List[entities.Tab] = cmd.order_by_history(
+            cmd.gather_tabs(list(range(window.num_groups())))
+        )
+
+        # Tabs jumped to by earlier tests follow.
+        self.assertListEqual(
+            ["d", "b", "a"],
+            [tab.get_title() for tab in tabs[:3]]
+        )
+        self.assertIn("Forward: 2", tabs[0].get_captions())
+        self.assertIn("Back: 1", tabs[2].get_captions())
+        self.assertEqual(1, cmd.current_tab_idx)
+
+        # Selecting a tab moves to its place in the history.
+        cmd.on_done(0)
+        self.assertEqual(views[3], window.active_view())
+        TabFilterBackCommand(window).run()
+        self.assertEqual(views[1], window.active_view())
+
+    def test_restore_leaves_navigation(self) -> None:
+        """Tests placeholders created while restoring a tab set aren't
+            recorded as jumps.
+        """
+        window: sublime.Window = sublime.active_window()
+        view: sublime.View = window.new_file()
+        view.set_scratch(True)
+        window.focus_view(view)
+        entries = tabfilter._navigation.entries(window.id())
+
+        dir: str = path.dirname(__file__)
+        placeholders = [
+            (0, 0, tabfilter.TabSetFile(path.join(dir, name), []))
+            for name in ("fixtures/foo.txt", "fixtures/bar.txt")
+        ]
+        tabfilter._restoring.add(window.id())
+        tabfilter.TabFilterRestoreSetCommand(window).create_placeholders(
+            placeholders,
+            0,
+            [view],
+            0
+        )
+
+        self.assertNotIn(window.id(), tabfilter._restoring)
+        self.assertTupleEqual(
+            entries,
+            tabfilter._navigation.entries(window.id())
+        )
+
+        for placeholder in window.views():
+            if placeholder.settings().has(tabfilter.LAZY_FILE_SETTING):
+                placeholder.close()
+        view.close()
+
     def test_on_done_callback_with_valid_index(self) -> None:
         """Tests the on done callback works with valid selection."""
         index: int = 0
@@ -402,6 +1043,145 @@ class TabFilterCommandTestCase(DeferrableTestCase):
             cmd.on_done(100)
             mock_focus_view.assert_not_called()
 
+    def test_on_done_callback_with_sheet(self) -> None:
+        """Tests the on done callback focuses sheets without a view."""
+        with patch.object(sublime.Window, "focus_sheet") as mock_focus_sheet:
+            window: sublime.Window = sublime.active_window()
+            cmd: TabFilterCommand = TabFilterCommand(window)
+            sheet: sublime.HtmlSheet = window.new_html_sheet("", "")
+            cmd.views = [sheet]
+
+            try:
+                cmd.on_done(0)
+            finally:
+                sheet.close()
+
+            mock_focus_sheet.assert_called_once_with(sheet)
+
+    def test_display_quick_info_multi_select(self) -> None:
+        """Tests several tabs can be selected at once when multi selecting."""
+        window: sublime.Window = sublime.active_window()
+        cmd: TabFilterCommand = TabFilterCommand(window)
+        cmd.multi_select = True
+        tabs: List[List[str]] = [["foo.txt", "foo.txt"]]
+
+        with patch.object(sublime.Window, "show_quick_panel") as mock_panel:
+            cmd.display_quick_info_panel(tabs, False)
+
+            mock_panel.assert_called_once_with(
+                tabs,
+                cmd.on_done,
+                flags=sublime.MULTI_SELECT,
+                on_highlight=None,
+                selected_index=-1
+            )
+
+    def test_on_done_multiple_move(self) -> Generator[int, None, None]:
+        """Tests the selected tabs are moved to a group together, in the
+            order they were selected, keeping the active tab focused.
+        """
+        window: sublime.Window = sublime.active_window()
+        window.set_layout({
+            "cells": [[0, 0, 1, 1], [1, 0, 2, 1]],
+            "cols": [0.0, 0.5, 1.0],
+            "rows": [0.0, 1.0]
+        })
+        views: List[sublime.View] = [window.new_file() for _ in range(3)]
+        for view in views:
+            window.set_view_index(view, group=0, idx=0)
+        window.focus_view(views[0])
+
+        yield 100
+
+        cmd: TabFilterCommand = TabFilterCommand(window)
+        cmd.views = list(views)
+        cmd.current_tab_idx = 0
+        cmd.batch_action = tabfilter.ACTION_MOVE
+        cmd.batch_group = 1
+        cmd.on_done([2, 1, 1])
+
+        self.assertListEqual(
+            [views[2].sheet(), views[1].sheet()],
+            window.sheets_in_group(1)
+        )
+        self.assertEqual(0, views[0].sheet().group())
+        self.assertEqual(views[0], window.active_view())
+
+    def test_on_done_multiple_close(self) -> None:
+        """Tests the selected tabs are closed together, ignoring entries
+            which aren't tabs.
+        """
+        window: sublime.Window = sublime.active_window()
+        views: List[sublime.View] = [window.new_file() for _ in range(3)]
+
+        cmd: TabFilterCommand = TabFilterCommand(window)
+        cmd.views = list(views)
+        cmd.batch_action = tabfilter.ACTION_CLOSE
+        cmd.on_done([0, 2, 100])
+
+        self.assertListEqual(
+            [False, True, False],
+            [view.is_valid() for view in views]
+        )
+
+    def test_on_done_multiple_close_pinned(self) -> None:
+        """Tests pinned tabs are kept open when closing tabs together."""
+        window: sublime.Window = sublime.active_window()
+        views: List[sublime.View] = [window.new_file() for _ in range(2)]
+        pinned_tabs: pins.PinnedTabs = pins.PinnedTabs()
+        pinned_tabs.pin(None, views[1].id())
+
+        cmd: TabFilterCommand = TabFilterCommand(window)
+        cmd.views = list(views)
+        cmd.batch_action = tabfilter.ACTION_CLOSE
+
+        with patch.object(
+            tabfilter,
+            "get_pinned_tabs",
+            return_value=pinned_tabs
+        ), patch.object(sublime, "status_message") as mock_status:
+            cmd.on_done([0, 1])
+
+        self.assertListEqual(
+            [False, True],
+            [view.is_valid() for view in views]
+        )
+        mock_status.assert_called_once_with(
+            "Tab Filter: kept 1 pinned tabs open"
+        )
+        views[1].set_scratch(True)
+        views[1].close()
+
+    def test_get_batch_actions(self) -> None:
+        """Tests moving between groups is only offered with several groups.
+        """
+        window: sublime.Window = sublime.active_window()
+        cmd: TabFilterCommand = TabFilterCommand(window)
+
+        self.assertListEqual(
+            [
+                (tabfilter.ACTION_CLOSE, -1, "Close 1 Tab"),
+                (tabfilter.ACTION_SAVE, -1, "Save 1 Tab"),
+            ],
+            cmd.get_batch_actions(1)
+        )
+
+        window.set_layout({
+            "cells": [[0, 0, 1, 1], [1, 0, 2, 1]],
+            "cols": [0.0, 0.5, 1.0],
+            "rows": [0.0, 1.0]
+        })
+
+        self.assertListEqual(
+            [
+                "Close 2 Tabs",
+                "Save 2 Tabs",
+                "Move 2 Tabs to Group 1",
+                "Move 2 Tabs to Group 2",
+            ],
+            [caption for (_, _, caption) in cmd.get_batch_actions(2)]
+        )
+
     def test_on_highlighted_callback_with_valid_index(self) -> None:
         """Tests the on highlighted callback works with valid selection."""
         index: int = 0
@@ -428,3 +1208,57 @@ class TabFilterCommandTestCase(DeferrableTestCase):
             # Also test values greatly outside the expected range.
             cmd.on_highlighted(100)
             mock_focus_view.assert_not_called()
+
+
+class TabFilterInputHandlerTestCase(DeferrableTestCase):
+    """Tests selecting tabs via the command palette."""
+
+    def tearDown(self) -> None:
+        for view in sublime.active_window().views():
+            view.window().focus_view(view)
+            view.set_scratch(True)
+            view.window().run_command("close_file")
+
+    def test_list_items(self) -> None:
+        """Tests tabs are listed most recently used first."""
+        window: sublime.Window = sublime.active_window()
+        view: sublime.View = window.new_file()
+        view.set_name("first")
+        second_view: sublime.View = window.new_file()
+        second_view.set_name("second")
+        second_view.set_read_only(True)
+        window.focus_view(view)
+
+        handler = tabfilter.TabFilterInputHandler(window)
+        items: List[sublime.ListInputItem] = handler.list_items()
+
+        self.assertListEqual(
+            [
+                ("first", view.id(), ""),
+                ("second", second_view.id(), "Read Only")
+            ],
+            [(item.text, item.value, item.annotation) for item in items][:2]
+        )
+        # Buffers have nothing to preview.
+        self.assertEqual("", handler.preview(view.id()))
+
+    def test_list_items_skips_closed_views(self) -> None:
+        """Tests tabs which are indexed but no longer open aren't listed, and
+            are dropped from the registry.
+        """
+        window: sublime.Window = sublime.active_window()
+        view: sublime.View = window.new_file()
+        view.set_name("open")
+        closed_view: sublime.View = window.new_file()
+        closed_view.set_scratch(True)
+        record = tabfilter.make_record(closed_view, window)
+        closed_view.close()
+        # As if indexed again after being closed.
+        tabfilter._registry.update(record)
+
+        handler = tabfilter.TabFilterInputHandler(window)
+        values: List[int] = [item.value for item in handler.list_items()]
+
+        self.assertIn(view.id(), values)
+        self.assertNotIn(record.view_id, values)
+        self.assertIsNone(tabfilter._registry.get(record.view_id))
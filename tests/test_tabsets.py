@@ -0,0 +1,122 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+try:
+    from lib import tabsets
+except ImportError:
+    # If we're running these tests in UnitTesting, then we need to use
+    # The package name - Tab Filter - so let's grab import lib and try again.
+    from importlib import import_module
+    tabsets = import_module(".lib.tabsets", "Tab Filter")
+
+TabSet = tabsets.TabSet
+TabSetFile = tabsets.TabSetFile
+TabSetGroup = tabsets.TabSetGroup
+TabSetStore = tabsets.TabSetStore
+
+
+class TabSetTestCase(TestCase):
+    """Tests saving and loading tab sets."""
+
+    directory: TemporaryDirectory
+    tab_set: TabSet
+
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+        self.tab_set = TabSet(
+            "Feature: Foo/Bar",
+            {
+                "cells": [[0, 0, 1, 1], [1, 0, 2, 1]],
+                "cols": [0.0, 0.5, 1.0],
+                "rows": [0.0, 1.0]
+            },
+            1,
+            [
+                TabSetGroup(
+                    [
+                        TabSetFile("/src/foo.py", [(0, 0)]),
+                        TabSetFile("/src/bar.py", [(10, 20), (30, 30)]),
+                    ],
+                    1
+                ),
+                TabSetGroup([], -1),
+            ]
+        )
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_round_trip(self) -> None:
+        """Tests tab sets survive serialisation unchanged."""
+        data: str = tabsets.dumps(self.tab_set)
+
+        self.assertNotIn(" ", data.replace("Feature: Foo", ""))
+        self.assertEqual(self.tab_set, tabsets.loads(data))
+        self.assertEqual(2, self.tab_set.file_count())
+
+    def test_loads_unsupported_version(self) -> None:
+        """Tests tab sets from an unknown format version are rejected."""
+        with self.assertRaises(ValueError):
+            tabsets.loads('{"version":0}')
+
+    def test_store(self) -> None:
+        """Tests saving, listing, loading and deleting tab sets."""
+        store: TabSetStore = TabSetStore(
+            path.join(self.directory.name, "tab_sets")
+        )
+
+        self.assertListEqual([], store.names())
+        self.assertIsNone(store.load(self.tab_set.name))
+
+        store.save(self.tab_set)
+
+        self.assertListEqual([self.tab_set.name], store.names())
+        self.assertEqual(self.tab_set, store.load(self.tab_set.name))
+        self.assertEqual(
+            store.directory,
+            path.dirname(store.get_path(self.tab_set.name))
+        )
+
+        store.delete(self.tab_set.name)
+
+        self.assertListEqual([], store.names())
+        # Deleting a missing tab set is harmless.
+        store.delete(self.tab_set.name)
+
+    def test_store_distinct_names(self) -> None:
+        """Tests names which only differ by characters unsafe in file names
+            are stored separately.
+        """
+        store: TabSetStore = TabSetStore(self.directory.name)
+        names = ("a/b", "a_b", "a%2Fb", "a:b", " a b ")
+
+        for name in names:
+            store.save(self.tab_set._replace(name=name))
+
+        self.assertEqual(len(names), len(set(map(store.get_path, names))))
+        self.assertListEqual(
+            sorted(names, key=str.lower),
+            store.names()
+        )
+        for name in names:
+            with self.subTest(name=name):
+                tab_set = store.load(name)
+                self.assertIsNotNone(tab_set)
+                self.assertEqual(name, tab_set.name)
+                self.assertEqual(
+                    self.directory.name,
+                    path.dirname(store.get_path(name))
+                )
+
+    def test_store_ignores_invalid_files(self) -> None:
+        """Tests corrupt files in the store are skipped."""
+        store: TabSetStore = TabSetStore(self.directory.name)
+
+        with open(store.get_path("broken"), "w") as handle:
+            handle.write("{not json")
+
+        self.assertListEqual([], store.names())
+        self.assertIsNone(store.load("broken"))
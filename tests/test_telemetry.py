@@ -0,0 +1,168 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+import json
+from os import path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from timeit import repeat
+from unittest import TestCase
+from unittest.mock import patch
+try:
+    from lib import telemetry
+except ImportError:
+    # If we're running these tests in UnitTesting, then we need to use
+    # The package name - Tab Filter - so let's grab import lib and try again.
+    from importlib import import_module
+    telemetry = import_module(".lib.telemetry", "Tab Filter")
+
+Histogram = telemetry.Histogram
+Telemetry = telemetry.Telemetry
+
+BENCHMARK_CALLS: int = 100000
+
+
+class HistogramTestCase(TestCase):
+    """Tests bucketing values."""
+
+    def test_record(self) -> None:
+        """Tests values are counted in the bucket for their upper bound."""
+        histogram: Histogram = Histogram((1, 10))
+
+        for value in (0, 1, 1.5, 10, 11, 1000):
+            histogram.record(value)
+
+        self.assertListEqual([2, 2, 2], list(histogram.counts))
+        self.assertEqual(6, histogram.count())
+        self.assertEqual(1023.5, histogram.total)
+        self.assertListEqual(
+            ["<= 1", "<= 10", "> 10"],
+            histogram.get_labels()
+        )
+
+    def test_merge(self) -> None:
+        """Tests merging saved counts, but only with matching bounds."""
+        histogram: Histogram = Histogram((1, 10))
+        histogram.record(5)
+        histogram.merge({"bounds": [1, 10], "counts": [1, 2, 3], "total": 9})
+
+        self.assertListEqual([1, 3, 3], list(histogram.counts))
+        self.assertEqual(14, histogram.total)
+
+        with self.assertRaises(ValueError):
+            histogram.merge({"bounds": [5], "counts": [0, 0], "total": 0})
+
+
+class TelemetryTestCase(TestCase):
+    """Tests recording and exporting telemetry."""
+
+    directory: TemporaryDirectory
+    store_path: str
+
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+        self.store_path = path.join(self.directory.name, "telemetry.json")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_record(self) -> None:
+        """Tests each measurement is recorded in its histogram."""
+        recorder: Telemetry = Telemetry()
+        recorder.record_panel(0.004, 120)
+        recorder.record_select(1.5, 3)
+
+        histograms = recorder.to_dict()["histograms"]
+
+        self.assertEqual(4, histograms[telemetry.TIME_TO_PANEL]["total"])
+        self.assertEqual(1500, histograms[telemetry.TIME_TO_SELECT]["total"])
+        self.assertEqual(120, histograms[telemetry.LIST_SIZE]["total"])
+        self.assertEqual(3, histograms[telemetry.CHOSEN_RANK]["total"])
+
+    def test_save_and_load(self) -> None:
+        """Tests saved histograms are added to on load."""
+        recorder: Telemetry = Telemetry(self.store_path)
+        recorder.record_panel(0.004, 120)
+        recorder.save()
+
+        reloaded: Telemetry = Telemetry(self.store_path)
+        reloaded.record_panel(0.004, 120)
+
+        self.assertEqual(
+            2,
+            reloaded.histograms[telemetry.LIST_SIZE].count()
+        )
+        with open(self.store_path, "r", encoding="utf-8") as handle:
+            self.assertEqual(
+                telemetry.FORMAT_VERSION,
+                json.load(handle)["version"]
+            )
+        self.assertFalse(path.exists(f"{self.store_path}.tmp"))
+
+    def test_due_for_save(self) -> None:
+        """Tests saving falls due once per interval."""
+        recorder: Telemetry = Telemetry()
+        self.assertFalse(recorder.due_for_save())
+
+        later: float = telemetry.monotonic() + telemetry.SAVE_INTERVAL_SECONDS
+        with patch.object(telemetry, "monotonic", return_value=later):
+            self.assertTrue(recorder.due_for_save())
+            self.assertFalse(recorder.due_for_save())
+
+    def test_invalid_store(self) -> None:
+        """Tests a corrupt store is ignored."""
+        with open(self.store_path, "w", encoding="utf-8") as handle:
+            handle.write("{")
+
+        recorder: Telemetry = Telemetry(self.store_path)
+
+        self.assertEqual(0, recorder.histograms[telemetry.LIST_SIZE].count())
+
+    def test_to_csv(self) -> None:
+        """Tests exporting a row per bucket."""
+        recorder: Telemetry = Telemetry()
+        recorder.record_select(0.0015, 0)
+
+        rows = recorder.to_csv().splitlines()
+
+        self.assertEqual("histogram,bucket,count", rows[0])
+        self.assertIn("time_to_select_ms,<= 2,1", rows)
+        self.assertIn("chosen_rank,<= 0,1", rows)
+        self.assertIn("chosen_rank,> 500,0", rows)
+
+    def test_record_benchmark(self) -> None:
+        """Tests recording each use stays within its time budget, including
+            measuring the time taken and checking whether to save.
+        """
+        recorder: Telemetry = Telemetry()
+        shown_at: float = perf_counter()
+
+        # The best of several runs discounts other activity, and the cost of
+        # the benchmark's own calls is taken off.
+        baseline: float = min(
+            repeat(lambda: None, number=BENCHMARK_CALLS, repeat=5)
+        )
+
+        for (name, record) in (
+            (
+                "record_panel",
+                lambda: recorder.record_panel(
+                    perf_counter() - shown_at,
+                    450
+                ) or recorder.due_for_save()
+            ),
+            (
+                "record_select",
+                lambda: recorder.record_select(
+                    perf_counter() - shown_at,
+                    4
+                ) or recorder.due_for_save()
+            ),
+        ):
+            with self.subTest(name=name):
+                seconds: float = (
+                    min(repeat(record, number=BENCHMARK_CALLS, repeat=5))
+                    - baseline
+                ) / BENCHMARK_CALLS
+
+                self.assertLess(seconds, telemetry.RECORD_BUDGET_SECONDS)
@@ -0,0 +1,50 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+from unittest import TestCase
+try:
+    from lib import timing
+except ImportError:
+    # If we're running these tests in UnitTesting, then we need to use
+    # The package name - Tab Filter - so let's grab import lib and try again.
+    from importlib import import_module
+    timing = import_module(".lib.timing", "Tab Filter")
+
+Timings = timing.Timings
+
+
+class TimingsTestCase(TestCase):
+    """Tests recording how long operations take."""
+
+    def test_record(self) -> None:
+        """Tests only the most recent duration of each operation is kept."""
+        timings: Timings = Timings()
+        timings.record("run", 0.5)
+        timings.record("run", 0.25)
+        timings.record("import", 0.1)
+
+        self.assertEqual(0.25, timings.get("run"))
+        self.assertIsNone(timings.get("warm_up"))
+        self.assertListEqual(
+            [("import", 0.1), ("run", 0.25)],
+            timings.items()
+        )
+
+    def test_measure(self) -> None:
+        """Tests measuring a block, even when it raises."""
+        timings: Timings = Timings()
+
+        with timings.measure("run"):
+            pass
+
+        with self.assertRaises(ValueError):
+            with timings.measure("warm_up"):
+                raise ValueError()
+
+        self.assertGreaterEqual(timings.get("run"), 0.0)
+        self.assertGreaterEqual(timings.get("warm_up"), 0.0)
+
+    def test_format_duration(self) -> None:
+        """Tests durations are formatted in milliseconds."""
+        self.assertEqual("1.25 ms", timing.format_duration(0.00125))
+        self.assertEqual("0.00 ms", timing.format_duration(0))
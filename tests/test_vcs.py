@@ -0,0 +1,175 @@
+# Copyright (c) 2013 - 2021 Robin Malburn
+# See the file license.txt for copying permission.
+
+import os
+from concurrent.futures import Future
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+from typing import Any, Callable, List
+try:
+    from lib import vcs
+except ImportError:
+    # If we're running these tests in UnitTesting, then we need to use
+    # The package name - Tab Filter - so let's grab import lib and try again.
+    from importlib import import_module
+    vcs = import_module(".lib.vcs", "Tab Filter")
+
+VcsStatusCache = vcs.VcsStatusCache
+
+
+class ImmediateExecutor(object):
+    """Executor stand-in that runs submitted work straight away."""
+
+    def submit(self, fn: Callable, *args: Any) -> Future:
+        future: Future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+class ParsePorcelainTestCase(TestCase):
+    """Tests parsing `git status --porcelain -z` output."""
+
+    def test_parse(self) -> None:
+        """Tests each kind of status is detected."""
+        output: str = "\0".join([
+            " M modified.txt",
+            "M  staged.txt",
+            "MM both.txt",
+            "R  new.txt",
+            "old.txt",
+            "?? untracked.txt",
+            "?? build/",
+            "!! ignored.log",
+            "",
+        ])
+
+        (files, directories) = vcs.parse_porcelain(output)
+
+        self.assertDictEqual(
+            {
+                "modified.txt": vcs.STATUS_MODIFIED,
+                "staged.txt": vcs.STATUS_STAGED,
+                "both.txt": vcs.STATUS_MODIFIED,
+                "new.txt": vcs.STATUS_STAGED,
+                "untracked.txt": vcs.STATUS_UNTRACKED,
+                "ignored.log": vcs.STATUS_IGNORED,
+            },
+            files
+        )
+        self.assertListEqual([("build/", vcs.STATUS_UNTRACKED)], directories)
+
+    def test_parse_empty(self) -> None:
+        """Tests a clean repository has no statuses."""
+        self.assertEqual(({}, []), vcs.parse_porcelain(""))
+
+    def test_get_status_caption(self) -> None:
+        """Tests captions mark stale statuses."""
+        self.assertEqual(
+            "Git: Modified",
+            vcs.get_status_caption((vcs.STATUS_MODIFIED, False))
+        )
+        self.assertEqual(
+            "Git: Modified (stale)",
+            vcs.get_status_caption((vcs.STATUS_MODIFIED, True))
+        )
+
+
+class VcsStatusCacheTestCase(TestCase):
+    """Tests the background status cache."""
+
+    root: TemporaryDirectory
+    calls: List[str]
+
+    def setUp(self) -> None:
+        self.root = TemporaryDirectory()
+        os.mkdir(path.join(self.root.name, ".git"))
+        os.mkdir(path.join(self.root.name, "build"))
+        self.calls = []
+        patcher = patch.object(
+            vcs,
+            "get_executor",
+            return_value=ImmediateExecutor()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        self.root.cleanup()
+
+    def runner(self, root: str) -> str:
+        self.calls.append(root)
+        return " M foo.txt\0?? build/\0"
+
+    def test_find_repository_root(self) -> None:
+        """Tests finding the repository root from a nested directory."""
+        nested: str = path.join(self.root.name, "build")
+
+        self.assertEqual(self.root.name, vcs.find_repository_root(nested))
+
+    def test_get_status_before_request(self) -> None:
+        """Tests nothing is shown until a refresh has been requested."""
+        cache: VcsStatusCache = VcsStatusCache(runner=self.runner)
+
+        self.assertIsNone(
+            cache.get_status(path.join(self.root.name, "foo.txt"))
+        )
+        self.assertListEqual([], self.calls)
+
+    def test_request_batches_per_repository(self) -> None:
+        """Tests a single git call is made per repository."""
+        cache: VcsStatusCache = VcsStatusCache(runner=self.runner)
+        foo: str = path.join(self.root.name, "foo.txt")
+        bar: str = path.join(self.root.name, "bar.txt")
+        output: str = path.join(self.root.name, "build", "out.o")
+
+        cache.request([foo, bar, output])
+
+        self.assertListEqual([self.root.name], self.calls)
+        self.assertEqual((vcs.STATUS_MODIFIED, False), cache.get_status(foo))
+        self.assertIsNone(cache.get_status(bar))
+        self.assertEqual(
+            (vcs.STATUS_UNTRACKED, False),
+            cache.get_status(output)
+        )
+
+        # A fresh status shouldn't be requested again.
+        cache.request([foo])
+        self.assertListEqual([self.root.name], self.calls)
+
+    def test_invalidate(self) -> None:
+        """Tests invalidated statuses are marked stale and refreshed."""
+        cache: VcsStatusCache = VcsStatusCache(runner=self.runner)
+        foo: str = path.join(self.root.name, "foo.txt")
+
+        cache.request([foo])
+        cache.invalidate(foo)
+
+        self.assertEqual((vcs.STATUS_MODIFIED, True), cache.get_status(foo))
+
+        cache.request([foo])
+
+        self.assertListEqual([self.root.name, self.root.name], self.calls)
+        self.assertEqual((vcs.STATUS_MODIFIED, False), cache.get_status(foo))
+
+    def test_ttl(self) -> None:
+        """Tests expired statuses are marked stale."""
+        cache: VcsStatusCache = VcsStatusCache(ttl=-1, runner=self.runner)
+        foo: str = path.join(self.root.name, "foo.txt")
+
+        cache.request([foo])
+
+        self.assertEqual((vcs.STATUS_MODIFIED, True), cache.get_status(foo))
+
+    def test_git_failure(self) -> None:
+        """Tests a failing git call results in no statuses."""
+        def runner(root: str) -> str:
+            raise OSError("git not found")
+
+        cache: VcsStatusCache = VcsStatusCache(runner=runner)
+        foo: str = path.join(self.root.name, "foo.txt")
+
+        cache.request([foo])
+
+        self.assertIsNone(cache.get_status(foo))